@@ -0,0 +1,123 @@
+"""The ReAct loop of the agent, with step and token budgets.
+
+The graph is the one `create_react_agent` builds (an "agent" node calling the
+model, a "tools" node running its tool calls, back to the agent until it
+stops calling tools), except that before calling the model again the agent
+node checks whether it has to stop:
+
+- Step budget: the model has been called MATH_AGENT_MAX_STEPS times for
+  this question (redundant tool calls in a loop).
+- Token budget: the model calls for this question used MATH_AGENT_TOKEN_BUDGET
+  tokens (0: no limit).
+
+In either case the answer is rendered from the tool results so far, and a
+"llm_call_avoided" custom event with the reason is dispatched to the
+callbacks (instrumentation counts it as math_agent_llm_calls_avoided_total,
+and the CLI, web interface and server do not cache such answers).
+Budgets can be set per request in the run config:
+`config={"configurable": {"max_steps": 3, "token_budget": 4000}}`.
+"""
+import os
+from typing import Dict, List, Optional, Tuple, Union
+
+from langchain_core.callbacks.manager import adispatch_custom_event, dispatch_custom_event
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from langgraph.graph import END, START, MessagesState, StateGraph
+from langgraph.prebuilt import ToolNode, tools_condition
+
+from fast_path import render_answer
+from tool_results import ToolResult
+
+# Model calls per question before answering from the tool results so far
+MAX_STEPS = int(os.getenv("MATH_AGENT_MAX_STEPS", 6))
+# Tokens (prompt + completion) per question before doing the same (0: no limit)
+TOKEN_BUDGET = int(os.getenv("MATH_AGENT_TOKEN_BUDGET", 0))
+
+
+def _turn_start(messages: list) -> int:
+    """Index of the first message after the last question."""
+    for index in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[index], HumanMessage):
+            return index + 1
+    return 0
+
+
+def _tool_results(messages: list) -> List[Tuple[str, Dict, Union[ToolResult, str]]]:
+    """(tool name, arguments, result) of every tool call answered in `messages`, in call order.
+
+    The result is the tool's ToolResult (the message artifact), or the message text for other tools.
+    """
+    calls = {}
+    results = []
+    for message in messages:
+        if isinstance(message, AIMessage):
+            calls.update((call["id"], call) for call in message.tool_calls)
+        elif isinstance(message, ToolMessage) and message.tool_call_id in calls:
+            call = calls[message.tool_call_id]
+            result = message.artifact if isinstance(message.artifact, ToolResult) else str(message.content)
+            results.append((call["name"], call["args"], result))
+    return results
+
+
+def _settings(config: Optional[RunnableConfig]) -> Tuple[int, int]:
+    configurable = (config or {}).get("configurable") or {}
+    return configurable.get("max_steps", MAX_STEPS), configurable.get("token_budget", TOKEN_BUDGET)
+
+
+def local_answer(messages: list, config: Optional[RunnableConfig] = None) -> Optional[Tuple[str, AIMessage]]:
+    """(reason, templated answer) when the next model call can be skipped, else None."""
+    if not messages or not isinstance(messages[-1], ToolMessage):
+        return None  # the question itself always goes to the model
+    max_steps, token_budget = _settings(config)
+    turn = messages[_turn_start(messages):]
+    results = _tool_results(turn)
+    if not results:
+        return None
+
+    model_calls = [m for m in turn if isinstance(m, AIMessage)]
+    tokens = sum((m.usage_metadata or {}).get("total_tokens", 0) for m in model_calls)
+    if max_steps and len(model_calls) >= max_steps:
+        steps = f"{len(model_calls)} model call" + ("s" if len(model_calls) != 1 else "")
+        reason, note = "step_budget", f"Stopped after {steps}; these are the results so far."
+    elif token_budget and tokens >= token_budget:
+        reason, note = "token_budget", f"Stopped after using {tokens} tokens; these are the results so far."
+    else:
+        return None
+
+    # A loop of redundant calls shows each distinct result once
+    seen = set()
+    sections = []
+    for name, args, result in results:
+        key = (name, repr(sorted(args.items())), str(result))
+        if key not in seen:
+            seen.add(key)
+            sections.append(render_answer(name, args, result))
+    sections.append(f"_{note}_")
+    return reason, AIMessage(content="\n\n".join(sections), response_metadata={"llm_call_avoided": reason})
+
+
+def build_react_graph(model, tools: list):
+    """Compiled ReAct graph over `tools`; `model` must already have the tools bound."""
+
+    def call_model(state: MessagesState, config: RunnableConfig) -> dict:
+        shortcut = local_answer(state["messages"], config)
+        if shortcut is not None:
+            dispatch_custom_event("llm_call_avoided", {"reason": shortcut[0]}, config=config)
+            return {"messages": [shortcut[1]]}
+        return {"messages": [model.invoke(state["messages"], config)]}
+
+    async def acall_model(state: MessagesState, config: RunnableConfig) -> dict:
+        shortcut = local_answer(state["messages"], config)
+        if shortcut is not None:
+            await adispatch_custom_event("llm_call_avoided", {"reason": shortcut[0]}, config=config)
+            return {"messages": [shortcut[1]]}
+        return {"messages": [await model.ainvoke(state["messages"], config)]}
+
+    graph = StateGraph(MessagesState)
+    graph.add_node("agent", RunnableLambda(call_model, afunc=acall_model, name="agent"))
+    graph.add_node("tools", ToolNode(tools))
+    graph.add_edge(START, "agent")
+    graph.add_conditional_edges("agent", tools_condition, ["tools", END])
+    graph.add_edge("tools", "agent")
+    return graph.compile()
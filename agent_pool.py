@@ -0,0 +1,219 @@
+"""Pool of pre-warmed agents shared by the web interface's sessions.
+
+The first student after a deploy or restart used to pay for importing
+LangChain and SymPy, building the model and compiling the agent graphs.
+The pool does that work when the server starts: it builds
+MATH_AGENT_POOL_SIZE agents in a background thread, and warms each one by
+compiling the agents of a few typical questions (and the one with every
+tool), starting the SymPy workers with a first computation, and opening a
+connection to each model provider.
+
+The compiled agents are stateless, so they are shared: each question
+leases the ready agent with the fewest answers in flight, and any number of
+questions can run at once. A question only waits while the first agent is
+still being built. An agent that has answered MATH_AGENT_POOL_MAX_USES
+questions is replaced by a freshly built one in the background; the old one
+finishes the answers it is serving.
+
+    python agent_pool.py    # build the pool and print its health and warm-up times
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional
+
+from main import initialize_agent
+from symbolic_pool import get_symbolic_pool
+
+POOL_SIZE = int(os.getenv("MATH_AGENT_POOL_SIZE", 2))
+# Questions an agent answers before it is rebuilt (0 never rebuilds)
+MAX_USES = int(os.getenv("MATH_AGENT_POOL_MAX_USES", 500))
+# Seconds a question waits for the first agent to be built
+LEASE_TIMEOUT = float(os.getenv("MATH_AGENT_POOL_TIMEOUT", 60))
+
+# One question per topic, so the agents for the common tool groups are compiled up front
+WARM_QUESTIONS = (
+    "What is 17 multiplied by 23?",
+    "Solve 2*x + 5 = 13",
+    "Find the area of a circle with radius 7",
+    "Find sin(30)",
+    "What is log base 2 of 32?",
+    "Find the mean of 10, 20, 30, 40 and 50",
+    "Find the 10th term of an arithmetic sequence with first term 5 and common difference 3",
+    "What is 15% of 80?",
+)
+
+
+class PooledAgent:
+    """One agent of the pool: (agent_executor, system_message, api_status) and its usage."""
+
+    def __init__(self, agent_executor, system_message, api_status: str, build_s: float):
+        self.agent_executor = agent_executor
+        self.system_message = system_message
+        self.api_status = api_status
+        self.build_s = build_s
+        self.uses = 0
+        self.in_flight = 0
+
+
+def _chat_models(model) -> list:
+    backends = getattr(model, "backends", None)
+    return [backend.model for backend in backends] if backends else [model]
+
+
+def _open_connections(agent_executor):
+    """Open a pooled connection to each provider so the first question skips the TLS handshake."""
+    model = getattr(agent_executor, "model", None)
+    for chat_model in _chat_models(model) if model is not None else []:
+        client = getattr(chat_model, "root_client", None)
+        if client is None:
+            continue
+        try:
+            client.with_options(max_retries=0, timeout=5).models.list()
+        except Exception:
+            pass  # only a warm-up; the first question connects on its own
+
+
+def warm_agent(agent_executor):
+    """Compile the agents of the typical questions ahead of time (routed agents only)."""
+    warm = getattr(agent_executor, "warm", None)
+    if warm is not None:
+        warm(WARM_QUESTIONS)
+
+
+class AgentPool:
+    """Pre-warmed agents shared by every question.
+
+    Call start() when the server starts; lease() blocks only until the first
+    agent is ready.
+    """
+
+    def __init__(self, size: int = POOL_SIZE, max_uses: int = MAX_USES,
+                 factory: Callable = initialize_agent):
+        self.size = max(1, size)
+        self.max_uses = max_uses
+        self.factory = factory
+        self.builds = 0
+        self.leases = 0
+        self.in_use = 0
+        self.error: Optional[Exception] = None
+        self.started_at: Optional[float] = None
+        self.first_ready_s: Optional[float] = None
+        self.all_ready_s: Optional[float] = None
+        self._agents: List[PooledAgent] = []
+        self._ready = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def _build(self) -> PooledAgent:
+        start = time.perf_counter()
+        agent_executor, system_message, api_status = self.factory()
+        warm_agent(agent_executor)
+        agent = PooledAgent(agent_executor, system_message, api_status, time.perf_counter() - start)
+        with self._ready:
+            self.builds += 1
+        return agent
+
+    def _add(self, agent: PooledAgent):
+        with self._ready:
+            self._agents.append(agent)
+            self._ready.notify_all()
+
+    def _warm_up(self):
+        try:
+            for index in range(self.size):
+                agent = self._build()
+                self._add(agent)
+                if index == 0:
+                    self.first_ready_s = time.perf_counter() - self.started_at
+                    # The SymPy workers and provider connections are shared by every agent
+                    get_symbolic_pool().warm()
+                    _open_connections(agent.agent_executor)
+            self.all_ready_s = time.perf_counter() - self.started_at
+        except Exception as e:
+            with self._ready:
+                self.error = e
+                self._ready.notify_all()
+
+    def start(self) -> "AgentPool":
+        """Build and warm the agents in a background thread (once)."""
+        with self._ready:
+            if self._thread is None:
+                self.started_at = time.perf_counter()
+                self._thread = threading.Thread(target=self._warm_up, name="agent-pool", daemon=True)
+                self._thread.start()
+        return self
+
+    def _replace(self, agent: PooledAgent):
+        try:
+            replacement = self._build()
+        except Exception:
+            # Keep serving with the old agent rather than shrinking the pool
+            agent.uses = 0
+            return
+        with self._ready:
+            self._agents[self._agents.index(agent)] = replacement
+
+    def _take(self, timeout: float) -> PooledAgent:
+        """The ready agent with the fewest answers in flight, counted as leased."""
+        with self._ready:
+            ready = self._ready.wait_for(lambda: self._agents or (self.error is not None and self.builds == 0),
+                                         timeout)
+            if not self._agents:
+                if ready:
+                    raise self.error
+                raise TimeoutError(f"No agent was ready within {timeout:g}s; try again in a moment")
+            agent = min(self._agents, key=lambda candidate: candidate.in_flight)
+            agent.in_flight += 1
+            agent.uses += 1
+            self.leases += 1
+            self.in_use += 1
+        if self.max_uses and agent.uses == self.max_uses:
+            threading.Thread(target=self._replace, args=(agent,), name="agent-pool-rebuild", daemon=True).start()
+        return agent
+
+    @contextmanager
+    def lease(self, timeout: float = LEASE_TIMEOUT) -> Iterator[tuple]:
+        """(agent_executor, system_message, api_status) of a ready agent, for the duration of one answer."""
+        self.start()
+        agent = self._take(timeout)
+        try:
+            yield agent.agent_executor, agent.system_message, agent.api_status
+        finally:
+            with self._ready:
+                agent.in_flight -= 1
+                self.in_use -= 1
+
+    def health(self) -> dict:
+        """Pool size, ready agents, answers in flight, builds, leases and warm-up times in seconds."""
+        return {
+            "size": self.size,
+            "ready": len(self._agents),
+            "in_use": self.in_use,
+            "builds": self.builds,
+            "leases": self.leases,
+            "first_ready_s": self.first_ready_s,
+            "all_ready_s": self.all_ready_s,
+            "error": str(self.error) if self.error else None,
+        }
+
+
+_pool = AgentPool()
+
+
+def get_agent_pool() -> AgentPool:
+    """Get the process-wide agent pool (started on first call)."""
+    return _pool.start()
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    pool = get_agent_pool()
+    with pool.lease():
+        print(f"first agent ready after {pool.first_ready_s:.2f} s")
+    while pool.all_ready_s is None and pool.error is None:
+        time.sleep(0.1)
+    for key, value in pool.health().items():
+        print(f"{key:<14} {value:.2f}" if isinstance(value, float) else f"{key:<14} {value}")
@@ -1,9 +1,19 @@
+import time
+from collections import deque
+
 import streamlit as st
-from langchain_core.messages import HumanMessage
 from dotenv import load_dotenv
 
 # Import agent initialization from main.py
-from main import initialize_agent
+from main import build_messages, get_tool_specs, load_system_prompt, model_settings
+from agent_pool import get_agent_pool
+from fast_path import TEMPLATES, try_fast_path
+from response_cache import get_response_cache
+import stats_engine
+from memory import ConversationMemory, compact_tool_call
+import instrumentation
+from instrumentation import trace_request
+from tool_results import ToolResult, format_value
 
 load_dotenv()
 
@@ -38,20 +48,146 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+# Seconds between re-renders of an answer while its tokens stream in
+RENDER_INTERVAL = 0.05
+
+
+class StreamingMessage:
+    """Chat message placeholder fed token by token.
+
+    Re-rendering the whole markdown answer on every token is slow for long
+    answers, so the placeholder is redrawn at most every RENDER_INTERVAL
+    seconds; the first token and tool status changes are shown right away.
+    """
+
+    def __init__(self, placeholder):
+        self.placeholder = placeholder
+        self.text = ""
+        self.status = ""
+        self._rendered_at = 0.0
+
+    def append(self, text: str):
+        first = not self.text
+        self.text += text
+        self.render(force=first)
+
+    def set_status(self, status: str):
+        if status != self.status:
+            self.status = status
+            self.render(force=True)
+
+    def render(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._rendered_at < RENDER_INTERVAL:
+            return
+        self._rendered_at = now
+        body = self.text + "▌"
+        if self.status:
+            body += f"\n\n*{self.status}*"
+        self.placeholder.markdown(body)
+
+
+def stream_answer(agent_executor, messages, message_placeholder, tracer):
+    """Stream one agent answer into the placeholder token by token, with a status line while tools run.
+
+    Returns (answer text, message contents for the response cache, tool records for memory,
+    (tool name, ToolResult) of each tool call for render_tool_results).
+    """
+    stream = StreamingMessage(message_placeholder)
+    chunks = []
+    tool_records = []
+    tool_results = []
+    pending_tool_calls = {}
+    running = {}
+    for mode, payload in agent_executor.stream(
+        {"messages": messages}, config={"callbacks": [tracer]}, stream_mode=["messages", "updates"]
+    ):
+        if mode == "messages":
+            message, metadata = payload
+            if metadata.get("langgraph_node") != "agent":
+                continue
+            if message.content:
+                stream.append(message.content)
+            # Tool names stream in before their arguments are complete
+            for tool_call in getattr(message, "tool_call_chunks", None) or []:
+                if tool_call.get("id") and tool_call.get("name"):
+                    running[tool_call["id"]] = tool_call["name"]
+                    stream.set_status(f"🔧 Running {', '.join(running.values())}…")
+            continue
+        if "agent" in payload and "messages" in payload["agent"]:
+            for message in payload["agent"]["messages"]:
+                for tool_call in getattr(message, "tool_calls", None) or []:
+                    pending_tool_calls[tool_call["id"]] = tool_call
+                if message.content:
+                    chunks.append(message.content)
+        if "tools" in payload and "messages" in payload["tools"]:
+            for message in payload["tools"]["messages"]:
+                running.pop(message.tool_call_id, None)
+                tool_call = pending_tool_calls.get(message.tool_call_id)
+                if tool_call:
+                    tool_records.append(
+                        compact_tool_call(tool_call["name"], tool_call["args"], str(message.content))
+                    )
+                    if isinstance(message.artifact, ToolResult):
+                        tool_results.append((tool_call["name"], message.artifact))
+            stream.set_status(f"🔧 Running {', '.join(running.values())}…" if running else "")
+    return stream.text, chunks, tool_records, tool_results
+
+
+def render_tool_result(name: str, result: ToolResult):
+    """Show one tool result: its values as metrics, then the exact form, working, steps and table."""
+    title, _ = TEMPLATES.get(name, (name.replace("_", " ").capitalize(), None))
+    st.markdown(f"**{title}**")
+    if not result.ok:
+        st.error(result.error)
+        return
+    if result.values:
+        columns = st.columns(min(len(result.values), 4))
+        for index, (label, value) in enumerate(result.values.items()):
+            columns[index % len(columns)].metric(label, result.display(value))
+    details = [result.note, result.formula and f"Working: {result.formula}",
+               not result.values and result.units and f"Units: {result.units}"]
+    for detail in filter(None, details):
+        st.caption(detail)
+    if result.steps:
+        st.markdown("\n".join(f"{i}. {step}" for i, step in enumerate(result.steps, 1)))
+    if result.table is not None:
+        columns = zip(*result.table.rows)
+        st.table({header: [format_value(cell, result.decimals) for cell in column]
+                  for header, column in zip(result.table.headers, columns)})
+
+
+def render_tool_results(tool_results):
+    """Expander under an answer with the structured result of each tool it used."""
+    if tool_results:
+        with st.expander(f"🔧 Tool results ({len(tool_results)})"):
+            for name, result in tool_results:
+                render_tool_result(name, result)
+
+
 @st.cache_resource
 def get_agent():
-    """Get initialized agent with caching."""
+    """Get the pool of pre-warmed agents; they are built in the background from the first page load."""
     try:
-        agent_executor, system_message, api_status = initialize_agent()
-        return agent_executor, system_message, f"✅ {api_status}"
+        _, api_status = model_settings()
+        return get_agent_pool(), f"✅ {api_status}"
     except ValueError as e:
         st.error(f"❌ {str(e)}")
         st.stop()
-        return None, None, None
+        return None, None
 
 def main():
-    # Initialize agent
-    agent_executor, system_message, api_status = get_agent()
+    # Initialize agent (the page renders while it loads)
+    agent_pool, api_status = get_agent()
+    response_cache = get_response_cache(load_system_prompt(), get_tool_specs())
+    
+    # Token-budgeted conversation history sent to the agent with each question
+    if "memory" not in st.session_state:
+        st.session_state.memory = ConversationMemory()
+    memory = st.session_state.memory
+    # Timings of this session's answers, shown in the performance panel
+    if "traces" not in st.session_state:
+        st.session_state.traces = deque(maxlen=instrumentation.RECENT_TRACES)
     
     # Header
     st.markdown('<h1 class="main-header">📐 Math Agent</h1>', unsafe_allow_html=True)
@@ -67,7 +203,7 @@ def main():
         - **📐 Algebra**: Equations, factoring, expanding
         - **📏 Geometry**: Areas, volumes, Pythagorean theorem
         - **📊 Trigonometry**: sin, cos, tan, inverses
-        - **📈 Statistics**: Mean, median, mode, standard deviation
+        - **📈 Statistics**: Mean, median, mode, standard deviation, uploaded data
         - **🔢 Sequences**: Arithmetic & geometric
         - **📉 Logarithms**: All types
         - **➕ Basic Math**: Arithmetic, percentages, ratios
@@ -87,12 +223,41 @@ def main():
             if st.button(f"📝 {example}", key=example, use_container_width=True):
                 st.session_state.example_question = example
         
+        st.header("📊 Data Upload")
+        uploaded_file = st.file_uploader("Upload a CSV or text file of numbers", type=["csv", "txt"])
+        if uploaded_file is not None:
+            text = uploaded_file.getvalue().decode("utf-8", errors="replace")
+            header = text.splitlines()[0].split(",") if text.strip() else []
+            column = None
+            if len(header) > 1 and not any(cell.strip().replace(".", "", 1).lstrip("-").isdigit() for cell in header):
+                column = st.selectbox("Column", [cell.strip() for cell in header])
+            try:
+                values = stats_engine.parse_numbers(text, column)
+                dataset_id = stats_engine.register_dataset(values, uploaded_file.name)
+                st.session_state.dataset = {"id": dataset_id, "name": uploaded_file.name, "count": len(values)}
+                st.caption(f"{len(values)} values loaded. Ask e.g. \"Describe the uploaded data\".")
+            except ValueError as e:
+                st.error(f"❌ {str(e)}")
+                st.session_state.pop("dataset", None)
+        else:
+            st.session_state.pop("dataset", None)
+        
         st.header("⚙️ Settings")
         if st.button("🔄 Clear Chat History"):
             st.session_state.messages = []
+            memory.clear()
             st.rerun()
+        st.caption(f"Conversation memory: {memory.tokens()} / {memory.token_budget} tokens")
+        if response_cache:
+            cache_stats = response_cache.stats()
+            st.caption(
+                f"Response cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+                f"{cache_stats['entries']} entries"
+            )
+            if st.button("🗑️ Clear Response Cache"):
+                response_cache.invalidate()
+                st.rerun()
     
-    # Initialize chat history
     if "messages" not in st.session_state:
         st.session_state.messages = [
             {
@@ -112,6 +277,7 @@ def main():
     for message in st.session_state.messages:
         with st.chat_message(message["role"]):
             st.markdown(message["content"])
+            render_tool_results(message.get("tool_results"))
     
     # Chat input
     if prompt := st.chat_input("Ask me a math question...") or user_question:
@@ -128,30 +294,97 @@ def main():
             message_placeholder = st.empty()
             full_response = ""
             
-            try:
-                # Create messages with system instruction
-                messages = [
-                    system_message,
-                    HumanMessage(content=prompt)
-                ]
-                
-                # Stream the response
-                for chunk in agent_executor.stream({"messages": messages}):
-                    if "agent" in chunk and "messages" in chunk["agent"]:
-                        for message in chunk["agent"]["messages"]:
-                            if hasattr(message, 'content') and message.content:
-                                full_response += message.content
-                                message_placeholder.markdown(full_response + "▌")
+            # Uploaded data is passed by reference so the numbers stay out of the prompt
+            agent_prompt = prompt
+            if "dataset" in st.session_state:
+                dataset = st.session_state.dataset
+                agent_prompt += (
+                    f"\n\n(Uploaded data '{dataset['name']}' with {dataset['count']} values is available "
+                    f"to the statistics tools as dataset=\"{dataset['id']}\".)"
+                )
+            
+            tool_records = []
+            tool_results = []
+            with trace_request(prompt) as tracer:
+                try:
+                    # Simple one-line questions are answered locally without calling the model
+                    fast_answer = try_fast_path(prompt, get_tool_specs())
+                    # Repeated questions are replayed from the response cache
+                    # Follow-up questions depend on the history, so it is part of the cache key
+                    cache_key = memory.context_key() + agent_prompt
+                    cached = None
+                    if fast_answer is None and response_cache:
+                        cached = response_cache.get(cache_key)
+                    if fast_answer is not None:
+                        tracer.trace.source = "fast_path"
+                        full_response = fast_answer
+                    elif cached is not None:
+                        tracer.trace.source = "cache"
+                        for content in cached.chunks:
+                            full_response += content
+                            message_placeholder.markdown(full_response + "▌")
+                    else:
+                        # Each answer leases the least busy pre-warmed agent of the pool
+                        with agent_pool.lease() as (agent_executor, system_message, _):
+                            # Static system prompt first, then the history and the question
+                            messages = build_messages(system_message, agent_prompt, memory.messages())
+                            full_response, chunks, tool_records, tool_results = stream_answer(
+                                agent_executor, messages, message_placeholder, tracer
+                            )
+                        # Answers rendered from the tool results without the model are not cached
+                        if response_cache and not tracer.trace.llm_calls_avoided:
+                            response_cache.put(cache_key, full_response, chunks)
                 
-                message_placeholder.markdown(full_response)
+                    message_placeholder.markdown(full_response)
+                    render_tool_results(tool_results)
+                    memory.add_turn(prompt, full_response, tool_records)
                 
-            except Exception as e:
-                error_message = f"❌ Error: {str(e)}\n\nPlease try again with a different question."
-                message_placeholder.error(error_message)
-                full_response = error_message
+                except Exception as e:
+                    tracer.trace.error = str(e)
+                    error_message = f"❌ Error: {str(e)}\n\nPlease try again with a different question."
+                    message_placeholder.error(error_message)
+                    full_response = error_message
         
         # Add assistant response to chat history
-        st.session_state.messages.append({"role": "assistant", "content": full_response})
+        st.session_state.messages.append({"role": "assistant", "content": full_response, "tool_results": tool_results})
+        st.session_state.traces.append(tracer.trace)
+    
+    render_performance_panel()
+
+
+def render_performance_panel():
+    """Sidebar panel with the timings of this session's last answer and the process-wide metrics."""
+    traces = st.session_state.traces
+    with st.sidebar:
+        st.header("⏱️ Performance")
+        if not traces:
+            st.caption("Ask a question to see where the time goes.")
+        else:
+            last = traces[-1]
+            col1, col2 = st.columns(2)
+            col1.metric("Last answer", f"{last.duration_s:.2f} s")
+            col2.metric("Answered by", last.source.replace("_", " "))
+            if last.source == "agent":
+                col1.metric("Model time", f"{last.llm_s:.2f} s")
+                col2.metric("First token", f"{last.ttft_s:.2f} s" if last.ttft_s is not None else "–")
+                col1.metric("Tool time", f"{last.tool_s * 1000:.1f} ms")
+                col2.metric("Iterations", last.iterations)
+                st.caption(f"Tokens: {last.input_tokens} prompt, {last.output_tokens} completion")
+                if last.llm_calls_avoided:
+                    avoided = ", ".join(f"{count} ({reason.replace('_', ' ')})" for reason, count in last.llm_calls_avoided.items())
+                    st.caption(f"Model calls avoided: {avoided}")
+                for span in last.tool_calls:
+                    st.caption(f"🔧 {span.name}: {span.duration_s * 1000:.1f} ms" + (" (error)" if span.error else ""))
+            latencies = [trace.duration_s for trace in traces]
+            st.caption(
+                f"This session: {len(traces)} answered, p50 {instrumentation.percentile(latencies, 50):.2f} s, "
+                f"p95 {instrumentation.percentile(latencies, 95):.2f} s"
+            )
+        pool = get_agent_pool().health()
+        warm_up = f", first ready after {pool['first_ready_s']:.1f} s" if pool["first_ready_s"] is not None else ", warming up"
+        st.caption(f"Agent pool: {pool['ready']} of {pool['size']} ready, {pool['in_use']} answers in flight{warm_up}")
+        with st.expander("Prometheus metrics"):
+            st.code(instrumentation.metrics.render_prometheus(), language="text")
 
 if __name__ == "__main__":
     main()
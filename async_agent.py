@@ -0,0 +1,98 @@
+import asyncio
+import os
+from contextlib import nullcontext
+from functools import partial
+from typing import AsyncIterator, List, Optional
+from weakref import WeakKeyDictionary
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+from instrumentation import TraceCallbackHandler, trace_request
+from main import SYMBOLIC_TOOLS, build_messages, create_model, get_tool_groups, load_system_prompt
+from symbolic_pool import get_symbolic_pool
+from tool_router import build_agent
+
+# Maximum number of agent runs in flight at once per event loop
+MAX_CONCURRENCY = int(os.getenv("MATH_AGENT_MAX_CONCURRENCY", 16))
+
+_limiters: "WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = WeakKeyDictionary()
+
+
+def set_max_concurrency(limit: int):
+    """Change the number of agent runs allowed in flight at once."""
+    global MAX_CONCURRENCY
+    MAX_CONCURRENCY = limit
+    _limiters.clear()
+
+
+def _limiter() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    if loop not in _limiters:
+        _limiters[loop] = asyncio.Semaphore(MAX_CONCURRENCY)
+    return _limiters[loop]
+
+
+def to_async_tool(sync_tool):
+    """Give a tool a native coroutine so the async agent never blocks the event loop.
+
+    CPU-light tools run inline; SymPy tools wait on the process pool from a
+    worker thread.
+    """
+    func = sync_tool.func
+    if sync_tool.name in SYMBOLIC_TOOLS:
+        async def coroutine(**kwargs):
+            return await asyncio.get_running_loop().run_in_executor(None, partial(func, **kwargs))
+    else:
+        async def coroutine(**kwargs):
+            return func(**kwargs)
+    return sync_tool.model_copy(update={"coroutine": coroutine})
+
+
+def _build_agent():
+    model, api_status = create_model()
+    get_symbolic_pool().warm()
+    groups = {name: [to_async_tool(t) for t in tools] for name, tools in get_tool_groups().items()}
+    agent_executor = build_agent(model, groups)
+    system_message = SystemMessage(content=load_system_prompt())
+    return agent_executor, system_message, api_status
+
+
+async def ainitialize_agent():
+    """Async variant of initialize_agent(). Returns (agent_executor, system_message, api_status).
+
+    The returned graph is driven with `astream`/`ainvoke` (see astream_answer and
+    ainvoke_answer); its tools run without blocking the event loop.
+    """
+    return await asyncio.to_thread(_build_agent)
+
+
+def answer_text(messages: List[BaseMessage]) -> str:
+    """Concatenate the text the agent produced after the last user message."""
+    for start in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[start], HumanMessage):
+            break
+    return "".join(m.content for m in messages[start + 1:] if isinstance(m, AIMessage) and m.content)
+
+
+async def astream_answer(agent_executor, system_message, question: str,
+                         tracer: Optional[TraceCallbackHandler] = None) -> AsyncIterator[str]:
+    """Stream the agent's answer to a question as text chunks, token by token as the model writes it.
+
+    The run is traced on its own, or reports to `tracer` when the caller traces it.
+    """
+    messages = build_messages(system_message, question)
+    async with _limiter():
+        with nullcontext(tracer) if tracer is not None else trace_request(question) as tracer:
+            async for message, metadata in agent_executor.astream(
+                {"messages": messages}, config={"callbacks": [tracer]}, stream_mode="messages"
+            ):
+                if metadata.get("langgraph_node") == "agent" and message.content:
+                    yield message.content
+
+
+async def ainvoke_answer(agent_executor, system_message, question: str) -> dict:
+    """Run the agent on a question and return the final graph state ({"messages": [...]})."""
+    messages = build_messages(system_message, question)
+    async with _limiter():
+        with trace_request(question) as tracer:
+            return await agent_executor.ainvoke({"messages": messages}, config={"callbacks": [tracer]})
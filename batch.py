@@ -0,0 +1,194 @@
+import asyncio
+import csv
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from response_cache import normalize_question
+
+ID_FIELDS = ("id", "request_id", "question_id", "number")
+QUESTION_FIELDS = ("question", "body", "text", "prompt", "title")
+
+
+def _item_from_record(record: Dict, index: int) -> Dict:
+    item_id = next((str(record[f]) for f in ID_FIELDS if record.get(f) not in (None, "")), str(index))
+    question = next((str(record[f]).strip() for f in QUESTION_FIELDS if record.get(f)), "")
+    return {"id": item_id, "question": question}
+
+
+def read_questions(path: Path) -> List[Dict]:
+    """Read a worksheet from a JSONL or CSV file. Returns [{"id": ..., "question": ...}, ...].
+
+    Each JSONL line or CSV row needs a question field (question, body, text, prompt
+    or title) and may carry an id field (id, request_id, question_id or number);
+    items without an id are numbered by position. Plain lines of text are also
+    accepted as questions.
+    """
+    path = Path(path)
+    items = []
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.suffix.lower() == ".csv":
+            reader = csv.DictReader(f)
+            for index, row in enumerate(reader, 1):
+                row = {k.strip().lower(): v for k, v in row.items() if k}
+                items.append(_item_from_record(row, index))
+        else:
+            for index, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    record = {"question": line}
+                if isinstance(record, str):
+                    record = {"question": record}
+                items.append(_item_from_record(record, index))
+    return [item for item in items if item["question"]]
+
+
+def read_completed(path: Path) -> Dict[str, Dict]:
+    """Results already written to an output file, keyed by item id (failed items excluded)."""
+    completed = {}
+    if not Path(path).exists():
+        return completed
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # a line cut short by an interruption
+            if not record.get("error"):
+                completed[record["id"]] = record
+    return completed
+
+
+def summarize_run(messages) -> Dict:
+    """Token usage, tool calls, structured tool results and number of model calls of one agent run."""
+    from langchain_core.messages import AIMessage, ToolMessage
+
+    from tool_results import ToolResult
+
+    usage = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+    tool_calls = []
+    tool_results = []
+    llm_calls = 0
+    for message in messages:
+        if isinstance(message, ToolMessage) and isinstance(message.artifact, ToolResult):
+            tool_results.append({"tool": message.name, **message.artifact.to_dict()})
+        if not isinstance(message, AIMessage):
+            continue
+        tool_calls.extend(call["name"] for call in message.tool_calls)
+        if "llm_call_avoided" in message.response_metadata:
+            continue  # rendered from the tool results, not written by the model
+        llm_calls += 1
+        for key in usage:
+            usage[key] += (message.usage_metadata or {}).get(key, 0)
+    return {"usage": usage, "tool_calls": tool_calls, "tool_results": tool_results, "llm_calls": llm_calls}
+
+
+async def run_batch(input_path: Path, output_path: Path, parallel: int = 8, resume: bool = True) -> Dict:
+    """Answer every question in `input_path`, appending one JSON line per item to `output_path`.
+
+    Simple questions are answered by the fast path without the agent, and
+    identical questions (after normalization) are only sent to the agent once.
+    With `resume`, items already answered in `output_path` are skipped.
+    """
+    from async_agent import ainitialize_agent, ainvoke_answer, answer_text
+    from fast_path import call_fast_path, render_answer
+    from main import get_tool_specs
+
+    items = read_questions(input_path)
+    completed = read_completed(output_path) if resume else {}
+    pending = [item for item in items if item["id"] not in completed]
+
+    # Group duplicates so each distinct question runs once
+    groups: Dict[str, List[Dict]] = {}
+    for item in pending:
+        groups.setdefault(normalize_question(item["question"]), []).append(item)
+
+    agent_executor, system_message, api_status = await ainitialize_agent()
+    tools = get_tool_specs()
+    semaphore = asyncio.Semaphore(parallel)
+    latencies = []
+    failures = 0
+    fast_path_answers = 0
+    totals = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+
+    mode = "a" if resume else "w"
+    with open(output_path, mode, encoding="utf-8") as out:
+        async def solve(group: List[Dict]):
+            nonlocal failures, fast_path_answers
+            first = group[0]
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    # The fast path may call a SymPy tool, which waits on the process pool
+                    called = await asyncio.to_thread(call_fast_path, first["question"], tools)
+                    if called is not None:
+                        name, _, tool_result = called
+                        result = {"answer": render_answer(*called), "usage": {key: 0 for key in totals},
+                                  "tool_calls": [name], "tool_results": [{"tool": name, **tool_result.to_dict()}],
+                                  "llm_calls": 0, "error": None}
+                        fast_path_answers += len(group)
+                    else:
+                        state = await ainvoke_answer(agent_executor, system_message, first["question"])
+                        result = {"answer": answer_text(state["messages"]), **summarize_run(state["messages"]),
+                                  "error": None}
+                except Exception as e:
+                    result = {"answer": None, "usage": None, "tool_calls": [], "tool_results": [], "llm_calls": 0,
+                              "error": str(e)}
+                latency = time.perf_counter() - start
+
+            if result["error"]:
+                failures += len(group)
+            else:
+                latencies.append(latency)
+                for key in totals:
+                    totals[key] += result["usage"][key]
+            for item in group:
+                record = {**item, **result, "latency_s": round(latency, 4)}
+                if item is not first:
+                    record["duplicate_of"] = first["id"]
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+
+        await asyncio.gather(*(solve(group) for group in groups.values()))
+
+    return {
+        "api_status": api_status,
+        "items": len(items),
+        "skipped": len(items) - len(pending),
+        "unique_questions": len(groups),
+        "answered": len(pending) - failures,
+        "fast_path": fast_path_answers,
+        "failed": failures,
+        "latency_p50_s": statistics.median(latencies) if latencies else None,
+        "latency_max_s": max(latencies) if latencies else None,
+        "tokens": totals,
+    }
+
+
+def add_arguments(parser):
+    """Arguments of the `batch` subcommand."""
+    parser.add_argument("input", type=Path, help="JSONL or CSV file of questions")
+    parser.add_argument("-o", "--output", type=Path, help="JSONL file for results (default: <input>.answers.jsonl)")
+    parser.add_argument("-p", "--parallel", type=int, default=8, help="questions answered at once (default: 8)")
+    parser.add_argument("--no-resume", action="store_true", help="start over instead of skipping answered items")
+
+
+def run_from_args(args):
+    """Run the `batch` subcommand and print a summary."""
+    output = args.output or args.input.with_suffix(".answers.jsonl")
+    summary = asyncio.run(run_batch(args.input, output, args.parallel, resume=not args.no_resume))
+    print(summary["api_status"])
+    print(f"Items: {summary['items']} ({summary['skipped']} already answered, "
+          f"{summary['unique_questions']} distinct questions run)")
+    print(f"Answered: {summary['answered']} ({summary['fast_path']} by the fast path), failed: {summary['failed']}")
+    if summary["latency_p50_s"] is not None:
+        print(f"Latency: p50 {summary['latency_p50_s']:.2f}s, max {summary['latency_max_s']:.2f}s")
+    tokens = summary["tokens"]
+    print(f"Tokens: {tokens['input_tokens']} input, {tokens['output_tokens']} output")
+    print(f"Results written to {output}")
@@ -0,0 +1,114 @@
+"""Fixed corpus of exam questions with the tool calls a model makes for them.
+
+Every tool in get_all_tools() appears at least once. The calls double as the
+transcripts replayed by the mock LLM server and as the inputs of the per-tool
+microbenchmarks.
+"""
+
+CORPUS = [
+    # Basic arithmetic
+    {"question": "What is 17 multiplied by 23?",
+     "calls": [{"name": "calculator", "args": {"a": 17, "b": 23, "operation": "multiply"}}]},
+    {"question": "What is 2 raised to the power of 10?",
+     "calls": [{"name": "power", "args": {"base": 2, "exponent": 10}}]},
+    {"question": "Find the square root of 144",
+     "calls": [{"name": "square_root", "args": {"number": 144}}]},
+    {"question": "Work out (3.5^2 + 4*7) / sqrt(12) and explain each step",
+     "calls": [{"name": "evaluate_expression", "args": {"expression": "(3.5^2 + 4*7) / sqrt(12)"}}]},
+    # Algebra
+    {"question": "Solve 2*x + 5 = 13",
+     "calls": [{"name": "solve_linear_equation", "args": {"equation": "2*x + 5 = 13"}}]},
+    {"question": "Solve the quadratic equation x^2 - 5x + 6 = 0",
+     "calls": [{"name": "solve_quadratic_equation", "args": {"a": 1, "b": -5, "c": 6}}]},
+    {"question": "Factor x^2 + 5x + 6",
+     "calls": [{"name": "factor_expression", "args": {"expression": "x^2 + 5*x + 6"}}]},
+    {"question": "Expand (x + 2)(x + 3)",
+     "calls": [{"name": "expand_expression", "args": {"expression": "(x + 2)*(x + 3)"}}]},
+    # Geometry
+    {"question": "Find the area of a rectangle 8 cm long and 5 cm wide",
+     "calls": [{"name": "area_rectangle", "args": {"length": 8, "width": 5}}]},
+    {"question": "Find the area of a triangle with base 10 and height 6",
+     "calls": [{"name": "area_triangle", "args": {"base": 10, "height": 6}}]},
+    {"question": "What is the area of a circle with radius 7?",
+     "calls": [{"name": "area_circle", "args": {"radius": 7}}]},
+    {"question": "Find the circumference of a circle with radius 4",
+     "calls": [{"name": "circumference_circle", "args": {"radius": 4}}]},
+    {"question": "Find the volume of a cylinder with radius 3 and height 10",
+     "calls": [{"name": "volume_cylinder", "args": {"radius": 3, "height": 10}}]},
+    {"question": "Find the volume of a sphere with radius 6",
+     "calls": [{"name": "volume_sphere", "args": {"radius": 6}}]},
+    {"question": "Find the volume of a cone with radius 3 and height 4",
+     "calls": [{"name": "volume_cone", "args": {"radius": 3, "height": 4}}]},
+    {"question": "A right triangle has legs 3 and 4. Find the hypotenuse.",
+     "calls": [{"name": "pythagorean_theorem", "args": {"a": 3, "b": 4}}]},
+    {"question": "Make a table of the areas of circles with radius 1 to 5",
+     "calls": [{"name": "area_circle_table", "args": {"radii": [1, 2, 3, 4, 5]}}]},
+    {"question": "Tabulate the volumes of cylinders of height 10 with radius 1, 2 and 3",
+     "calls": [{"name": "volume_cylinder_table", "args": {"radii": [1, 2, 3], "heights": [10]}}]},
+    # Trigonometry
+    {"question": "Find sin(30)", "calls": [{"name": "sin", "args": {"angle_degrees": 30}}]},
+    {"question": "Find cos(60)", "calls": [{"name": "cos", "args": {"angle_degrees": 60}}]},
+    {"question": "Find tan(45)", "calls": [{"name": "tan", "args": {"angle_degrees": 45}}]},
+    {"question": "Find the angle whose sine is 0.5", "calls": [{"name": "arcsin", "args": {"value": 0.5}}]},
+    {"question": "Find the angle whose cosine is 0.5", "calls": [{"name": "arccos", "args": {"value": 0.5}}]},
+    {"question": "Find the angle whose tangent is 1", "calls": [{"name": "arctan", "args": {"value": 1}}]},
+    {"question": "Make a table of sine values from 0 to 90 degrees in steps of 15",
+     "calls": [{"name": "sin_table", "args": {"start": 0, "stop": 90, "step": 15}}]},
+    {"question": "Make a table of cosine values for 0, 30, 45, 60 and 90 degrees",
+     "calls": [{"name": "cos_table", "args": {"angles_degrees": [0, 30, 45, 60, 90]}}]},
+    {"question": "Make a table of tangent values from 0 to 60 degrees in steps of 10",
+     "calls": [{"name": "tan_table", "args": {"start": 0, "stop": 60, "step": 10}}]},
+    # Logarithms
+    {"question": "What is log base 2 of 32?", "calls": [{"name": "logarithm", "args": {"base": 2, "number": 32}}]},
+    {"question": "Find the natural log of 10", "calls": [{"name": "natural_log", "args": {"number": 10}}]},
+    {"question": "Find log10 of 1000", "calls": [{"name": "log10", "args": {"number": 1000}}]},
+    {"question": "Calculate the exponential e^2", "calls": [{"name": "exponential", "args": {"power": 2}}]},
+    # Statistics
+    {"question": "Find the mean of 10, 20, 30, 40 and 50",
+     "calls": [{"name": "mean", "args": {"numbers": [10, 20, 30, 40, 50]}}]},
+    {"question": "Find the median of 3, 1, 4, 1, 5, 9, 2",
+     "calls": [{"name": "median", "args": {"numbers": [3, 1, 4, 1, 5, 9, 2]}}]},
+    {"question": "Find the mode of 2, 3, 3, 5, 7, 3, 2",
+     "calls": [{"name": "mode", "args": {"numbers": [2, 3, 3, 5, 7, 3, 2]}}]},
+    {"question": "Find the standard deviation of 2, 4, 4, 4, 5, 5, 7, 9",
+     "calls": [{"name": "standard_deviation", "args": {"numbers": [2, 4, 4, 4, 5, 5, 7, 9]}}]},
+    {"question": "Find the variance of 1, 2, 3, 4, 5",
+     "calls": [{"name": "variance", "args": {"numbers": [1, 2, 3, 4, 5]}}]},
+    {"question": "Describe the data 12, 15, 11, 18, 15, 20, 14",
+     "calls": [{"name": "describe_statistics", "args": {"numbers": [12, 15, 11, 18, 15, 20, 14]}}]},
+    # Sequences
+    {"question": "Find the 10th term of an arithmetic sequence with first term 5 and common difference 3",
+     "calls": [{"name": "arithmetic_sequence_nth_term", "args": {"first_term": 5, "common_difference": 3, "n": 10}}]},
+    {"question": "Find the sum of the first 20 terms of an arithmetic sequence from 1 to 39",
+     "calls": [{"name": "arithmetic_sequence_sum", "args": {"first_term": 1, "last_term": 39, "n": 20}}]},
+    {"question": "Find the 6th term of a geometric sequence with first term 3 and common ratio 2",
+     "calls": [{"name": "geometric_sequence_nth_term", "args": {"first_term": 3, "common_ratio": 2, "n": 6}}]},
+    {"question": "Find the sum of the first 8 terms of a geometric sequence with first term 1 and ratio 3",
+     "calls": [{"name": "geometric_sequence_sum", "args": {"first_term": 1, "common_ratio": 3, "n": 8}}]},
+    {"question": "List the first 10 terms of the arithmetic sequence 4, 7, 10, ...",
+     "calls": [{"name": "arithmetic_sequence_terms", "args": {"first_term": 4, "common_difference": 3, "n_terms": 10}}]},
+    {"question": "List the first 8 terms of the geometric sequence 2, 6, 18, ...",
+     "calls": [{"name": "geometric_sequence_terms", "args": {"first_term": 2, "common_ratio": 3, "n_terms": 8}}]},
+    # Percentages and ratios
+    {"question": "What percentage is 45 of 60?", "calls": [{"name": "percentage", "args": {"part": 45, "whole": 60}}]},
+    {"question": "What is 15% of 80?", "calls": [{"name": "percentage_of", "args": {"percentage": 15, "number": 80}}]},
+    {"question": "Simplify the ratio 12:18", "calls": [{"name": "ratio_simplify", "args": {"a": 12, "b": 18}}]},
+    # Several tools in one turn
+    {"question": "Find the area and the circumference of a circle with radius 5",
+     "calls": [{"name": "area_circle", "args": {"radius": 5}},
+               {"name": "circumference_circle", "args": {"radius": 5}}]},
+    {"question": "Find the mean and the standard deviation of 6, 8, 10, 12",
+     "calls": [{"name": "mean", "args": {"numbers": [6, 8, 10, 12]}},
+               {"name": "standard_deviation", "args": {"numbers": [6, 8, 10, 12]}}]},
+]
+
+TRANSCRIPTS = {item["question"]: item["calls"] for item in CORPUS}
+
+
+def tool_inputs():
+    """One sample input per tool name (the first time the tool appears in the corpus)."""
+    inputs = {}
+    for item in CORPUS:
+        for call in item["calls"]:
+            inputs.setdefault(call["name"], call["args"])
+    return inputs
@@ -0,0 +1,104 @@
+"""Failover and hedging of the model router against two local mock providers.
+
+Starts two mock OpenAI-compatible servers standing in for OpenAI and
+OpenRouter, points create_model() at both, and answers the benchmark corpus
+in three scenarios:
+- failures: the fast provider fails a share of its requests with 503,
+- slow tail: the fast provider answers some requests only after a long pause,
+- outage: the fast provider fails every request.
+
+Each scenario runs with the router (both providers) and with OpenAI alone (the
+previous behaviour, where the client's own retries are the only safeguard),
+once invoking the agent and once streaming it (as the web interface and the
+API server do, where hedging races the first token), and reports answered
+questions, latency percentiles and the router's per-provider statistics.
+
+    python -m benchmarks.failover
+    python -m benchmarks.failover --questions 20 --hedge-delay 0.2 --mode stream
+"""
+import argparse
+import os
+import time
+
+from benchmarks.corpus import CORPUS, TRANSCRIPTS
+from benchmarks.mock_llm import MockLLMServer
+
+SCENARIOS = {
+    "failures": dict(fail_rate=0.3, fail_status=503),
+    "slow tail": dict(slow_rate=0.1, slow_latency=2.0),
+    "outage": dict(fail_rate=1.0, fail_status=503),
+}
+MODES = ("invoke", "stream")
+
+
+def answer_corpus(questions: int, routed: bool, hedge_delay: float, stream: bool = False):
+    """Answer the first `questions` corpus questions; returns (latencies, failures, model)."""
+    from langchain_core.messages import SystemMessage
+
+    from main import build_messages, create_model, get_tool_groups, load_system_prompt
+    from tool_router import build_agent
+
+    if not routed:
+        os.environ.pop("OPENROUTER_API_KEY", None)
+    model, _ = create_model()
+    if routed:
+        model.hedge_delay = hedge_delay
+    agent_executor = build_agent(model, get_tool_groups())
+    system_message = SystemMessage(content=load_system_prompt())
+
+    latencies = []
+    failures = 0
+    for item in CORPUS[:questions]:
+        start = time.perf_counter()
+        inputs = {"messages": build_messages(system_message, item["question"])}
+        try:
+            if stream:
+                for _ in agent_executor.stream(inputs, stream_mode="messages"):
+                    pass
+            else:
+                agent_executor.invoke(inputs)
+        except Exception:
+            failures += 1
+            continue
+        latencies.append(time.perf_counter() - start)
+    return latencies, failures, model
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--questions", type=int, default=len(CORPUS), help="corpus questions per run")
+    parser.add_argument("--latency", type=float, default=0.02, help="latency of the fast provider (default: 0.02)")
+    parser.add_argument("--backup-latency", type=float, default=0.06,
+                        help="latency of the backup provider (default: 0.06)")
+    parser.add_argument("--hedge-delay", type=float, default=0.3, help="router hedge delay (default: 0.3)")
+    parser.add_argument("--mode", choices=MODES, action="append",
+                        help="invoke or stream the agent (default: both)")
+    args = parser.parse_args()
+
+    from instrumentation import percentile
+
+    os.environ.setdefault("MATH_AGENT_SYMBOLIC_WORKERS", "0")
+    os.environ["MATH_AGENT_CACHE"] = "0"
+    print(f"{'scenario':<10} {'mode':<7} {'setup':<8} {'answered':>9} {'p50 (s)':>8} {'p99 (s)':>8}   provider stats")
+    for scenario, faults in SCENARIOS.items():
+        for mode, routed in ((mode, routed) for mode in args.mode or MODES for routed in (False, True)):
+            with MockLLMServer(latency=args.latency, transcripts=TRANSCRIPTS, seed=1, **faults) as primary, \
+                    MockLLMServer(latency=args.backup_latency, transcripts=TRANSCRIPTS) as backup:
+                os.environ["OPENAI_API_KEY"] = "mock"
+                os.environ["OPENAI_BASE_URL"] = primary.url
+                os.environ["OPENROUTER_API_KEY"] = "mock"
+                os.environ["OPENROUTER_BASE_URL"] = backup.url
+                latencies, failures, model = answer_corpus(args.questions, routed, args.hedge_delay, mode == "stream")
+
+            answered = f"{len(latencies)}/{len(latencies) + failures}"
+            p50 = f"{percentile(latencies, 50):.3f}" if latencies else "-"
+            p99 = f"{percentile(latencies, 99):.3f}" if latencies else "-"
+            stats = ""
+            if routed:
+                stats = ", ".join(f"{s['backend']} {s['requests']} req/{s['failures']} failed"
+                                  for s in model.stats())
+            print(f"{scenario:<10} {mode:<7} {'router' if routed else 'openai':<8} {answered:>9} {p50:>8} {p99:>8}   {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Load test of the async agent path against the local mock LLM server.
+
+Runs batches of concurrent sessions through ainitialize_agent()/ainvoke_answer()
+and reports throughput per concurrency level. With a fixed per-request model
+latency, throughput should grow roughly linearly with the number of sessions
+until the concurrency limit is reached.
+
+    python -m benchmarks.load_test --latency 0.2 --levels 1 2 4 8 16
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from benchmarks.mock_llm import MockLLMServer
+
+QUESTIONS = [
+    "What is the area of a circle with radius 7?",
+    "Factor x^2 - 9",
+    "What is 17 multiplied by 23?",
+    "Find sin(45)",
+]
+
+# Every question makes one tool call, so each session is two model round-trips
+TRANSCRIPTS = {
+    QUESTIONS[0]: [{"name": "area_circle", "args": {"radius": 7}}],
+    QUESTIONS[1]: [{"name": "factor_expression", "args": {"expression": "x^2 - 9"}}],
+    QUESTIONS[2]: [{"name": "calculator", "args": {"a": 17, "b": 23, "operation": "multiply"}}],
+    QUESTIONS[3]: [{"name": "sin", "args": {"angle_degrees": 45}}],
+}
+
+
+async def run_level(agent_executor, system_message, sessions: int, per_session: int):
+    from async_agent import ainvoke_answer
+
+    latencies = []
+
+    async def session(index: int):
+        for i in range(per_session):
+            question = QUESTIONS[(index + i) % len(QUESTIONS)]
+            start = time.perf_counter()
+            await ainvoke_answer(agent_executor, system_message, question)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(session(i) for i in range(sessions)))
+    elapsed = time.perf_counter() - start
+    return len(latencies) / elapsed, statistics.median(latencies), max(latencies)
+
+
+async def main(latency: float, levels, per_session: int):
+    with MockLLMServer(latency=latency, transcripts=TRANSCRIPTS) as mock:
+        os.environ["OPENAI_API_KEY"] = "mock"
+        os.environ["OPENAI_BASE_URL"] = mock.url
+
+        from async_agent import ainitialize_agent, set_max_concurrency
+
+        set_max_concurrency(max(levels))
+        agent_executor, system_message, _ = await ainitialize_agent()
+
+        print(f"Mock model latency: {latency * 1000:.0f} ms per request, {per_session} questions per session")
+        print(f"{'sessions':>8} {'questions/s':>12} {'p50 (s)':>8} {'max (s)':>8} {'speed-up':>9}")
+        baseline = None
+        for sessions in levels:
+            throughput, p50, worst = await run_level(agent_executor, system_message, sessions, per_session)
+            baseline = baseline or throughput
+            print(f"{sessions:>8} {throughput:>12.2f} {p50:>8.3f} {worst:>8.3f} {throughput / baseline:>8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.2, help="mock model latency in seconds")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 4, 8, 16], help="concurrent sessions")
+    parser.add_argument("--per-session", type=int, default=4, help="questions asked by each session")
+    args = parser.parse_args()
+    asyncio.run(main(args.latency, args.levels, args.per_session))
@@ -0,0 +1,228 @@
+"""Local OpenAI-compatible chat completions server for load tests and benchmarks.
+
+The server never calls a real model. For each request it:
+- replies with the tool calls recorded for the question in `transcripts`
+  (question -> list of {"name": ..., "args": {...}}) on the first turn,
+- restates the tool results once the conversation ends with tool messages,
+- otherwise answers with a short canned text.
+
+Latency (constant, or a slow tail) and failures can be injected to exercise
+timeouts, retries, hedging and failover.
+
+    python -m benchmarks.mock_llm --port 8000 --latency 0.2
+    OPENAI_API_KEY=mock OPENAI_BASE_URL=http://127.0.0.1:8000/v1 python main.py
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+
+def estimate_tokens(payload) -> int:
+    """Rough token count (about four characters per token)."""
+    return max(1, len(json.dumps(payload, ensure_ascii=False)) // 4)
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # Clients dropping a connection (the losing stream of a hedged request, a retry) is expected
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class MockLLMServer:
+    """OpenAI-compatible chat completions server running in a background thread."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 transcripts: Optional[Dict[str, List[dict]]] = None, fail_rate: float = 0.0,
+                 fail_status: int = 500, record: bool = False, seed: Optional[int] = None,
+                 slow_rate: float = 0.0, slow_latency: float = 0.0):
+        self.latency = latency
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.transcripts = {key.strip().lower(): calls for key, calls in (transcripts or {}).items()}
+        self.fail_rate = fail_rate
+        self.fail_status = fail_status
+        self.record = record
+        self.requests: List[dict] = []
+        self.request_count = 0
+        self.failure_count = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = _HTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "MockLLMServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def reply(self, payload: dict) -> dict:
+        """Build the assistant message (content and tool calls) for a request."""
+        messages = payload.get("messages", [])
+        trailing_tools = []
+        for message in reversed(messages):
+            if message.get("role") != "tool":
+                break
+            trailing_tools.insert(0, message.get("content", ""))
+        if trailing_tools:
+            return {"content": "Here is the result:\n\n" + "\n".join(str(c) for c in trailing_tools), "tool_calls": []}
+
+        question = ""
+        for message in reversed(messages):
+            if message.get("role") == "user":
+                question = message.get("content", "")
+                if isinstance(question, list):
+                    question = " ".join(part.get("text", "") for part in question if isinstance(part, dict))
+                break
+        calls = self.transcripts.get(question.strip().lower()) if payload.get("tools") else None
+        if calls:
+            tool_calls = [
+                {
+                    "id": f"call_{i}",
+                    "type": "function",
+                    "function": {"name": call["name"], "arguments": json.dumps(call.get("args", {}))},
+                }
+                for i, call in enumerate(calls)
+            ]
+            return {"content": "", "tool_calls": tool_calls}
+        return {"content": f"This is a mock answer to: {question}", "tool_calls": []}
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status: int, body: dict):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path.rstrip("/").endswith("/models"):
+                    self._send_json(200, {"object": "list", "data": [{"id": "mock", "object": "model"}]})
+                else:
+                    self._send_json(404, {"error": {"message": "not found"}})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                with server._lock:
+                    server.request_count += 1
+                    if server.record:
+                        server.requests.append(payload)
+                    failed = server._random.random() < server.fail_rate
+                    if failed:
+                        server.failure_count += 1
+                    latency = server.latency
+                    if server._random.random() < server.slow_rate:
+                        latency = server.slow_latency
+                if latency:
+                    time.sleep(latency)
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send_json(404, {"error": {"message": "not found"}})
+                    return
+                if failed:
+                    self._send_json(server.fail_status, {"error": {"message": "injected failure", "type": "mock_error"}})
+                    return
+
+                reply = server.reply(payload)
+                usage = {
+                    "prompt_tokens": estimate_tokens([payload.get("messages"), payload.get("tools")]),
+                    "completion_tokens": estimate_tokens(reply),
+                }
+                usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+                finish_reason = "tool_calls" if reply["tool_calls"] else "stop"
+                base = {"id": f"chatcmpl-mock-{server.request_count}", "created": int(time.time()),
+                        "model": payload.get("model", "mock")}
+
+                if not payload.get("stream"):
+                    message = {"role": "assistant", "content": reply["content"] or None}
+                    if reply["tool_calls"]:
+                        message["tool_calls"] = reply["tool_calls"]
+                    self._send_json(200, {
+                        **base, "object": "chat.completion",
+                        "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+                        "usage": usage,
+                    })
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+
+                def send(delta, finish=None, extra=None):
+                    chunk = {**base, "object": "chat.completion.chunk",
+                             "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]}
+                    chunk.update(extra or {})
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+
+                send({"role": "assistant", "content": ""})
+                # Stream the text word by word, like a real model emitting tokens
+                for word in reply["content"].split(" ") if reply["content"] else []:
+                    send({"content": word + " "})
+                for i, call in enumerate(reply["tool_calls"]):
+                    send({"tool_calls": [{"index": i, **call}]})
+                send({}, finish_reason)
+                if (payload.get("stream_options") or {}).get("include_usage"):
+                    self.wfile.write(f"data: {json.dumps({**base, 'object': 'chat.completion.chunk', 'choices': [], 'usage': usage})}\n\n".encode("utf-8"))
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+                self.close_connection = True
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local mock OpenAI-compatible server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to wait before each reply")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of requests that fail")
+    parser.add_argument("--fail-status", type=int, default=500, help="HTTP status of injected failures")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="fraction of requests answered after --slow-latency")
+    parser.add_argument("--slow-latency", type=float, default=0.0, help="seconds to wait before a slow reply")
+    parser.add_argument("--transcripts", help="JSON file mapping questions to recorded tool calls")
+    args = parser.parse_args()
+
+    transcripts = None
+    if args.transcripts:
+        with open(args.transcripts, "r", encoding="utf-8") as f:
+            transcripts = json.load(f)
+    mock = MockLLMServer(args.host, args.port, args.latency, transcripts, args.fail_rate, args.fail_status,
+                         slow_rate=args.slow_rate, slow_latency=args.slow_latency)
+    print(f"Mock LLM server listening on {mock.url}")
+    try:
+        mock._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
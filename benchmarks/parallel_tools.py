@@ -0,0 +1,89 @@
+"""Tool calls of one model turn run concurrently, and their results keep call order.
+
+A mock model answers a question with several tool calls in one turn; each tool
+sleeps for --tool-time seconds, standing in for a slow SymPy call. The turn is
+timed with tool concurrency 1 (one call after the other) and with
+MATH_AGENT_TOOL_CONCURRENCY; the concurrent turn should take about as long as
+the slowest call instead of the sum of all of them.
+
+Exits with status 1 if the concurrent turn takes longer than 1.5x the slowest
+call, or if the tool results come back in a different order than the calls.
+
+    python -m benchmarks.parallel_tools
+    python -m benchmarks.parallel_tools --calls 6 --tool-time 0.5
+"""
+import argparse
+import sys
+import time
+
+from benchmarks.mock_llm import MockLLMServer
+
+QUESTION = "Run every slow tool"
+
+
+def slow_tools(count: int, seconds: float) -> list:
+    """`count` tools that each wait `seconds` before returning their name."""
+    from langchain_core.tools import StructuredTool
+
+    def make(index: int):
+        def slow(x: int) -> str:
+            time.sleep(seconds)
+            return f"slow_{index}({x})"
+        return StructuredTool.from_function(slow, name=f"slow_{index}", description=f"Slow tool number {index}.")
+
+    return [make(i) for i in range(count)]
+
+
+def run_turn(agent, concurrency: int):
+    """Seconds to answer QUESTION, and the contents of the tool messages in order."""
+    from langchain_core.messages import HumanMessage, ToolMessage
+
+    start = time.perf_counter()
+    result = agent.invoke({"messages": [HumanMessage(content=QUESTION)]}, config={"max_concurrency": concurrency})
+    elapsed = time.perf_counter() - start
+    return elapsed, [m.content for m in result["messages"] if isinstance(m, ToolMessage)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=4, help="tool calls in the turn (default: 4)")
+    parser.add_argument("--tool-time", type=float, default=0.3, help="seconds per tool call (default: 0.3)")
+    parser.add_argument("--rounds", type=int, default=3, help="timed turns per setting (default: 3)")
+    args = parser.parse_args()
+
+    tools = slow_tools(args.calls, args.tool_time)
+    calls = [{"name": t.name, "args": {"x": i}} for i, t in enumerate(tools)]
+    expected = [f"slow_{i}({i})" for i in range(args.calls)]
+
+    from langchain_openai import ChatOpenAI
+
+    from tool_router import TOOL_CONCURRENCY, compile_agent
+
+    failed = False
+    with MockLLMServer(transcripts={QUESTION: calls}) as server:
+        model = ChatOpenAI(model="mock", api_key="mock", base_url=server.url)
+        agent = compile_agent(model, tools)
+        run_turn(agent, TOOL_CONCURRENCY)  # warm-up: connections, graph compilation
+        print(f"{args.calls} tool calls of {args.tool_time:g} s each "
+              f"(sum {args.calls * args.tool_time:.2f} s, slowest {args.tool_time:.2f} s)")
+        for concurrency in (1, TOOL_CONCURRENCY):
+            times = []
+            for _ in range(args.rounds):
+                elapsed, results = run_turn(agent, concurrency)
+                times.append(elapsed)
+                if results != expected:
+                    print(f"  results out of order: {results}")
+                    failed = True
+            best = min(times)
+            print(f"  concurrency {concurrency:>2}: {best:.3f} s per turn")
+            if concurrency > 1 and best > 1.5 * args.tool_time:
+                failed = True
+
+    if failed:
+        print("FAIL: tool calls did not run concurrently in call order")
+        sys.exit(1)
+    print("OK: the turn took about as long as its slowest call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Input tokens per model request: every tool with full or compact descriptions, or routed tool subsets.
+
+Runs the same questions through the agent in each mode against the local mock
+LLM server, which records every request payload, and reports:
+- input tokens of each request (tiktoken count of the serialized tools and
+  messages, as sent over the wire),
+- the size of the static prefix (tool schemas + system prompt) that
+  provider-side prompt caching can reuse,
+- how many distinct prefixes were sent (one when the prefix is byte-identical
+  across requests; with routing, one per tool subset in use).
+
+    python -m benchmarks.prompt_tokens
+"""
+import hashlib
+import json
+import os
+
+from benchmarks.load_test import QUESTIONS, TRANSCRIPTS
+from benchmarks.mock_llm import MockLLMServer
+
+
+def _serialized(payload) -> str:
+    return json.dumps(payload, ensure_ascii=False)
+
+
+def record_requests(mock: MockLLMServer, mode: str):
+    """Answer every question in the given mode ("full", "compact" or "routed"); return the recorded payloads."""
+    from langchain_core.messages import SystemMessage
+
+    from agent_loop import build_react_graph
+    from main import build_messages, create_model, get_all_tools, get_tool_groups, load_system_prompt
+    from tool_router import RoutedAgent
+    from tool_schemas import bind_tools
+
+    model, _ = create_model()
+    if mode == "routed":
+        agent_executor = RoutedAgent(model, get_tool_groups())
+    else:
+        tools = get_all_tools()
+        agent_executor = build_react_graph(bind_tools(model, tools, compact=mode == "compact"), tools)
+    system_message = SystemMessage(content=load_system_prompt())
+
+    mock.requests.clear()
+    for question in QUESTIONS:
+        agent_executor.invoke({"messages": build_messages(system_message, question)})
+    return list(mock.requests)
+
+
+def analyze(requests):
+    """Per-request input and static prefix tokens, and the number of distinct prefixes sent."""
+    from memory import count_tokens
+
+    prefixes = set()
+    input_tokens = []
+    prefix_tokens = []
+    for payload in requests:
+        tools = _serialized(payload.get("tools", []))
+        system = _serialized(payload["messages"][0])
+        prefixes.add(hashlib.sha256((tools + system).encode("utf-8")).hexdigest())
+        prefix_tokens.append(count_tokens(tools) + count_tokens(system))
+        input_tokens.append(count_tokens(tools) + count_tokens(_serialized(payload["messages"])))
+    return input_tokens, prefix_tokens, len(prefixes)
+
+
+MODES = ("full", "compact", "routed")
+
+
+def main():
+    os.environ.setdefault("MATH_AGENT_SYMBOLIC_WORKERS", "0")
+    with MockLLMServer(transcripts=TRANSCRIPTS, record=True) as mock:
+        os.environ["OPENAI_API_KEY"] = "mock"
+        os.environ["OPENAI_BASE_URL"] = mock.url
+        results = {mode: analyze(record_requests(mock, mode)) for mode in MODES}
+
+    full = results["full"][0]
+    print(f"{'request':>7} " + " ".join(f"{mode:>8}" for mode in MODES))
+    for i in range(len(full)):
+        print(f"{i + 1:>7} " + " ".join(f"{results[mode][0][i]:>8}" for mode in MODES))
+    print()
+    print(f"{'mode':>8} {'mean input':>11} {'saved':>6} {'prefix':>7} {'cacheable':>10} {'prefixes':>9}")
+    baseline = sum(full) / len(full)
+    for mode in MODES:
+        input_tokens, prefix_tokens, distinct = results[mode]
+        mean_input = sum(input_tokens) / len(input_tokens)
+        mean_prefix = sum(prefix_tokens) / len(prefix_tokens)
+        print(f"{mode:>8} {mean_input:>11.0f} {1 - mean_input / baseline:>6.0%} {mean_prefix:>7.0f} "
+              f"{mean_prefix / mean_input:>10.0%} {distinct:>9}")
+
+
+if __name__ == "__main__":
+    main()
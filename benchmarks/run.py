@@ -0,0 +1,212 @@
+"""Offline benchmark suite: agent end to end against the mock LLM server, and every tool on its own.
+
+Reports
+- startup: time to import main and to run initialize_agent(), and the resident
+  memory afterwards (measured in a fresh interpreter),
+- end to end: latency percentiles of the question corpus run through
+  initialize_agent() against the mock server, model calls (and those avoided
+  by the step and token budgets), tool calls, and
+  whether each question called the tools its transcript expects,
+- tools: time per call of each @tool function, called directly and through
+  the LangChain tool interface (argument validation included).
+
+Results can be saved with --json and compared with a saved run with
+--baseline; tools slower than the baseline by more than --tolerance make the
+run exit with status 1.
+
+    python -m benchmarks.run
+    python -m benchmarks.run --rounds 5 --latency 0.05 --json before.json
+    python -m benchmarks.run --skip-agent --baseline before.json
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from collections import Counter
+
+from benchmarks.corpus import CORPUS, TRANSCRIPTS, tool_inputs
+from benchmarks.mock_llm import MockLLMServer
+
+STARTUP_SCRIPT = """
+import json, resource, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+main.initialize_agent()
+initialized = time.perf_counter()
+print(json.dumps({
+    "import_s": imported - start,
+    "initialize_s": initialized - imported,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}))
+"""
+
+
+def _rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _percentile(values, q):
+    from instrumentation import percentile
+    return percentile(values, q)
+
+
+def measure_startup(env: dict) -> dict:
+    """Import and initialization time and peak memory of a fresh interpreter."""
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT], cwd=project_root, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run_corpus(rounds: int) -> dict:
+    """Answer the corpus `rounds` times through initialize_agent(); latencies come from the tracer."""
+    from instrumentation import trace_request
+    from main import build_messages, initialize_agent
+
+    agent_executor, system_message, _ = initialize_agent()
+    rss_before = _rss_mb()
+    traces = []
+    mismatches = set()
+    for _ in range(rounds):
+        for item in CORPUS:
+            with trace_request(item["question"]) as tracer:
+                agent_executor.invoke({"messages": build_messages(system_message, item["question"])},
+                                      config={"callbacks": [tracer]})
+            trace = tracer.trace
+            traces.append(trace)
+            called = sorted(span.name for span in trace.tool_calls)
+            if called != sorted(call["name"] for call in item["calls"]):
+                mismatches.add(item["question"])
+
+    latencies = [trace.duration_s for trace in traces]
+    return {
+        "questions": len(traces),
+        "latency_p50_s": _percentile(latencies, 50),
+        "latency_p90_s": _percentile(latencies, 90),
+        "latency_p99_s": _percentile(latencies, 99),
+        "latency_max_s": max(latencies),
+        "llm_time_share": sum(t.llm_s for t in traces) / sum(latencies),
+        "tool_time_share": sum(t.tool_s for t in traces) / sum(latencies),
+        "llm_calls": sum(t.iterations for t in traces),
+        "llm_calls_avoided": sum(sum(t.llm_calls_avoided.values()) for t in traces),
+        "tool_calls": dict(Counter(span.name for t in traces for span in t.tool_calls)),
+        "mismatched_questions": sorted(mismatches),
+        "rss_growth_mb": _rss_mb() - rss_before,
+        "peak_rss_mb": _rss_mb(),
+    }
+
+
+def _time_per_call(fn, min_time: float) -> float:
+    """Best of three timings of `fn`, each repeated for at least `min_time` seconds."""
+    best = float("inf")
+    for _ in range(3):
+        calls = 0
+        start = time.perf_counter()
+        elapsed = 0.0
+        while elapsed < min_time:
+            fn()
+            calls += 1
+            elapsed = time.perf_counter() - start
+        best = min(best, elapsed / calls)
+    return best
+
+
+def microbenchmark_tools(min_time: float) -> dict:
+    """Seconds per call of every tool: the plain function and tool.invoke()."""
+    from main import get_all_tools
+    from tool_registry import registered_functions
+
+    functions = registered_functions()
+    inputs = tool_inputs()
+    results = {}
+    for t in get_all_tools():
+        func = functions[t.name]
+        args = inputs[t.name]
+        func(**args)  # warm caches and worker processes before timing
+        results[t.name] = {
+            "direct_s": _time_per_call(lambda: func(**args), min_time),
+            "invoke_s": _time_per_call(lambda: t.invoke(args), min_time),
+        }
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Tools whose direct call got slower than `tolerance` times the baseline."""
+    regressions = []
+    for name, timing in results.get("tools", {}).items():
+        before = baseline.get("tools", {}).get(name)
+        if before and timing["direct_s"] > tolerance * before["direct_s"]:
+            regressions.append((name, before["direct_s"], timing["direct_s"]))
+    return regressions
+
+
+def print_report(results: dict):
+    startup = results.get("startup")
+    if startup:
+        print("Startup")
+        print(f"  import main        {startup['import_s']:.3f} s")
+        print(f"  initialize_agent() {startup['initialize_s']:.3f} s")
+        print(f"  peak memory        {startup['rss_mb']:.0f} MB")
+    agent = results.get("agent")
+    if agent:
+        print(f"\nEnd to end ({agent['questions']} questions, mock model latency {results['latency']:.3f} s)")
+        print(f"  latency p50 {agent['latency_p50_s']:.3f} s, p90 {agent['latency_p90_s']:.3f} s, "
+              f"p99 {agent['latency_p99_s']:.3f} s, max {agent['latency_max_s']:.3f} s")
+        print(f"  time in model {agent['llm_time_share']:.0%}, in tools {agent['tool_time_share']:.0%}")
+        print(f"  model calls {agent['llm_calls']} ({agent.get('llm_calls_avoided', 0)} avoided), "
+              f"tool calls {sum(agent['tool_calls'].values())} "
+              f"({len(agent['tool_calls'])} distinct tools)")
+        print(f"  memory: peak {agent['peak_rss_mb']:.0f} MB, grew {agent['rss_growth_mb']:.1f} MB while answering")
+        for question in agent["mismatched_questions"]:
+            print(f"  ! unexpected tool calls for: {question}")
+    tools = results.get("tools")
+    if tools:
+        print(f"\n{'tool':<30} {'direct (µs)':>12} {'invoke (µs)':>12}")
+        for name, timing in tools.items():
+            print(f"{name:<30} {timing['direct_s'] * 1e6:>12.1f} {timing['invoke_s'] * 1e6:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=3, help="times the corpus is answered (default: 3)")
+    parser.add_argument("--latency", type=float, default=0.0, help="mock model latency in seconds (default: 0)")
+    parser.add_argument("--min-time", type=float, default=0.05, help="seconds spent timing each tool (default: 0.05)")
+    parser.add_argument("--skip-agent", action="store_true", help="only run the tool microbenchmarks")
+    parser.add_argument("--skip-tools", action="store_true", help="skip the tool microbenchmarks")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="results file of an earlier run to compare the tools against")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="allowed slowdown factor (default: 1.5)")
+    args = parser.parse_args()
+
+    results = {"latency": args.latency}
+    with MockLLMServer(latency=args.latency, transcripts=TRANSCRIPTS) as mock:
+        os.environ["OPENAI_API_KEY"] = "mock"
+        os.environ["OPENAI_BASE_URL"] = mock.url
+        # Benchmarks measure the agent itself, never replayed answers
+        os.environ["MATH_AGENT_CACHE"] = "0"
+        if not args.skip_agent:
+            results["startup"] = measure_startup(dict(os.environ))
+            results["agent"] = run_corpus(args.rounds)
+        if not args.skip_tools:
+            results["tools"] = microbenchmark_tools(args.min_time)
+
+    print_report(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: {before * 1e6:.1f} µs -> {after * 1e6:.1f} µs")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
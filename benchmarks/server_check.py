@@ -0,0 +1,137 @@
+"""End-to-end check of the HTTP API server (server.py) against the mock LLM server.
+
+Starts the mock model and the API server in this process and checks:
+- coalescing: concurrent identical questions start one agent run and all get its answer,
+- streaming: the SSE endpoint sends "delta" events and a final "done" event,
+- rate limiting: a client asking faster than its limit gets 429 with Retry-After,
+- backpressure: questions beyond MAX_PENDING agent runs in flight get 503.
+
+Exits with status 1 if any check fails.
+
+    python -m benchmarks.server_check
+    python -m benchmarks.server_check --clients 50 --latency 0.5
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+from benchmarks.corpus import CORPUS, TRANSCRIPTS
+from benchmarks.mock_llm import MockLLMServer
+
+# Questions the fast path cannot answer, so they go to the agent (two model requests each)
+AGENT_QUESTIONS = [item["question"] for item in CORPUS if len(item["calls"]) > 1] + [
+    "Describe the data 12, 15, 11, 18, 15, 20, 14",
+    "Tabulate the volumes of cylinders of height 10 with radius 1, 2 and 3",
+] + [f"Explain step {step} of completing the square" for step in range(1, 9)]
+
+
+async def serve(**options):
+    """Start server.create_app(**options) on a free port; returns (runner, base url)."""
+    from aiohttp import web
+
+    from server import create_app
+
+    runner = web.AppRunner(create_app(**options))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+async def ask(session, url: str, question: str, client: str = "check"):
+    async with session.post(f"{url}/v1/answer", json={"question": question}, headers={"X-Client-Id": client}) as r:
+        return r.status, await r.json(), r.headers.get("Retry-After")
+
+
+async def check_coalescing(session, url: str, mock: MockLLMServer, clients: int) -> bool:
+    before = mock.request_count
+    start = time.perf_counter()
+    results = await asyncio.gather(*(ask(session, url, AGENT_QUESTIONS[0], f"client-{i}") for i in range(clients)))
+    elapsed = time.perf_counter() - start
+    answers = {body.get("answer") for status, body, _ in results if status == 200}
+    coalesced = sum(1 for status, body, _ in results if status == 200 and body["coalesced"])
+    model_requests = mock.request_count - before
+    ok = all(status == 200 for status, _, _ in results) and len(answers) == 1 and model_requests == 2
+    print(f"coalescing:   {clients} identical questions in {elapsed:.2f} s, {coalesced} joined a run in flight, "
+          f"{model_requests} model requests  {'OK' if ok else 'FAIL'}")
+    return ok
+
+
+async def check_streaming(session, url: str) -> bool:
+    events = []
+    start = time.perf_counter()
+    first_event = None
+    async with session.post(f"{url}/v1/answer/stream", json={"question": AGENT_QUESTIONS[1]}) as r:
+        async for line in r.content:
+            line = line.decode("utf-8").strip()
+            if line.startswith("event: "):
+                events.append(line[len("event: "):])
+                first_event = first_event or time.perf_counter() - start
+    ok = r.status == 200 and events[-1:] == ["done"] and "delta" in events
+    print(f"streaming:    {events.count('delta')} delta events, first after {first_event or 0:.2f} s, "
+          f"then {events[-1] if events else 'nothing'}  {'OK' if ok else 'FAIL'}")
+    return ok
+
+
+async def check_rate_limit(session, url: str, burst: int) -> bool:
+    # Fast-path questions: the limit applies before any answering work
+    results = [await ask(session, url, f"What is {i} + {i}?", "greedy") for i in range(burst + 3)]
+    limited = [retry_after for status, _, retry_after in results if status == 429]
+    ok = len(limited) == 3 and all(limited)
+    print(f"rate limit:   {burst + 3} quick questions with a burst of {burst}, {len(limited)} got 429 "
+          f"(Retry-After {limited[0] if limited else '-'} s)  {'OK' if ok else 'FAIL'}")
+    return ok
+
+
+async def check_backpressure(session, url: str, max_pending: int) -> bool:
+    questions = AGENT_QUESTIONS[2:2 + max_pending + 2]
+    results = await asyncio.gather(*(ask(session, url, q, f"busy-{i}") for i, q in enumerate(questions)))
+    statuses = sorted(status for status, _, _ in results)
+    ok = statuses.count(200) == max_pending and statuses.count(503) == len(questions) - max_pending
+    print(f"backpressure: {len(questions)} different questions with {max_pending} runs allowed in flight, "
+          f"statuses {statuses}  {'OK' if ok else 'FAIL'}")
+    return ok
+
+
+async def main(clients: int, latency: float):
+    import aiohttp
+
+    max_pending, burst = 2, 5
+    with MockLLMServer(latency=latency, transcripts=TRANSCRIPTS) as mock:
+        os.environ["OPENAI_API_KEY"] = "mock"
+        os.environ["OPENAI_BASE_URL"] = mock.url
+        runner, url = await serve(max_pending=max_pending, rate_limit=60, burst=burst)
+        try:
+            async with aiohttp.ClientSession() as session:
+                # Wait for the agent to be built, so the checks time answers rather than startup
+                while True:
+                    async with session.get(f"{url}/health") as r:
+                        state = (await r.json())["agent"]
+                    if state != "loading":
+                        break
+                    await asyncio.sleep(0.1)
+                results = [
+                    await check_coalescing(session, url, mock, clients),
+                    await check_streaming(session, url),
+                    await check_rate_limit(session, url, burst),
+                    await check_backpressure(session, url, max_pending),
+                ]
+                async with session.get(f"{url}/health") as r:
+                    print("health:", json.dumps(await r.json()))
+        finally:
+            await runner.cleanup()
+    if not all(results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=20, help="concurrent identical questions (default: 20)")
+    parser.add_argument("--latency", type=float, default=0.2, help="mock model latency (default: 0.2)")
+    args = parser.parse_args()
+    os.environ["MATH_AGENT_CACHE"] = "0"
+    asyncio.run(main(args.clients, args.latency))
@@ -0,0 +1,235 @@
+import ast
+import math
+import os
+import re
+from decimal import ROUND_HALF_UP, Decimal
+from fractions import Fraction
+from functools import lru_cache
+from typing import Callable, List, Tuple
+
+import exact
+import trig_tables
+
+COMPILE_CACHE_SIZE = int(os.getenv("MATH_AGENT_EXPRESSION_CACHE_SIZE", 1024))
+
+# Size limits, as for the SymPy-backed tools
+MAX_EXPRESSION_LENGTH = int(os.getenv("MATH_AGENT_MAX_EXPRESSION_LENGTH", 500))
+MAX_NODES = 200
+MAX_FACTORIAL = 1000
+
+UNICODE_OPERATORS = {
+    "−": "-", "×": "*", "·": "*", "÷": "/", "²": "^2", "³": "^3", "π": "pi", "√": "sqrt",
+}
+
+# Angles are in degrees, like the sin/cos/tan tools
+FUNCTIONS = {
+    "sqrt": lambda x: _checked(math.sqrt, x, "square root of a negative number"),
+    "cbrt": lambda x: math.copysign(abs(float(x)) ** (1 / 3), float(x)),
+    "abs": abs,
+    "sin": lambda x: _trig("sin", math.sin, x),
+    "cos": lambda x: _trig("cos", math.cos, x),
+    "tan": lambda x: _trig("tan", math.tan, x),
+    "asin": lambda x: _inverse_trig("sin", math.asin, x, "arcsin of a value outside -1..1"),
+    "acos": lambda x: _inverse_trig("cos", math.acos, x, "arccos of a value outside -1..1"),
+    "atan": lambda x: _inverse_trig("tan", math.atan, x),
+    "ln": lambda x: _checked(math.log, x, "logarithm of a non-positive number"),
+    "log": lambda x, base=10: _log(x, base),
+    "log10": lambda x: _checked(math.log10, x, "logarithm of a non-positive number"),
+    "log2": lambda x: _checked(math.log2, x, "logarithm of a non-positive number"),
+    "exp": math.exp,
+    "factorial": lambda x: _factorial(x),
+    "floor": math.floor,
+    "ceil": math.ceil,
+    "round": lambda x, digits=0: _round(x, digits),
+}
+ALIASES = {"arcsin": "asin", "arccos": "acos", "arctan": "atan", "root": "sqrt"}
+CONSTANTS = {"pi": math.pi, "e": math.e, "tau": math.tau}
+
+BINARY_OPERATORS = {
+    ast.Add: ("+", lambda a, b: a + b),
+    ast.Sub: ("-", lambda a, b: a - b),
+    ast.Mult: ("×", lambda a, b: a * b),
+    ast.Div: ("÷", lambda a, b: exact.divide(a, b)),
+    ast.Pow: ("^", lambda a, b: exact.power(a, b)),
+    ast.Mod: ("mod", lambda a, b: a % b),
+}
+
+_NAMES = "|".join(sorted([*FUNCTIONS, *ALIASES, *CONSTANTS], key=len, reverse=True))
+
+
+class ExpressionError(ValueError):
+    """Raised for expressions that cannot be evaluated (syntax, unknown names, math domain)."""
+
+
+def _checked(func, x, problem: str):
+    try:
+        return func(x)
+    except ValueError:
+        raise ExpressionError(f"Cannot take the {problem}") from None
+
+
+def _log(x, base):
+    if base <= 0 or base == 1:
+        raise ExpressionError("Log base must be positive and not 1")
+    return _checked(lambda v: math.log(v, base), x, "logarithm of a non-positive number")
+
+
+def _round(x, digits):
+    # Half up, as taught in school: round(2.5) is 3 and round(0.5) is 1 (Python's round gives 2 and 0)
+    if digits != int(digits):
+        raise ExpressionError("round needs a whole number of decimal places")
+    if isinstance(x, float):
+        value = Decimal(repr(x))
+    else:
+        x = Fraction(x)
+        value = Decimal(x.numerator) / Decimal(x.denominator)
+    rounded = value.quantize(Decimal(1).scaleb(-int(digits)), rounding=ROUND_HALF_UP)
+    if digits <= 0:
+        return int(rounded)
+    return exact.normalize(Fraction(rounded)) if exact.EXACT_ARITHMETIC else float(rounded)
+
+
+def _trig(name: str, func, x):
+    # Standard angles come from the exact tables: sin(30°) is 1/2, sin(180°) is 0 (not 1.2e-16)
+    standard = trig_tables.lookup(name, x)
+    if standard is None:
+        return func(math.radians(x))
+    if not standard.defined:
+        raise ExpressionError(f"{name}({exact.format_number(x)}°) is undefined")
+    return standard.value if isinstance(standard.value, float) else exact.to_exact(standard.value)
+
+
+def _inverse_trig(name: str, func, x, problem: str = ""):
+    standard = trig_tables.inverse(name, x)
+    if standard is not None:
+        return standard
+    return _checked(lambda v: math.degrees(func(v)), x, problem)
+
+
+def _factorial(x):
+    if x != int(x) or x < 0:
+        raise ExpressionError("Factorial needs a whole number that is not negative")
+    if x > MAX_FACTORIAL:
+        raise ExpressionError(f"Factorials above {MAX_FACTORIAL}! are not supported")
+    return math.factorial(int(x))
+
+
+def normalize(text: str) -> str:
+    """Student notation as Python syntax: ^ for powers, 2(3+4) and 2pi for products."""
+    text = re.sub(r"√\s*(\d+(?:\.\d+)?)", r"sqrt(\1)", text)
+    for symbol, replacement in UNICODE_OPERATORS.items():
+        text = text.replace(symbol, replacement)
+    text = re.sub(r"\s+", " ", text.strip().lower())
+    text = text.replace("^", "**")
+    # 15% is 15/100; "mod" is the remainder
+    text = re.sub(r"(\d+(?:\.\d+)?)\s*%", r"(\1/100)", text)
+    text = re.sub(r"\bmod\b", "%", text)
+    text = re.sub(r"(\d+)\s*!", r"factorial(\1)", text)
+    # Implicit multiplication: 2(3+4), (1+2)(3+4), 2pi, 3sqrt(2) (but not 2e3)
+    text = re.sub(r"(\d|\))\s*(\(|(?:" + _NAMES + r")\b)", r"\1*\2", text)
+    return text
+
+
+Step = Tuple[str, exact.Number]
+Compiled = Callable[[List[Step]], exact.Number]
+
+
+def _compile_node(node: ast.AST) -> Compiled:
+    """Turn a whitelisted syntax tree into nested closures that record each operation as a step."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        try:
+            value = exact.to_exact(node.value)
+        except ValueError:
+            raise ExpressionError("A number in the expression is too large to calculate with") from None
+        return lambda steps: value
+    if isinstance(node, ast.Name):
+        if node.id not in CONSTANTS:
+            raise ExpressionError(f"Unknown name '{node.id}'")
+        value = CONSTANTS[node.id]
+        return lambda steps: value
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.UAdd, ast.USub)):
+        operand = _compile_node(node.operand)
+        if isinstance(node.op, ast.UAdd):
+            return operand
+        if isinstance(node.operand, ast.Constant):
+            return lambda steps: -operand(steps)  # a negative number, not a step
+
+        def negate(steps):
+            value = operand(steps)
+            text = _operand(value)
+            steps.append((f"-{text}" if text.startswith("(") else f"-({text})", -value))
+            return -value
+        return negate
+    if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPERATORS:
+        symbol, operator = BINARY_OPERATORS[type(node.op)]
+        left, right = _compile_node(node.left), _compile_node(node.right)
+
+        def binary(steps):
+            a, b = left(steps), right(steps)
+            if symbol in ("÷", "mod") and b == 0:
+                raise ExpressionError("Cannot divide by zero")
+            result = exact.normalize(operator(a, b))
+            if isinstance(result, complex):
+                raise ExpressionError("A negative number cannot be raised to a fractional power")
+            steps.append((f"{_operand(a)} {symbol} {_operand(b)}", result))
+            return result
+        return binary
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+        name = ALIASES.get(node.func.id, node.func.id)
+        if name not in FUNCTIONS:
+            raise ExpressionError(f"Unknown function '{node.func.id}'")
+        function = FUNCTIONS[name]
+        arguments = [_compile_node(argument) for argument in node.args]
+        degrees = "°" if name in ("sin", "cos", "tan") else ""
+
+        def call(steps):
+            values = [argument(steps) for argument in arguments]
+            try:
+                result = exact.normalize(function(*values))
+            except TypeError:
+                raise ExpressionError(f"Wrong number of arguments for {name}()") from None
+            shown = ", ".join(exact.format_number(value) for value in values)
+            steps.append((f"{name}({shown}{degrees})", result))
+            return result
+        return call
+    raise ExpressionError(f"Unsupported syntax: {ast.unparse(node)}")
+
+
+def _operand(value) -> str:
+    text = exact.format_number(value)
+    # Keep an approximation's "(≈ ...)" and negative numbers readable inside a step
+    text = text.split(" (≈")[0]
+    return f"({text})" if text.startswith("-") else text
+
+
+@lru_cache(maxsize=COMPILE_CACHE_SIZE)
+def compile_expression(text: str) -> Compiled:
+    """Parse, check and compile an expression once; repeated expressions reuse the compiled form."""
+    if len(text) > MAX_EXPRESSION_LENGTH:
+        raise ExpressionError(f"Expression is longer than {MAX_EXPRESSION_LENGTH} characters")
+    try:
+        tree = ast.parse(normalize(text), mode="eval")
+    except SyntaxError:
+        raise ExpressionError(f"Could not read the expression '{text}'") from None
+    if sum(1 for _ in ast.walk(tree)) > MAX_NODES:
+        raise ExpressionError(f"Expression has more than {MAX_NODES} parts")
+    return _compile_node(tree.body)
+
+
+def evaluate(text: str) -> Tuple[exact.Number, List[Step]]:
+    """Value of an arithmetic expression and its intermediate steps, innermost first."""
+    compiled = compile_expression(text)
+    steps: List[Step] = []
+    try:
+        value = compiled(steps)
+    except ZeroDivisionError:
+        raise ExpressionError("Cannot divide by zero") from None
+    except OverflowError:
+        raise ExpressionError("The result is too large to calculate") from None
+    except (TypeError, ValueError) as e:
+        if isinstance(e, ExpressionError):
+            raise
+        raise ExpressionError(f"Cannot evaluate '{text}': {e}") from None
+    if isinstance(value, float) and not math.isfinite(value):
+        raise ExpressionError("The result is too large to calculate")
+    return value, steps
@@ -0,0 +1,151 @@
+"""Exact rational arithmetic for the numeric tools.
+
+The model sends numbers as JSON floats, so 0.1 + 0.2 came out as
+0.30000000000000004 and ratio_simplify(1.5, 2.5) could not find a common
+factor. Tool inputs are read here as the decimals they were written as
+(0.1 -> 1/10) and kept as int or Fraction while the tool computes; they are
+only turned into text at the end:
+
+    integers            391
+    terminating         0.3, -0.125
+    non-terminating     1/3 (≈ 0.3333333333)
+
+Whole numbers stay plain ints, so the common case avoids Fraction entirely. Set MATH_AGENT_EXACT_ARITHMETIC=0 to compute with floats instead.
+"""
+import math
+import os
+from decimal import Decimal, localcontext
+from fractions import Fraction
+from typing import Union
+
+EXACT_ARITHMETIC = os.getenv("MATH_AGENT_EXACT_ARITHMETIC", "1").lower() not in ("0", "false", "no", "")
+# Integer powers whose exact result would exceed this many bits (about 3000 digits) are computed as floats
+MAX_EXACT_BITS = 10_000
+# Significant digits of the approximation shown next to a fraction
+DISPLAY_DIGITS = 10
+# Terminating decimals with up to this many significant digits are written out in full
+MAX_DECIMAL_DIGITS = 30
+
+Number = Union[int, float, Fraction]
+
+
+def to_exact(value) -> Number:
+    """`value` as an int when whole, else as the Fraction of its shortest decimal form (0.1 -> 1/10)."""
+    if not EXACT_ARITHMETIC:
+        return float(value)
+    if isinstance(value, (int, Fraction)) and not isinstance(value, bool):
+        return normalize(value)
+    value = float(value)
+    if not math.isfinite(value):
+        raise ValueError("The number is too large to calculate with")
+    # From the shortest decimal form, not the binary float: 1e23 is 10^23, not 99999999999999991611392
+    if value.is_integer():
+        return int(Decimal(repr(value)))
+    return Fraction(repr(value))
+
+
+def normalize(value: Number) -> Number:
+    """A whole Fraction as an int (Fraction(4, 2) -> 2); other values unchanged."""
+    if isinstance(value, Fraction) and value.denominator == 1:
+        return value.numerator
+    return value
+
+
+def divide(a: Number, b: Number) -> Number:
+    """a / b, exact for exact inputs."""
+    if isinstance(a, float) or isinstance(b, float):
+        return a / b
+    return normalize(Fraction(a, b))
+
+
+def power(base: Number, exponent: Number) -> Number:
+    """base ** exponent; exact for whole exponents while the result stays reasonably small."""
+    if isinstance(exponent, int) and not isinstance(base, float):
+        base = Fraction(base)
+        size = max(base.numerator.bit_length(), base.denominator.bit_length())
+        if size * abs(exponent) <= MAX_EXACT_BITS:
+            if base == 0 and exponent < 0:
+                raise ZeroDivisionError("Zero cannot be raised to a negative power")
+            return normalize(base ** exponent)
+    try:
+        return float(base) ** float(exponent)
+    except ZeroDivisionError:
+        raise ZeroDivisionError("Zero cannot be raised to a negative power") from None
+    except OverflowError:
+        raise OverflowError("The result is too large to calculate") from None
+
+
+def _decimal_places(fraction: Fraction):
+    """Digits after the point of the exact decimal form of `fraction`, or None if it never ends."""
+    denominator = fraction.denominator
+    counts = []
+    for prime in (2, 5):
+        count = 0
+        while denominator % prime == 0:
+            denominator //= prime
+            count += 1
+        counts.append(count)
+    return max(counts) if denominator == 1 else None
+
+
+def _decimal(fraction: Fraction, places: int) -> str:
+    """Exact decimal text of a fraction with `places` digits after the point."""
+    digits = str(abs(fraction.numerator * 10 ** places // fraction.denominator)).rjust(places + 1, "0")
+    sign = "-" if fraction < 0 else ""
+    return f"{sign}{digits[:-places]}.{digits[-places:]}"
+
+
+def _approximate(value: Number) -> str:
+    """Decimal approximation of any value, including ones too large for a float."""
+    try:
+        return f"{float(value):.{DISPLAY_DIGITS}g}"
+    except OverflowError:
+        fraction = Fraction(value)
+        return f"{Decimal(fraction.numerator) / Decimal(fraction.denominator):.{DISPLAY_DIGITS - 1}e}"
+
+
+def _long_decimal(fraction: Fraction, places: int):
+    """Exact text of a terminating decimal with more than 12 places, or None when it has too many digits."""
+    digits = len(str(abs(fraction.numerator * 10 ** places // fraction.denominator)).strip("0"))
+    if digits > MAX_DECIMAL_DIGITS:
+        return None
+    text = _decimal(fraction, places)
+    if len(text) <= MAX_DECIMAL_DIGITS + 2:
+        return text
+    with localcontext() as context:
+        context.prec = MAX_DECIMAL_DIGITS
+        return str(Decimal(fraction.numerator) / Decimal(fraction.denominator)).replace("E", "e")
+
+
+def format_number(value: Number) -> str:
+    """Display text of a tool result: exact where that reads well, otherwise marked with "≈".
+
+    Exact values are never rounded silently: a fraction too long to write
+    as a decimal keeps its numerator and denominator next to the
+    approximation, and only values too large for that are shown as "≈ ...".
+    """
+    value = normalize(value)
+    if isinstance(value, int):
+        # Python refuses to print ints of more than about 4300 digits
+        return str(value) if value.bit_length() <= MAX_EXACT_BITS else f"≈ {_approximate(value)}"
+    if isinstance(value, float):
+        if value.is_integer() and abs(value) < 1e15:
+            return str(int(value))
+        return _approximate(value)
+    places = _decimal_places(value)
+    if places is not None and places <= 12:
+        return _decimal(value, places)
+    if places is not None:
+        text = _long_decimal(value, places)
+        if text is not None:
+            return text
+    if max(value.numerator.bit_length(), value.denominator.bit_length()) > 64:
+        return f"≈ {_approximate(value)}"
+    return f"{value.numerator}/{value.denominator} (≈ {_approximate(value)})"
+
+
+def ratio(a: Number, b: Number):
+    """The whole-number ratio equal to a:b in lowest terms, as (x, y) with y > 0."""
+    a, b = (Fraction(repr(x)) if isinstance(x, float) else Fraction(x) for x in (a, b))
+    quotient = a / b
+    return quotient.numerator, quotient.denominator
@@ -0,0 +1,292 @@
+import os
+import re
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from tool_results import ToolResult
+
+# The fast path can be switched off (e.g. to compare against the full agent)
+FAST_PATH_ENABLED = os.getenv("MATH_AGENT_FAST_PATH", "1") != "0"
+
+NUMBER = r"([-+]?(?:\d+(?:\.\d*)?|\.\d+))"
+UNSIGNED_NUMBER = r"(\d+(?:\.\d*)?|\.\d+)"
+NUMBER_LIST = r"\[?\s*((?:[-+]?(?:\d+(?:\.\d*)?|\.\d+)\s*,\s*)+[-+]?(?:\d+(?:\.\d*)?|\.\d+))\s*\]?"
+LEAD = r"^(?:please\s+)?(?:what\s+is|what's|find|calculate|compute|evaluate|work\s+out|determine|give\s+me)?\s*(?:the\s+)?"
+
+OPERATIONS = {
+    "+": "add", "plus": "add",
+    "-": "subtract", "minus": "subtract",
+    "*": "multiply", "x": "multiply", "×": "multiply", "times": "multiply",
+    "multiplied by": "multiply",
+    "/": "divide", "÷": "divide", "divided by": "divide", "over": "divide",
+}
+
+ORDINAL = r"(\d+)(?:st|nd|rd|th)?"
+
+
+def _number(text: str) -> float:
+    return float(text)
+
+
+def _number_list(text: str) -> List[float]:
+    return [float(item) for item in text.split(",")]
+
+
+def _prepare_expression(text: str) -> str:
+    """Turn student notation (2x, x^2) into something SymPy can parse."""
+    expression = text.strip().replace("^", "**")
+    expression = re.sub(r"(\d)\s*([a-z(])", r"\1*\2", expression)
+    expression = re.sub(r"\)\s*\(", ")*(", expression)
+    return expression
+
+
+def _linear_equation(match: re.Match) -> Optional[Dict]:
+    equation = match.group(1)
+    if equation.count("=") != 1 or "x" not in equation:
+        return None
+    if not re.fullmatch(r"[\dx\s+\-*/().=]+", equation):
+        return None
+    # Leave anything with powers of x (quadratics etc.) to the agent
+    if re.search(r"x\s*(\*\*|\^)|x\s*\*\s*x", equation):
+        return None
+    return {"equation": _prepare_expression(equation)}
+
+
+def _algebraic_expression(match: re.Match) -> Optional[Dict]:
+    expression = match.group(1)
+    if "=" in expression or not re.fullmatch(r"[\dx\s+\-*/().^]+", expression):
+        return None
+    return {"expression": _prepare_expression(expression)}
+
+
+# Function names and constants evaluate_expression understands, for recognizing whole expressions
+EXPRESSION_WORDS = (r"(?<![a-z])(?:sqrt|cbrt|abs|arcsin|arccos|arctan|asin|acos|atan|sin|cos|tan|ln|log10|log2|log|"
+                    r"exp|factorial|floor|ceil|round|pi|e|mod)(?![a-z])")
+
+
+def _expression(match: re.Match) -> Optional[Dict]:
+    expression = match.group(1).strip()
+    # Letters other than known functions and constants (x, units, words) are for the agent
+    if re.search(r"[a-z]", re.sub(EXPRESSION_WORDS, "", expression)):
+        return None
+    # Single operations are answered by their own tools
+    if len(re.findall(r"[-+*/^×÷%!²³√]|" + EXPRESSION_WORDS, expression)) < 2:
+        return None
+    return {"expression": expression}
+
+
+def _calculator(match: re.Match) -> Optional[Dict]:
+    operation = OPERATIONS.get(match.group(2).strip().lower())
+    if operation is None:
+        return None
+    return {"a": _number(match.group(1)), "b": _number(match.group(3)), "operation": operation}
+
+
+STATISTIC_TOOLS = {
+    "mean": "mean", "average": "mean", "median": "median", "mode": "mode",
+    "standard deviation": "standard_deviation", "variance": "variance",
+}
+
+# Each pattern maps a question shape onto a tool (or a function picking the tool
+# from the match) and a function that builds the tool arguments from the match.
+# Returning None from the argument builder rejects the match.
+PATTERNS: List[Tuple[re.Pattern, Union[str, Callable[[re.Match], str]], Callable[[re.Match], Optional[Dict]]]] = [
+    # Algebra
+    (re.compile(r"^solve\s+(?:the\s+)?quadratic(?:\s+equation)?\s*(?:with)?\s*:?\s*a\s*=\s*" + NUMBER
+                + r"\s*,?\s*(?:and\s+)?b\s*=\s*" + NUMBER + r"\s*,?\s*(?:and\s+)?c\s*=\s*" + NUMBER + r"$"),
+     "solve_quadratic_equation",
+     lambda m: {"a": _number(m.group(1)), "b": _number(m.group(2)), "c": _number(m.group(3))}),
+    (re.compile(r"^solve\s*(?:for\s+x)?\s*:?\s*(.+=.+)$"), "solve_linear_equation", _linear_equation),
+    (re.compile(LEAD + r"factori[sz]e\s*:?\s*(.+)$"), "factor_expression", _algebraic_expression),
+    (re.compile(LEAD + r"factor\s*:?\s*(.+)$"), "factor_expression", _algebraic_expression),
+    (re.compile(LEAD + r"expand\s*:?\s*(.+)$"), "expand_expression", _algebraic_expression),
+    # Geometry
+    (re.compile(LEAD + r"area\s+of\s+(?:a\s+)?circle\s+(?:with|of)\s+(?:a\s+)?radius\s*(?:of|=|is)?\s*" + NUMBER + r"$"),
+     "area_circle", lambda m: {"radius": _number(m.group(1))}),
+    (re.compile(LEAD + r"circumference\s+of\s+(?:a\s+)?circle\s+(?:with|of)\s+(?:a\s+)?radius\s*(?:of|=|is)?\s*" + NUMBER + r"$"),
+     "circumference_circle", lambda m: {"radius": _number(m.group(1))}),
+    (re.compile(LEAD + r"area\s+of\s+(?:a\s+)?rectangle\s+(?:with\s+)?length\s*(?:of|=)?\s*" + NUMBER
+                + r"\s*,?\s*(?:and\s+)?width\s*(?:of|=)?\s*" + NUMBER + r"$"),
+     "area_rectangle", lambda m: {"length": _number(m.group(1)), "width": _number(m.group(2))}),
+    (re.compile(LEAD + r"area\s+of\s+(?:a\s+)?triangle\s+(?:with\s+)?base\s*(?:of|=)?\s*" + NUMBER
+                + r"\s*,?\s*(?:and\s+)?height\s*(?:of|=)?\s*" + NUMBER + r"$"),
+     "area_triangle", lambda m: {"base": _number(m.group(1)), "height": _number(m.group(2))}),
+    (re.compile(LEAD + r"volume\s+of\s+(?:a\s+)?cylinder\s+(?:with\s+)?radius\s*(?:of|=)?\s*" + NUMBER
+                + r"\s*,?\s*(?:and\s+)?height\s*(?:of|=)?\s*" + NUMBER + r"$"),
+     "volume_cylinder", lambda m: {"radius": _number(m.group(1)), "height": _number(m.group(2))}),
+    (re.compile(LEAD + r"volume\s+of\s+(?:a\s+)?cone\s+(?:with\s+)?radius\s*(?:of|=)?\s*" + NUMBER
+                + r"\s*,?\s*(?:and\s+)?height\s*(?:of|=)?\s*" + NUMBER + r"$"),
+     "volume_cone", lambda m: {"radius": _number(m.group(1)), "height": _number(m.group(2))}),
+    (re.compile(LEAD + r"volume\s+of\s+(?:a\s+)?sphere\s+(?:with|of)\s+(?:a\s+)?radius\s*(?:of|=|is)?\s*" + NUMBER + r"$"),
+     "volume_sphere", lambda m: {"radius": _number(m.group(1))}),
+    # Trigonometry
+    (re.compile(LEAD + r"(sin|cos|tan)\s*\(?\s*" + NUMBER + r"\s*(?:°|degrees?|deg)?\s*\)?$"),
+     lambda m: m.group(1), lambda m: {"angle_degrees": _number(m.group(2))}),
+    (re.compile(LEAD + r"(arcsin|arccos|arctan)\s*\(?\s*" + NUMBER + r"\s*\)?$"),
+     lambda m: m.group(1), lambda m: {"value": _number(m.group(2))}),
+    # Logarithms and exponentials
+    (re.compile(LEAD + r"(?:ln|natural\s+log(?:arithm)?\s+of)\s*\(?\s*" + NUMBER + r"\s*\)?$"),
+     "natural_log", lambda m: {"number": _number(m.group(1))}),
+    (re.compile(LEAD + r"(?:log10|log₁₀|log\s+base\s+10\s+of)\s*\(?\s*" + NUMBER + r"\s*\)?$"),
+     "log10", lambda m: {"number": _number(m.group(1))}),
+    (re.compile(LEAD + r"log(?:arithm)?\s*(?:_|base\s+)" + NUMBER + r"\s*(?:of)?\s*\(?\s*" + NUMBER + r"\s*\)?$"),
+     "logarithm", lambda m: {"base": _number(m.group(1)), "number": _number(m.group(2))}),
+    (re.compile(LEAD + r"e\s*(?:\^|\*\*|to\s+the\s+power\s+of)\s*" + NUMBER + r"$"),
+     "exponential", lambda m: {"power": _number(m.group(1))}),
+    # Statistics
+    (re.compile(LEAD + r"(mean|average|median|mode|standard\s+deviation|variance)\s+of\s*:?\s*" + NUMBER_LIST + r"$"),
+     lambda m: STATISTIC_TOOLS[re.sub(r"\s+", " ", m.group(1))],
+     lambda m: {"numbers": _number_list(m.group(2))}),
+    # Sequences
+    (re.compile(LEAD + ORDINAL + r"\s+term\s+of\s+(?:an?\s+)?(arithmetic|geometric)\s+(?:sequence|progression)\s*"
+                + r"(?:with|:)?\s*first(?:\s+term)?\s*(?:=|of|is)?\s*" + NUMBER
+                + r"\s*,?\s*(?:and\s+)?(?:common\s+)?(difference|ratio)\s*(?:=|of|is)?\s*" + NUMBER + r"$"),
+     lambda m: m.group(2) + "_sequence_nth_term",
+     lambda m: {"first_term": _number(m.group(3)), "n": int(m.group(1)),
+                ("common_difference" if m.group(4) == "difference" else "common_ratio"): _number(m.group(5))}),
+    # Percentages
+    (re.compile(LEAD + NUMBER + r"\s*(?:%|percent)\s+of\s+" + NUMBER + r"$"),
+     "percentage_of", lambda m: {"percentage": _number(m.group(1)), "number": _number(m.group(2))}),
+    (re.compile(r"^what\s+(?:percent(?:age)?|%)\s+is\s+" + NUMBER + r"\s+of\s+" + NUMBER + r"$"),
+     "percentage", lambda m: {"part": _number(m.group(1)), "whole": _number(m.group(2))}),
+    # Basic operations
+    (re.compile(LEAD + r"(?:the\s+)?(?:square\s+root\s+of|sqrt|√)\s*\(?\s*" + NUMBER + r"\s*\)?$"),
+     "square_root", lambda m: {"number": _number(m.group(1))}),
+    # -3^2 is -(3^2) = -9, so a negative base needs brackets; without them the expression pattern applies
+    (re.compile(LEAD + r"(?:" + UNSIGNED_NUMBER + r"|\(\s*" + NUMBER + r"\s*\))"
+                + r"\s*(?:\^|\*\*|to\s+the\s+power\s+of|raised\s+to(?:\s+the\s+power\s+of)?)\s*" + NUMBER + r"$"),
+     "power", lambda m: {"base": _number(m.group(1) or m.group(2)), "exponent": _number(m.group(3))}),
+    (re.compile(LEAD + NUMBER + r"\s*(\+|-|\*|x|×|/|÷|plus|minus|times|multiplied\s+by|divided\s+by|over)\s*" + NUMBER + r"$"),
+     "calculator", _calculator),
+    # Whole arithmetic expressions, e.g. (3.5^2 + 4*7) / sqrt(12)
+    (re.compile(LEAD + r"(?:value\s+of\s+)?(.+)$"), "evaluate_expression", _expression),
+]
+
+# Title and formula shown in the templated explanation for each tool
+TEMPLATES: Dict[str, Tuple[str, Optional[str]]] = {
+    "calculator": ("Arithmetic", None),
+    "power": ("Powers", "bᵉ"),
+    "square_root": ("Square root", "√n"),
+    "evaluate_expression": ("Evaluating an expression", "Brackets, then powers and roots, then × and ÷, then + and −"),
+    "solve_linear_equation": ("Solving a linear equation", "Collect the x terms on one side and divide by the coefficient of x"),
+    "solve_quadratic_equation": ("Solving a quadratic equation", "x = (-b ± √(b² - 4ac)) / 2a"),
+    "factor_expression": ("Factorising an expression", None),
+    "expand_expression": ("Expanding an expression", None),
+    "area_rectangle": ("Area of a rectangle", "A = length × width"),
+    "area_triangle": ("Area of a triangle", "A = ½ × base × height"),
+    "area_circle": ("Area of a circle", "A = πr²"),
+    "circumference_circle": ("Circumference of a circle", "C = 2πr"),
+    "volume_cylinder": ("Volume of a cylinder", "V = πr²h"),
+    "volume_sphere": ("Volume of a sphere", "V = (4/3)πr³"),
+    "volume_cone": ("Volume of a cone", "V = (1/3)πr²h"),
+    "sin": ("Sine of an angle", "Exact value for a standard angle, else convert degrees to radians and take sin"),
+    "cos": ("Cosine of an angle", "Exact value for a standard angle, else convert degrees to radians and take cos"),
+    "tan": ("Tangent of an angle", "Exact value for a standard angle, else convert degrees to radians and take tan"),
+    "arcsin": ("Inverse sine", "θ = sin⁻¹(value), given in degrees"),
+    "arccos": ("Inverse cosine", "θ = cos⁻¹(value), given in degrees"),
+    "arctan": ("Inverse tangent", "θ = tan⁻¹(value), given in degrees"),
+    "logarithm": ("Logarithm", "log_b(n) = ln(n) / ln(b)"),
+    "natural_log": ("Natural logarithm", "ln(n) = logₑ(n)"),
+    "log10": ("Base-10 logarithm", "log₁₀(n)"),
+    "exponential": ("Exponential", "eˣ"),
+    "mean": ("Mean", "Sum of the values ÷ number of values"),
+    "median": ("Median", "Middle value of the sorted list"),
+    "mode": ("Mode", "Most frequent value"),
+    "standard_deviation": ("Standard deviation", "s = √(Σ(x - x̄)² / (n - 1))"),
+    "variance": ("Variance", "s² = Σ(x - x̄)² / (n - 1)"),
+    "arithmetic_sequence_nth_term": ("Arithmetic sequence", "aₙ = a₁ + (n-1)d"),
+    "geometric_sequence_nth_term": ("Geometric sequence", "aₙ = a₁ × r^(n-1)"),
+    "percentage": ("Percentages", "(part ÷ whole) × 100"),
+    "percentage_of": ("Percentage of a number", "(percentage ÷ 100) × number"),
+}
+
+
+def _normalize(question: str) -> str:
+    text = question.strip().lower()
+    text = re.sub(r"\s+", " ", text).rstrip("?. ")
+    # A trailing "!" is punctuation, except after a number or bracket, where it is a factorial
+    if not re.search(r"[\d)]!$", text):
+        text = text.rstrip("?.! ")
+    return text
+
+
+def match_question(question: str) -> Optional[Tuple[str, Dict]]:
+    """Recognize a simple one-line question. Returns (tool_name, tool_args) or None."""
+    text = _normalize(question)
+    for pattern, tool_name, build_args in PATTERNS:
+        match = pattern.match(text)
+        if not match:
+            continue
+        args = build_args(match)
+        if args is None:
+            continue
+        if callable(tool_name):
+            # Patterns covering a family of tools take the tool from the question
+            tool_name = tool_name(match)
+        return tool_name, args
+    return None
+
+
+def _format_value(value) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, list):
+        return "[" + ", ".join(_format_value(item) for item in value) + "]"
+    return str(value)
+
+
+def render_answer(tool_name: str, args: Dict, result: Union[ToolResult, str]) -> str:
+    """Render a templated step-by-step answer for a tool result (a ToolResult, or its text)."""
+    title, formula = TEMPLATES.get(tool_name, (tool_name.replace("_", " ").capitalize(), None))
+    given = ", ".join(f"{name.replace('_', ' ')} = {_format_value(value)}" for name, value in args.items())
+    steps = [f"Given: {given}"]
+    if formula:
+        steps.append(f"Method: {formula}")
+    table = None
+    if isinstance(result, str):
+        steps.append(f"Result: {result}")
+    else:
+        if result.formula:
+            steps.append(f"Working: {result.formula}")
+        steps += result.steps
+        if result.values or result.note:
+            steps.append(f"Result: {result.answer()}")
+        elif result.units:
+            steps.append(f"Units: {result.units}")
+        table = result.table
+    lines = [f"**{title}**", ""] + [f"{i}. {step}" for i, step in enumerate(steps, 1)]
+    if table is not None:
+        lines += ["", table.to_markdown(result.decimals)]
+    return "\n".join(lines)
+
+
+def call_fast_path(question: str, tools) -> Optional[Tuple[str, Dict, ToolResult]]:
+    """Call the tool that answers a simple question directly.
+
+    Returns (tool name, arguments, result), or None when the question should go to the agent.
+    """
+    if not FAST_PATH_ENABLED:
+        return None
+    matched = match_question(question)
+    if matched is None:
+        return None
+    tool_name, args = matched
+    tools_by_name = {t.name: t for t in tools}
+    if tool_name not in tools_by_name:
+        return None
+    try:
+        result = tools_by_name[tool_name].invoke(args)
+    except Exception:
+        return None
+    # Let the agent explain invalid input rather than echoing a bare error
+    if not isinstance(result, ToolResult) or not result.ok:
+        return None
+    return tool_name, args, result
+
+
+def try_fast_path(question: str, tools) -> Optional[str]:
+    """Answer a simple question locally by calling the matching tool directly.
+
+    Returns the rendered answer, or None when the question should go to the agent.
+    """
+    called = call_fast_path(question, tools)
+    return None if called is None else render_answer(*called)
@@ -0,0 +1,109 @@
+"""Shared HTTP connection pool for every chat model in the process.
+
+Each ChatOpenAI used to open its own connections, so every agent built by a
+script, batch job or test paid for fresh TCP and TLS handshakes. All models
+now share one httpx client (and one async client) with keep-alive, a bounded
+number of connections, and HTTP/2 when the `h2` package is installed. The
+OpenAI and OpenRouter settings both pass these clients to ChatOpenAI.
+
+Failures are retried at two levels: the transport retries failed connection
+attempts, and the OpenAI client retries 408/429/5xx responses and dropped
+connections with exponential backoff (honouring Retry-After).
+"""
+import os
+import threading
+
+MAX_CONNECTIONS = int(os.getenv("MATH_AGENT_HTTP_MAX_CONNECTIONS", 32))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("MATH_AGENT_HTTP_KEEPALIVE_CONNECTIONS", 16))
+KEEPALIVE_EXPIRY = float(os.getenv("MATH_AGENT_HTTP_KEEPALIVE_EXPIRY", 60))
+CONNECT_TIMEOUT = float(os.getenv("MATH_AGENT_HTTP_CONNECT_TIMEOUT", 5))
+REQUEST_TIMEOUT = float(os.getenv("MATH_AGENT_HTTP_TIMEOUT", 60))
+# Transport-level retries of failed connection attempts
+CONNECT_RETRIES = int(os.getenv("MATH_AGENT_HTTP_CONNECT_RETRIES", 2))
+# Client-level retries of 408/429/5xx responses, with exponential backoff
+MAX_RETRIES = int(os.getenv("MATH_AGENT_HTTP_RETRIES", 3))
+HTTP2_ENABLED = os.getenv("MATH_AGENT_HTTP2", "1") != "0"
+
+_lock = threading.Lock()
+_client = None
+_transport = None
+_async_client = None
+
+
+def http2_available() -> bool:
+    """Whether HTTP/2 is enabled and the `h2` package is installed."""
+    if not HTTP2_ENABLED:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _client_options() -> dict:
+    import httpx
+
+    return dict(
+        http2=http2_available(),
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(REQUEST_TIMEOUT, connect=CONNECT_TIMEOUT),
+    )
+
+
+def get_http_client():
+    """The process-wide httpx.Client, created on first use."""
+    global _client, _transport
+    with _lock:
+        if _client is None:
+            import httpx
+
+            options = _client_options()
+            # httpx ignores http2/limits on the client once a transport is given; set them on the transport
+            _transport = httpx.HTTPTransport(http2=options.pop("http2"), limits=options.pop("limits"),
+                                             retries=CONNECT_RETRIES)
+            _client = httpx.Client(transport=_transport, **options)
+        return _client
+
+
+def get_async_http_client():
+    """The process-wide httpx.AsyncClient, created on first use.
+
+    Its connections belong to the event loop that opened them, so use it from one
+    long-running loop (a server or batch job), as the async agent path does.
+    """
+    global _async_client
+    with _lock:
+        if _async_client is None:
+            import httpx
+
+            options = _client_options()
+            transport = httpx.AsyncHTTPTransport(http2=options.pop("http2"), limits=options.pop("limits"),
+                                                 retries=CONNECT_RETRIES)
+            _async_client = httpx.AsyncClient(transport=transport, **options)
+        return _async_client
+
+
+def client_settings() -> dict:
+    """ChatOpenAI keyword arguments that route its requests through the shared pool."""
+    return dict(
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
+        max_retries=MAX_RETRIES,
+        timeout=REQUEST_TIMEOUT,
+    )
+
+
+def close():
+    """Close both shared clients (they are re-created on next use)."""
+    global _client, _transport, _async_client
+    with _lock:
+        if _client is not None:
+            _client.close()
+            _client = _transport = None
+        # The async client is dropped rather than awaited; its loop may already be closed
+        _async_client = None
@@ -0,0 +1,348 @@
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# Append one JSON line per answered question to this file (unset: keep traces in memory only)
+TRACE_PATH = os.getenv("MATH_AGENT_TRACE_PATH", "")
+# Traces kept in memory for the web interface's performance panel
+RECENT_TRACES = 200
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+ITERATION_BUCKETS = (1, 2, 3, 4, 5, 6, 8, 10, 15, 25)
+
+
+@dataclass
+class LLMSpan:
+    duration_s: float
+    ttft_s: float
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+
+@dataclass
+class ToolSpan:
+    name: str
+    duration_s: float
+    error: Optional[str] = None
+
+
+@dataclass
+class RequestTrace:
+    """Timings and token counts of one answered question."""
+
+    question: str
+    source: str = "agent"  # agent, fast_path or cache
+    request_id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    started_at: float = field(default_factory=time.time)
+    duration_s: float = 0.0
+    llm_calls: List[LLMSpan] = field(default_factory=list)
+    tool_calls: List[ToolSpan] = field(default_factory=list)
+    # Model calls skipped by answering from the tool results, by reason (agent_loop.py)
+    llm_calls_avoided: Dict[str, int] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def iterations(self) -> int:
+        """ReAct iterations: one per model call."""
+        return len(self.llm_calls)
+
+    @property
+    def llm_s(self) -> float:
+        return sum(span.duration_s for span in self.llm_calls)
+
+    @property
+    def tool_s(self) -> float:
+        return sum(span.duration_s for span in self.tool_calls)
+
+    @property
+    def ttft_s(self) -> Optional[float]:
+        """Time to first token of the first model call."""
+        return self.llm_calls[0].ttft_s if self.llm_calls else None
+
+    @property
+    def input_tokens(self) -> int:
+        return sum(span.input_tokens for span in self.llm_calls)
+
+    @property
+    def output_tokens(self) -> int:
+        return sum(span.output_tokens for span in self.llm_calls)
+
+    def to_dict(self) -> Dict:
+        record = asdict(self)
+        record.update(iterations=self.iterations, llm_s=self.llm_s, tool_s=self.tool_s, ttft_s=self.ttft_s,
+                      input_tokens=self.input_tokens, output_tokens=self.output_tokens)
+        return record
+
+
+class TraceCallbackHandler(BaseCallbackHandler):
+    """LangChain callback handler that records model and tool spans into a RequestTrace.
+
+    Pass it in the run config: `agent_executor.stream(inputs, config={"callbacks": [handler]})`.
+    """
+
+    run_inline = True  # record timings on the calling thread, not via an executor hop
+
+    def __init__(self, trace: RequestTrace):
+        self.trace = trace
+        self._llm_runs: Dict = {}
+        self._tool_runs: Dict = {}
+        self._lock = threading.Lock()
+
+    # Model calls
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        with self._lock:
+            self._llm_runs[run_id] = [time.perf_counter(), None]
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self.on_chat_model_start(serialized, prompts, run_id=run_id)
+
+    def on_llm_new_token(self, token, *, run_id, **kwargs):
+        with self._lock:
+            run = self._llm_runs.get(run_id)
+            if run is not None and run[1] is None:
+                run[1] = time.perf_counter()
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        end = time.perf_counter()
+        with self._lock:
+            start, first_token = self._llm_runs.pop(run_id, (end, None))
+        usage = {}
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                usage = getattr(message, "usage_metadata", None) or usage
+        # Without token streaming the whole reply arrives at once
+        ttft = (first_token or end) - start
+        span = LLMSpan(end - start, ttft, usage.get("input_tokens", 0), usage.get("output_tokens", 0))
+        with self._lock:
+            self.trace.llm_calls.append(span)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        with self._lock:
+            self._llm_runs.pop(run_id, None)
+
+    # Tool calls
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        name = (serialized or {}).get("name") or kwargs.get("name") or "unknown"
+        with self._lock:
+            self._tool_runs[run_id] = (name, time.perf_counter())
+
+    def _finish_tool(self, run_id, error: Optional[str] = None):
+        end = time.perf_counter()
+        with self._lock:
+            name, start = self._tool_runs.pop(run_id, ("unknown", end))
+            self.trace.tool_calls.append(ToolSpan(name, end - start, error))
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        content = getattr(output, "content", output)
+        error = content if isinstance(content, str) and content.startswith("Error") else None
+        self._finish_tool(run_id, error)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._finish_tool(run_id, str(error))
+
+    # Answers rendered locally
+
+    def on_custom_event(self, name, data, *, run_id, **kwargs):
+        if name == "llm_call_avoided":
+            reason = data.get("reason", "unknown")
+            with self._lock:
+                self.trace.llm_calls_avoided[reason] = self.trace.llm_calls_avoided.get(reason, 0) + 1
+
+
+# ========== METRICS ==========
+
+def _labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+class Counter:
+    """Prometheus-style counter with labels."""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self.values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_labels(key)} {value:g}" for key, value in sorted(self.values.items())]
+        return lines
+
+
+class Histogram:
+    """Prometheus-style histogram with labels and fixed buckets."""
+
+    def __init__(self, name: str, help_text: str, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.values: Dict[Tuple, List] = {}  # labels -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        series = self.values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[index] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for key, series in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(key + (('le', f'{bound:g}'),))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_labels(key + (('le', '+Inf'),))} {series[-1]}")
+            lines.append(f"{self.name}_sum{_labels(key)} {series[-2]:g}")
+            lines.append(f"{self.name}_count{_labels(key)} {series[-1]}")
+        return lines
+
+
+class Metrics:
+    """Aggregates of every recorded trace, rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = Counter("math_agent_requests_total", "Questions answered, by source.")
+        self.errors = Counter("math_agent_request_errors_total", "Questions that failed, by source.")
+        self.llm_calls = Counter("math_agent_llm_calls_total", "Model calls.")
+        self.llm_calls_avoided = Counter("math_agent_llm_calls_avoided_total",
+                                         "Model calls skipped by answering from the tool results, by reason.")
+        self.tokens = Counter("math_agent_tokens_total", "Model tokens, by kind (prompt or completion).")
+        self.tool_calls = Counter("math_agent_tool_calls_total", "Tool calls, by tool.")
+        self.tool_errors = Counter("math_agent_tool_errors_total", "Tool calls that returned an error, by tool.")
+        self.request_seconds = Histogram("math_agent_request_seconds", "Time to answer a question, by source.")
+        self.llm_seconds = Histogram("math_agent_llm_seconds", "Duration of a model call.")
+        self.ttft_seconds = Histogram("math_agent_ttft_seconds", "Time to the first token of a model call.")
+        self.tool_seconds = Histogram("math_agent_tool_seconds", "Duration of a tool call, by tool.")
+        self.iterations = Histogram("math_agent_iterations", "ReAct iterations (model calls) per question.",
+                                    ITERATION_BUCKETS)
+
+    def record(self, trace: RequestTrace):
+        with self._lock:
+            self.requests.inc(source=trace.source)
+            self.request_seconds.observe(trace.duration_s, source=trace.source)
+            if trace.error:
+                self.errors.inc(source=trace.source)
+            if trace.source != "agent":
+                return
+            self.iterations.observe(trace.iterations)
+            for span in trace.llm_calls:
+                self.llm_calls.inc()
+                self.llm_seconds.observe(span.duration_s)
+                self.ttft_seconds.observe(span.ttft_s)
+                self.tokens.inc(span.input_tokens, kind="prompt")
+                self.tokens.inc(span.output_tokens, kind="completion")
+            for reason, count in trace.llm_calls_avoided.items():
+                self.llm_calls_avoided.inc(count, reason=reason)
+            for span in trace.tool_calls:
+                self.tool_calls.inc(tool=span.name)
+                self.tool_seconds.observe(span.duration_s, tool=span.name)
+                if span.error:
+                    self.tool_errors.inc(tool=span.name)
+
+    def render_prometheus(self) -> str:
+        with self._lock:
+            lines = []
+            for metric in (self.requests, self.errors, self.llm_calls, self.llm_calls_avoided, self.tokens,
+                           self.tool_calls, self.tool_errors, self.request_seconds, self.llm_seconds,
+                           self.ttft_seconds, self.tool_seconds, self.iterations):
+                lines += metric.render()
+            return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+recent_traces: Deque[RequestTrace] = deque(maxlen=RECENT_TRACES)
+_write_lock = threading.Lock()
+
+
+def record(trace: RequestTrace):
+    """Add a finished trace to the metrics, the recent traces and the JSONL trace file."""
+    metrics.record(trace)
+    recent_traces.append(trace)
+    if TRACE_PATH:
+        path = Path(TRACE_PATH)
+        with _write_lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(trace.to_dict(), ensure_ascii=False) + "\n")
+
+
+@contextmanager
+def trace_request(question: str, source: str = "agent") -> Iterator[TraceCallbackHandler]:
+    """Time one question; yields the callback handler to pass to the agent run.
+
+        with trace_request(question) as tracer:
+            for chunk in agent_executor.stream(inputs, config={"callbacks": [tracer]}):
+                ...
+    """
+    trace = RequestTrace(question=question, source=source)
+    handler = TraceCallbackHandler(trace)
+    start = time.perf_counter()
+    try:
+        yield handler
+    except Exception as e:
+        trace.error = str(e) or type(e).__name__
+        raise
+    finally:
+        trace.duration_s = time.perf_counter() - start
+        record(trace)
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """q-th percentile (0-100) by nearest rank."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = math.ceil(q / 100 * len(ordered))
+    return ordered[min(len(ordered), max(rank, 1)) - 1]
+
+
+def trace_from_dict(record: Dict) -> RequestTrace:
+    """Rebuild a RequestTrace from one line of a trace file."""
+    return RequestTrace(
+        question=record["question"], source=record["source"], request_id=record["request_id"],
+        started_at=record["started_at"], duration_s=record["duration_s"],
+        llm_calls=[LLMSpan(**span) for span in record["llm_calls"]],
+        tool_calls=[ToolSpan(**span) for span in record["tool_calls"]],
+        llm_calls_avoided=record.get("llm_calls_avoided", {}), error=record.get("error"),
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Summarize a trace file as Prometheus metrics.")
+    parser.add_argument("path", nargs="?", default=TRACE_PATH or None, help="JSONL trace file (default: $MATH_AGENT_TRACE_PATH)")
+    args = parser.parse_args()
+    if not args.path or not Path(args.path).exists():
+        parser.error("no trace file (run the agent with MATH_AGENT_TRACE_PATH set first)")
+
+    summary = Metrics()
+    with open(args.path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                summary.record(trace_from_dict(json.loads(line)))
+    print(summary.render_prometheus(), end="")
@@ -1,14 +1,26 @@
+import argparse
 import os
 import math
-import statistics
+import threading
+from fractions import Fraction
 from pathlib import Path
 from typing import List, Optional
-from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_openai import ChatOpenAI
-from langchain.tools import tool
-from langgraph.prebuilt import create_react_agent
 from dotenv import load_dotenv
-import sympy as sp
+import numpy as np
+
+# SymPy, the LLM client and LangGraph are imported on first use (see --profile-startup)
+import evaluator
+import exact
+import stats_engine
+import trig_tables
+from symbolic_pool import SymbolicTimeout, get_symbolic_pool
+import batch
+import http_pool
+from fast_path import try_fast_path
+from response_cache import get_response_cache
+from instrumentation import trace_request
+from tool_registry import get_spec, get_tool, math_tool, tool_list
+from tool_results import Table, ToolResult, format_value
 
 load_dotenv()
 
@@ -17,15 +29,43 @@ PROMPTS_DIR = Path(__file__).parent / "prompts"
 SYSTEM_PROMPT_PATH = PROMPTS_DIR / "system_prompt.txt"
 
 def load_system_prompt() -> str:
-    """Load the system prompt from the prompts folder."""
+    """Load the system prompt from the prompts folder, listing every tool (tool_router.py narrows the list)."""
     if SYSTEM_PROMPT_PATH.exists():
         with open(SYSTEM_PROMPT_PATH, "r", encoding="utf-8") as f:
-            return f.read().strip()
+            prompt = f.read().strip()
+        groups = {name: [get_spec(func) for func in functions] for name, functions in TOOL_GROUPS.items()}
+        return prompt.replace("{tool_list}", tool_list(groups))
     else:
         # Fallback prompt if file doesn't exist
         return "You are a specialized Math AI Assistant focused solely on mathematical calculations and problem-solving."
-@tool
-def calculator(a: float, b: float, operation: str = "add") -> str:
+
+
+# Tables produced by the *_table / *_terms tools are capped at this many rows
+MAX_TABLE_ROWS = 1000
+
+
+def _table_inputs(values: Optional[List[float]], start: Optional[float], stop: Optional[float],
+                  step: Optional[float]) -> np.ndarray:
+    """Inputs for a table tool: an explicit list, or an inclusive start..stop range."""
+    if values:
+        inputs = np.asarray(values, dtype=float)
+    elif start is not None and stop is not None:
+        step = step or 1
+        if step == 0 or (stop - start) / step < 0:
+            raise ValueError("step must move from start towards stop")
+        count = int(np.floor((stop - start) / step + 1e-9)) + 1
+        if count > MAX_TABLE_ROWS:
+            raise ValueError(f"a table can have at most {MAX_TABLE_ROWS} rows")
+        inputs = start + step * np.arange(count)
+    else:
+        raise ValueError("provide either a list of values or start and stop")
+    if inputs.size > MAX_TABLE_ROWS:
+        raise ValueError(f"a table can have at most {MAX_TABLE_ROWS} rows")
+    return inputs
+
+
+@math_tool
+def calculator(a: float, b: float, operation: str = "add") -> ToolResult:
     """Useful for performing basic arithmetic calculations with numbers.
 
     Args:
@@ -33,85 +73,97 @@ def calculator(a: float, b: float, operation: str = "add") -> str:
         b: Second number
         operation: The operation to perform (add, subtract, multiply, divide)
     """
-    print("Calculator tool has been called.")
-
+    # Exact arithmetic: 0.1 + 0.2 is 0.3, 1 / 3 is 1/3
+    x, y = exact.to_exact(a), exact.to_exact(b)
+    a, b = exact.format_number(x), exact.format_number(y)
     if operation == "add":
-        result = a + b
-        return f"The sum of {a} and {b} is {result}"
+        return ToolResult({f"{a} + {b}": x + y})
     elif operation == "subtract":
-        result = a - b
-        return f"The difference of {a} and {b} is {result}"
+        return ToolResult({f"{a} - {b}": x - y})
     elif operation == "multiply":
-        result = a * b
-        return f"The product of {a} and {b} is {result}"
+        return ToolResult({f"{a} × {b}": x * y})
     elif operation == "divide":
-        if b == 0:
-            return "Error: Cannot divide by zero"
-        result = a / b
-        return f"The division of {a} by {b} is {result}"
+        if y == 0:
+            return ToolResult.failure("Cannot divide by zero")
+        return ToolResult({f"{a} ÷ {b}": exact.divide(x, y)})
     else:
-        return f"Unknown operation: {operation}"
+        return ToolResult.failure(f"Unknown operation: {operation}")
 
 
-@tool
-def power(base: float, exponent: float) -> str:
+@math_tool
+def power(base: float, exponent: float) -> ToolResult:
     """Useful for calculating powers and exponents.
 
     Args:
         base: The base number
         exponent: The exponent/power
     """
-    print("Power tool has been called.")
-    result = base**exponent
-    return f"{base} raised to the power of {exponent} is {result}"
+    x, n = exact.to_exact(base), exact.to_exact(exponent)
+    try:
+        result = exact.power(x, n)
+    except (ZeroDivisionError, OverflowError) as e:
+        return ToolResult.failure(str(e))
+    if isinstance(result, complex):
+        return ToolResult.failure("A negative number cannot be raised to a fractional power")
+    return ToolResult({f"{exact.format_number(x)}^{exact.format_number(n)}": result})
 
 
-@tool
-def square_root(number: float) -> str:
+@math_tool
+def square_root(number: float) -> ToolResult:
     """Useful for calculating the square root of a number.
 
     Args:
         number: The number to find the square root of
     """
-    print("Square root tool has been called.")
     if number < 0:
-        return "Error: Cannot calculate square root of a negative number"
+        return ToolResult.failure("Cannot calculate square root of a negative number")
     result = number**0.5
-    return f"The square root of {number} is {result}"
+    return ToolResult({f"√{exact.format_number(number)}": result}, decimals=10)
+
+
+@math_tool
+def evaluate_expression(expression: str) -> ToolResult:
+    """Evaluate a whole arithmetic expression in one call, with its intermediate steps.
+
+    Use this instead of chaining calculator/power/square_root calls. Supports + - * / ^,
+    brackets, n!, 15% (= 0.15), mod, sqrt, abs, sin/cos/tan (degrees), arcsin/arccos/arctan
+    (degrees), ln, log (base 10, or log(x, base)), exp, floor, ceil, round, pi and e.
+
+    Args:
+        expression: Arithmetic expression, e.g. "(3.5^2 + 4*7) / sqrt(12)"
+    """
+    try:
+        value, steps = evaluator.evaluate(expression)
+    except evaluator.ExpressionError as e:
+        return ToolResult.failure(str(e))
+    working = [f"{operation} = {format_value(result, 10)}" for operation, result in steps] if len(steps) > 1 else []
+    return ToolResult({expression: value}, steps=working, decimals=10)
 
 
 # ========== ALGEBRA TOOLS ==========
 
-@tool
-def solve_linear_equation(equation: str) -> str:
+@math_tool
+def solve_linear_equation(equation: str) -> ToolResult:
     """Solve a linear equation in one variable. Equation should be in the form 'ax + b = c' or similar.
     
     Args:
         equation: The equation to solve as a string, e.g., '2*x + 5 = 13' or '3*x - 7 = 2'
     """
     try:
-        # Parse and solve the equation
-        x = sp.Symbol('x')
-        if '=' in equation:
-            parts = equation.split('=')
-            left = sp.sympify(parts[0].strip())
-            right = sp.sympify(parts[1].strip())
-            solution = sp.solve(left - right, x)
-        else:
-            # If no equals sign, try to solve the expression = 0
-            expr = sp.sympify(equation)
-            solution = sp.solve(expr, x)
+        solution = get_symbolic_pool().call("solve_equation", equation)
         
         if solution:
-            return f"Solution: x = {solution[0]}"
+            return ToolResult({"x": str(solution[0])})
         else:
-            return "No solution found or equation is not linear."
+            return ToolResult(note="No solution found or equation is not linear")
+    except SymbolicTimeout as e:
+        return ToolResult.failure(f"Timed out solving equation ({e}). Please try a simpler equation.")
     except Exception as e:
-        return f"Error solving equation: {str(e)}. Please provide equation in format like '2*x + 5 = 13'"
+        return ToolResult.failure(f"Could not solve equation: {str(e)}. Please provide equation in format like '2*x + 5 = 13'")
 
 
-@tool
-def solve_quadratic_equation(a: float, b: float, c: float) -> str:
+@math_tool
+def solve_quadratic_equation(a: float, b: float, c: float) -> ToolResult:
     """Solve a quadratic equation ax² + bx + c = 0 using the quadratic formula.
     
     Args:
@@ -120,59 +172,73 @@ def solve_quadratic_equation(a: float, b: float, c: float) -> str:
         c: Constant term
     """
     if a == 0:
-        return "Error: This is not a quadratic equation (a cannot be 0)"
+        return ToolResult.failure("This is not a quadratic equation (a cannot be 0)")
     
     discriminant = b**2 - 4*a*c
+    formula = f"b² - 4ac = {discriminant:g}"
     
     if discriminant > 0:
         x1 = (-b + math.sqrt(discriminant)) / (2*a)
         x2 = (-b - math.sqrt(discriminant)) / (2*a)
-        return f"Two real solutions: x₁ = {x1}, x₂ = {x2}"
+        return ToolResult({"x₁": x1, "x₂": x2}, formula=formula, note="two real solutions")
     elif discriminant == 0:
         x = -b / (2*a)
-        return f"One real solution (repeated root): x = {x}"
+        return ToolResult({"x": x}, formula=formula, note="one repeated real solution")
     else:
         real_part = -b / (2*a)
         imag_part = math.sqrt(-discriminant) / (2*a)
-        return f"Two complex solutions: x₁ = {real_part} + {imag_part}i, x₂ = {real_part} - {imag_part}i"
+        return ToolResult({"x₁": complex(real_part, imag_part), "x₂": complex(real_part, -imag_part)},
+                          formula=formula, note="two complex solutions")
 
 
-@tool
-def factor_expression(expression: str) -> str:
+@math_tool
+def factor_expression(expression: str) -> ToolResult:
     """Factor a mathematical expression.
     
     Args:
         expression: The expression to factor, e.g., 'x^2 + 5*x + 6' or 'x^2 - 9'
     """
     try:
-        x = sp.Symbol('x')
-        expr = sp.sympify(expression)
-        factored = sp.factor(expr)
-        return f"Factored form: {factored}"
+        factored = get_symbolic_pool().call("factor", expression)
+        return ToolResult({"factored form": str(factored)})
+    except SymbolicTimeout as e:
+        return ToolResult.failure(f"Timed out factoring expression ({e}). Please try a simpler expression.")
     except Exception as e:
-        return f"Error factoring expression: {str(e)}"
+        return ToolResult.failure(f"Could not factor expression: {str(e)}")
 
 
-@tool
-def expand_expression(expression: str) -> str:
+@math_tool
+def expand_expression(expression: str) -> ToolResult:
     """Expand a mathematical expression.
     
     Args:
         expression: The expression to expand, e.g., '(x + 2)*(x + 3)' or '(x + 1)^2'
     """
     try:
-        x = sp.Symbol('x')
-        expr = sp.sympify(expression)
-        expanded = sp.expand(expr)
-        return f"Expanded form: {expanded}"
+        expanded = get_symbolic_pool().call("expand", expression)
+        return ToolResult({"expanded form": str(expanded)})
+    except SymbolicTimeout as e:
+        return ToolResult.failure(f"Timed out expanding expression ({e}). Please try a simpler expression.")
     except Exception as e:
-        return f"Error expanding expression: {str(e)}"
+        return ToolResult.failure(f"Could not expand expression: {str(e)}")
 
 
 # ========== GEOMETRY TOOLS ==========
 
-@tool
-def area_rectangle(length: float, width: float) -> str:
+def _pi_multiple(coefficient: exact.Number) -> str:
+    """Exact form of coefficient × π, e.g. 49π, 12.5π or 32π/3."""
+    if isinstance(coefficient, Fraction):
+        denominator = coefficient.denominator
+        for prime in (2, 5):
+            while denominator % prime == 0:
+                denominator //= prime
+        if denominator != 1:  # no exact decimal: keep the fraction
+            return f"{coefficient.numerator}π/{coefficient.denominator}"
+    return f"{exact.format_number(coefficient)}π"
+
+
+@math_tool
+def area_rectangle(length: float, width: float) -> ToolResult:
     """Calculate the area of a rectangle.
     
     Args:
@@ -180,11 +246,11 @@ def area_rectangle(length: float, width: float) -> str:
         width: Width of the rectangle
     """
     area = length * width
-    return f"Area of rectangle: {area} square units"
+    return ToolResult({"area": area}, units="square units", formula=f"{length:g} × {width:g}", decimals=4)
 
 
-@tool
-def area_triangle(base: float, height: float) -> str:
+@math_tool
+def area_triangle(base: float, height: float) -> ToolResult:
     """Calculate the area of a triangle.
     
     Args:
@@ -192,33 +258,35 @@ def area_triangle(base: float, height: float) -> str:
         height: Height of the triangle
     """
     area = 0.5 * base * height
-    return f"Area of triangle: {area} square units"
+    return ToolResult({"area": area}, units="square units", formula=f"½ × {base:g} × {height:g}", decimals=4)
 
 
-@tool
-def area_circle(radius: float) -> str:
+@math_tool
+def area_circle(radius: float) -> ToolResult:
     """Calculate the area of a circle.
     
     Args:
         radius: Radius of the circle
     """
     area = math.pi * radius**2
-    return f"Area of circle: {area:.4f} square units (π × r² = π × {radius}²)"
+    return ToolResult({"area": area}, exact=_pi_multiple(exact.to_exact(radius)**2), units="square units",
+                      formula=f"π × {radius:g}²", decimals=4)
 
 
-@tool
-def circumference_circle(radius: float) -> str:
+@math_tool
+def circumference_circle(radius: float) -> ToolResult:
     """Calculate the circumference of a circle.
     
     Args:
         radius: Radius of the circle
     """
     circumference = 2 * math.pi * radius
-    return f"Circumference of circle: {circumference:.4f} units (2πr = 2π × {radius})"
+    return ToolResult({"circumference": circumference}, exact=_pi_multiple(2 * exact.to_exact(radius)),
+                      units="units", formula=f"2π × {radius:g}", decimals=4)
 
 
-@tool
-def volume_cylinder(radius: float, height: float) -> str:
+@math_tool
+def volume_cylinder(radius: float, height: float) -> ToolResult:
     """Calculate the volume of a cylinder.
     
     Args:
@@ -226,22 +294,26 @@ def volume_cylinder(radius: float, height: float) -> str:
         height: Height of the cylinder
     """
     volume = math.pi * radius**2 * height
-    return f"Volume of cylinder: {volume:.4f} cubic units (πr²h = π × {radius}² × {height})"
+    r, h = exact.to_exact(radius), exact.to_exact(height)
+    return ToolResult({"volume": volume}, exact=_pi_multiple(r**2 * h), units="cubic units",
+                      formula=f"π × {radius:g}² × {height:g}", decimals=4)
 
 
-@tool
-def volume_sphere(radius: float) -> str:
+@math_tool
+def volume_sphere(radius: float) -> ToolResult:
     """Calculate the volume of a sphere.
     
     Args:
         radius: Radius of the sphere
     """
     volume = (4/3) * math.pi * radius**3
-    return f"Volume of sphere: {volume:.4f} cubic units ((4/3)πr³ = (4/3)π × {radius}³)"
+    r = exact.to_exact(radius)
+    return ToolResult({"volume": volume}, exact=_pi_multiple(exact.divide(4 * r**3, 3)), units="cubic units",
+                      formula=f"(4/3)π × {radius:g}³", decimals=4)
 
 
-@tool
-def volume_cone(radius: float, height: float) -> str:
+@math_tool
+def volume_cone(radius: float, height: float) -> ToolResult:
     """Calculate the volume of a cone.
     
     Args:
@@ -249,11 +321,13 @@ def volume_cone(radius: float, height: float) -> str:
         height: Height of the cone
     """
     volume = (1/3) * math.pi * radius**2 * height
-    return f"Volume of cone: {volume:.4f} cubic units ((1/3)πr²h = (1/3)π × {radius}² × {height})"
+    r, h = exact.to_exact(radius), exact.to_exact(height)
+    return ToolResult({"volume": volume}, exact=_pi_multiple(exact.divide(r**2 * h, 3)), units="cubic units",
+                      formula=f"(1/3)π × {radius:g}² × {height:g}", decimals=4)
 
 
-@tool
-def pythagorean_theorem(a: Optional[float] = None, b: Optional[float] = None, c: Optional[float] = None) -> str:
+@math_tool
+def pythagorean_theorem(a: Optional[float] = None, b: Optional[float] = None, c: Optional[float] = None) -> ToolResult:
     """Calculate the missing side of a right triangle using the Pythagorean theorem (a² + b² = c²).
     Provide any two sides to find the third.
     
@@ -264,95 +338,216 @@ def pythagorean_theorem(a: Optional[float] = None, b: Optional[float] = None, c:
     """
     if a is not None and b is not None and c is None:
         c = math.sqrt(a**2 + b**2)
-        return f"Hypotenuse c = {c:.4f} (√(a² + b²) = √({a}² + {b}²))"
+        return ToolResult({"c": c}, formula=f"√({a:g}² + {b:g}²)", decimals=4)
     elif a is not None and c is not None and b is None:
         b = math.sqrt(c**2 - a**2)
-        return f"Side b = {b:.4f} (√(c² - a²) = √({c}² - {a}²))"
+        return ToolResult({"b": b}, formula=f"√({c:g}² - {a:g}²)", decimals=4)
     elif b is not None and c is not None and a is None:
         a = math.sqrt(c**2 - b**2)
-        return f"Side a = {a:.4f} (√(c² - b²) = √({c}² - {b}²))"
+        return ToolResult({"a": a}, formula=f"√({c:g}² - {b:g}²)", decimals=4)
     else:
-        return "Error: Please provide exactly two sides to find the third"
+        return ToolResult.failure("Please provide exactly two sides to find the third")
+
+
+@math_tool
+def area_circle_table(radii: List[float]) -> ToolResult:
+    """Calculate the areas of several circles at once and return them as a table.
+    
+    Args:
+        radii: Radii of the circles
+    """
+    if not radii:
+        return ToolResult.failure("List cannot be empty")
+    if len(radii) > MAX_TABLE_ROWS:
+        return ToolResult.failure(f"A table can have at most {MAX_TABLE_ROWS} rows")
+    r = np.asarray(radii, dtype=float)
+    return ToolResult(units="square units", formula="π × r²", table=Table.from_columns(["r", "area"], r, np.pi * r**2),
+                      decimals=4)
+
+
+@math_tool
+def volume_cylinder_table(radii: List[float], heights: List[float]) -> ToolResult:
+    """Calculate the volumes of several cylinders at once and return them as a table.
+    Give one height to use it for every radius (or one radius for every height).
+    
+    Args:
+        radii: Radii of the bases
+        heights: Heights of the cylinders
+    """
+    if not radii or not heights:
+        return ToolResult.failure("Lists cannot be empty")
+    r = np.asarray(radii, dtype=float)
+    h = np.asarray(heights, dtype=float)
+    if r.size != h.size and 1 not in (r.size, h.size):
+        return ToolResult.failure("Give as many heights as radii, or a single height")
+    r, h = np.broadcast_arrays(r, h)
+    if r.size > MAX_TABLE_ROWS:
+        return ToolResult.failure(f"A table can have at most {MAX_TABLE_ROWS} rows")
+    return ToolResult(units="cubic units", formula="πr²h",
+                      table=Table.from_columns(["r", "h", "volume"], r, h, np.pi * r**2 * h), decimals=4)
 
 
 # ========== TRIGONOMETRY TOOLS ==========
 
-@tool
-def sin(angle_degrees: float) -> str:
+def _trig(name: str, angle_degrees: float) -> ToolResult:
+    angle = exact.format_number(angle_degrees)
+    label = f"{name}({angle}°)"
+    standard = trig_tables.lookup(name, angle_degrees)
+    if standard is not None and not standard.defined:
+        return ToolResult(note=f"{label} is undefined (cos({angle}°) = 0)")
+    if standard is not None:
+        return ToolResult({label: standard.value}, exact=standard.text)
+    result = getattr(math, name)(math.radians(angle_degrees))
+    return ToolResult({label: result})
+
+
+@math_tool
+def sin(angle_degrees: float) -> ToolResult:
     """Calculate the sine of an angle in degrees.
     
     Args:
         angle_degrees: Angle in degrees
     """
-    result = math.sin(math.radians(angle_degrees))
-    return f"sin({angle_degrees}°) = {result:.6f}"
+    return _trig("sin", angle_degrees)
 
 
-@tool
-def cos(angle_degrees: float) -> str:
+@math_tool
+def cos(angle_degrees: float) -> ToolResult:
     """Calculate the cosine of an angle in degrees.
     
     Args:
         angle_degrees: Angle in degrees
     """
-    result = math.cos(math.radians(angle_degrees))
-    return f"cos({angle_degrees}°) = {result:.6f}"
+    return _trig("cos", angle_degrees)
 
 
-@tool
-def tan(angle_degrees: float) -> str:
+@math_tool
+def tan(angle_degrees: float) -> ToolResult:
     """Calculate the tangent of an angle in degrees.
     
     Args:
         angle_degrees: Angle in degrees
     """
-    result = math.tan(math.radians(angle_degrees))
-    return f"tan({angle_degrees}°) = {result:.6f}"
+    return _trig("tan", angle_degrees)
 
 
-@tool
-def arcsin(value: float) -> str:
+def _inverse_trig(name: str, value: float) -> ToolResult:
+    label = f"arc{name}({value:g})"
+    standard = trig_tables.inverse(name, value)
+    if standard is not None:
+        return ToolResult({label: standard}, units="°")
+    result = math.degrees(getattr(math, f"a{name}")(value))
+    return ToolResult({label: result}, units="°", decimals=4)
+
+
+@math_tool
+def arcsin(value: float) -> ToolResult:
     """Calculate the arcsine (inverse sine) in degrees.
     
     Args:
         value: Value between -1 and 1
     """
     if -1 <= value <= 1:
-        result = math.degrees(math.asin(value))
-        return f"arcsin({value}) = {result:.4f}°"
+        return _inverse_trig("sin", value)
     else:
-        return "Error: Value must be between -1 and 1"
+        return ToolResult.failure("Value must be between -1 and 1")
 
 
-@tool
-def arccos(value: float) -> str:
+@math_tool
+def arccos(value: float) -> ToolResult:
     """Calculate the arccosine (inverse cosine) in degrees.
     
     Args:
         value: Value between -1 and 1
     """
     if -1 <= value <= 1:
-        result = math.degrees(math.acos(value))
-        return f"arccos({value}) = {result:.4f}°"
+        return _inverse_trig("cos", value)
     else:
-        return "Error: Value must be between -1 and 1"
+        return ToolResult.failure("Value must be between -1 and 1")
 
 
-@tool
-def arctan(value: float) -> str:
+@math_tool
+def arctan(value: float) -> ToolResult:
     """Calculate the arctangent (inverse tangent) in degrees.
     
     Args:
         value: Any real number
     """
-    result = math.degrees(math.atan(value))
-    return f"arctan({value}) = {result:.4f}°"
+    return _inverse_trig("tan", value)
+
+
+def _trig_table(name: str, angles_degrees, start, stop, step) -> ToolResult:
+    try:
+        angles = _table_inputs(angles_degrees, start, stop, step)
+    except ValueError as e:
+        return ToolResult.failure(str(e))
+    radians = np.radians(angles)
+    if name == "sin":
+        values = np.sin(radians).tolist()
+    elif name == "cos":
+        values = np.cos(radians).tolist()
+    else:
+        # tan is undefined where cos is 0 (90°, 270°, ...)
+        undefined = np.isclose(np.cos(radians), 0, atol=1e-12)
+        values = ["undefined" if u else t for u, t in zip(undefined.tolist(), np.tan(radians).tolist())]
+    # Standard angles (multiples of 15°) also get their exact value, and no rounding noise
+    standard = [trig_tables.lookup(name, angle) for angle in angles.tolist()]
+    values = [s.value if s is not None and s.defined else v for s, v in zip(standard, values)]
+    if not any(standard):
+        return ToolResult(table=Table.from_columns(["angle (°)", name], angles, values))
+    exact_values = [s.text if s is not None else "" for s in standard]
+    return ToolResult(table=Table.from_columns(["angle (°)", name, "exact"], angles, values, exact_values))
+
+
+@math_tool
+def sin_table(angles_degrees: Optional[List[float]] = None, start: Optional[float] = None,
+              stop: Optional[float] = None, step: Optional[float] = None) -> ToolResult:
+    """Tabulate the sine of many angles (degrees) in one call.
+    Give either a list of angles or a range from start to stop (inclusive) in steps of step.
+    
+    Args:
+        angles_degrees: Angles in degrees
+        start: First angle of the range
+        stop: Last angle of the range
+        step: Step between angles (default 1)
+    """
+    return _trig_table("sin", angles_degrees, start, stop, step)
+
+
+@math_tool
+def cos_table(angles_degrees: Optional[List[float]] = None, start: Optional[float] = None,
+              stop: Optional[float] = None, step: Optional[float] = None) -> ToolResult:
+    """Tabulate the cosine of many angles (degrees) in one call.
+    Give either a list of angles or a range from start to stop (inclusive) in steps of step.
+    
+    Args:
+        angles_degrees: Angles in degrees
+        start: First angle of the range
+        stop: Last angle of the range
+        step: Step between angles (default 1)
+    """
+    return _trig_table("cos", angles_degrees, start, stop, step)
+
+
+@math_tool
+def tan_table(angles_degrees: Optional[List[float]] = None, start: Optional[float] = None,
+              stop: Optional[float] = None, step: Optional[float] = None) -> ToolResult:
+    """Tabulate the tangent of many angles (degrees) in one call.
+    Give either a list of angles or a range from start to stop (inclusive) in steps of step.
+    
+    Args:
+        angles_degrees: Angles in degrees
+        start: First angle of the range
+        stop: Last angle of the range
+        step: Step between angles (default 1)
+    """
+    return _trig_table("tan", angles_degrees, start, stop, step)
 
 
 # ========== LOGARITHMS AND EXPONENTIALS ==========
 
-@tool
-def logarithm(base: float, number: float) -> str:
+@math_tool
+def logarithm(base: float, number: float) -> ToolResult:
     """Calculate the logarithm of a number with a given base.
     
     Args:
@@ -360,124 +555,194 @@ def logarithm(base: float, number: float) -> str:
         number: Number to take the logarithm of
     """
     if base <= 0 or base == 1:
-        return "Error: Base must be positive and not equal to 1"
+        return ToolResult.failure("Base must be positive and not equal to 1")
     if number <= 0:
-        return "Error: Number must be positive"
+        return ToolResult.failure("Number must be positive")
     result = math.log(number, base)
-    return f"log_{base}({number}) = {result:.6f}"
+    return ToolResult({f"log_{base:g}({number:g})": result}, formula=f"ln({number:g}) / ln({base:g})")
 
 
-@tool
-def natural_log(number: float) -> str:
+@math_tool
+def natural_log(number: float) -> ToolResult:
     """Calculate the natural logarithm (base e) of a number.
     
     Args:
         number: Number to take the natural logarithm of
     """
     if number <= 0:
-        return "Error: Number must be positive"
+        return ToolResult.failure("Number must be positive")
     result = math.log(number)
-    return f"ln({number}) = {result:.6f}"
+    return ToolResult({f"ln({number:g})": result})
 
 
-@tool
-def log10(number: float) -> str:
+@math_tool
+def log10(number: float) -> ToolResult:
     """Calculate the base-10 logarithm of a number.
     
     Args:
         number: Number to take the base-10 logarithm of
     """
     if number <= 0:
-        return "Error: Number must be positive"
+        return ToolResult.failure("Number must be positive")
     result = math.log10(number)
-    return f"log₁₀({number}) = {result:.6f}"
+    return ToolResult({f"log₁₀({number:g})": result})
 
 
-@tool
-def exponential(power: float) -> str:
+@math_tool
+def exponential(power: float) -> ToolResult:
     """Calculate e raised to a power.
     
     Args:
         power: The exponent
     """
     result = math.exp(power)
-    return f"e^{power} = {result:.6f}"
+    return ToolResult({f"e^{power:g}": result})
 
 
 # ========== STATISTICS TOOLS ==========
+# Statistics tools take the numbers inline or, for large data, a dataset id
+# (uploaded files) or a CSV/text file in the data directory, so the data stays
+# out of the prompt.
+
+def _statistics_values(numbers: Optional[List[float]], dataset: Optional[str]) -> np.ndarray:
+    if dataset:
+        return stats_engine.load_dataset(dataset)
+    return np.asarray(numbers or [], dtype=float)
+
 
-@tool
-def mean(numbers: List[float]) -> str:
+@math_tool
+def mean(numbers: Optional[List[float]] = None, dataset: Optional[str] = None) -> ToolResult:
     """Calculate the mean (average) of a list of numbers.
     
     Args:
         numbers: List of numbers
+        dataset: Dataset id or CSV file name in the data directory, instead of numbers
     """
-    if not numbers:
-        return "Error: List cannot be empty"
-    result = statistics.mean(numbers)
-    return f"Mean: {result:.4f}"
+    try:
+        values = _statistics_values(numbers, dataset)
+    except ValueError as e:
+        return ToolResult.failure(str(e))
+    if values.size == 0:
+        return ToolResult.failure("List cannot be empty")
+    result = stats_engine.summarize(values, track_frequencies=False).mean
+    return ToolResult({"mean": result}, decimals=4)
 
 
-@tool
-def median(numbers: List[float]) -> str:
+@math_tool
+def median(numbers: Optional[List[float]] = None, dataset: Optional[str] = None) -> ToolResult:
     """Calculate the median of a list of numbers.
     
     Args:
         numbers: List of numbers
+        dataset: Dataset id or CSV file name in the data directory, instead of numbers
     """
-    if not numbers:
-        return "Error: List cannot be empty"
-    result = statistics.median(numbers)
-    return f"Median: {result:.4f}"
+    try:
+        values = _statistics_values(numbers, dataset)
+    except ValueError as e:
+        return ToolResult.failure(str(e))
+    if values.size == 0:
+        return ToolResult.failure("List cannot be empty")
+    result = stats_engine.median(values)
+    return ToolResult({"median": result}, decimals=4)
 
 
-@tool
-def mode(numbers: List[float]) -> str:
+@math_tool
+def mode(numbers: Optional[List[float]] = None, dataset: Optional[str] = None) -> ToolResult:
     """Calculate the mode (most frequent value) of a list of numbers.
     
     Args:
         numbers: List of numbers
+        dataset: Dataset id or CSV file name in the data directory, instead of numbers
     """
-    if not numbers:
-        return "Error: List cannot be empty"
     try:
-        result = statistics.mode(numbers)
-        return f"Mode: {result}"
-    except statistics.StatisticsError:
-        return "No unique mode found (all values appear equally often)"
-
-
-@tool
-def standard_deviation(numbers: List[float]) -> str:
+        values = _statistics_values(numbers, dataset)
+    except ValueError as e:
+        return ToolResult.failure(str(e))
+    if values.size == 0:
+        return ToolResult.failure("List cannot be empty")
+    modes = stats_engine.summarize(values).modes()
+    if not modes:
+        return ToolResult(note="No unique mode found (all values appear equally often)")
+    if len(modes) > 1:
+        return ToolResult({"modes": list(modes)}, note="multimodal")
+    return ToolResult({"mode": modes[0]})
+
+
+@math_tool
+def standard_deviation(numbers: Optional[List[float]] = None, dataset: Optional[str] = None) -> ToolResult:
     """Calculate the standard deviation of a list of numbers.
     
     Args:
         numbers: List of numbers
+        dataset: Dataset id or CSV file name in the data directory, instead of numbers
     """
-    if not numbers or len(numbers) < 2:
-        return "Error: Need at least 2 numbers"
-    result = statistics.stdev(numbers)
-    return f"Standard deviation: {result:.4f}"
+    try:
+        values = _statistics_values(numbers, dataset)
+    except ValueError as e:
+        return ToolResult.failure(str(e))
+    if values.size < 2:
+        return ToolResult.failure("Need at least 2 numbers")
+    result = math.sqrt(stats_engine.summarize(values, track_frequencies=False).variance)
+    return ToolResult({"standard deviation": result}, decimals=4)
 
 
-@tool
-def variance(numbers: List[float]) -> str:
+@math_tool
+def variance(numbers: Optional[List[float]] = None, dataset: Optional[str] = None) -> ToolResult:
     """Calculate the variance of a list of numbers.
     
     Args:
         numbers: List of numbers
+        dataset: Dataset id or CSV file name in the data directory, instead of numbers
+    """
+    try:
+        values = _statistics_values(numbers, dataset)
+    except ValueError as e:
+        return ToolResult.failure(str(e))
+    if values.size < 2:
+        return ToolResult.failure("Need at least 2 numbers")
+    result = stats_engine.summarize(values, track_frequencies=False).variance
+    return ToolResult({"variance": result}, decimals=4)
+
+
+@math_tool
+def describe_statistics(numbers: Optional[List[float]] = None, dataset: Optional[str] = None) -> ToolResult:
+    """Calculate every summary statistic (count, mean, median, mode, standard deviation,
+    variance, min, max) of a dataset in one call. Prefer this when several statistics are needed.
+    
+    Args:
+        numbers: List of numbers
+        dataset: Dataset id or CSV file name in the data directory, instead of numbers
     """
-    if not numbers or len(numbers) < 2:
-        return "Error: Need at least 2 numbers"
-    result = statistics.variance(numbers)
-    return f"Variance: {result:.4f}"
+    try:
+        values = _statistics_values(numbers, dataset)
+    except ValueError as e:
+        return ToolResult.failure(str(e))
+    if values.size == 0:
+        return ToolResult.failure("List cannot be empty")
+    summary = stats_engine.describe(values)
+    modes = list(summary["modes"][:5]) or "none"
+    result = {
+        "count": summary["count"],
+        "mean": summary["mean"],
+        "median": summary["median"],
+        "mode": modes,
+    }
+    if summary["variance"] is not None:
+        result["standard deviation"] = summary["standard_deviation"]
+        result["variance"] = summary["variance"]
+    result["min"], result["max"] = summary["min"], summary["max"]
+    notes = []
+    if dataset:
+        notes.append(f"summary of {stats_engine.dataset_name(dataset)}")
+    if len(summary["modes"]) > 5:
+        notes.append(f"{len(summary['modes']) - 5} more modes")
+    return ToolResult(result, note="; ".join(notes) or None, decimals=4)
 
 
 # ========== SEQUENCES AND SERIES ==========
 
-@tool
-def arithmetic_sequence_nth_term(first_term: float, common_difference: float, n: int) -> str:
+@math_tool
+def arithmetic_sequence_nth_term(first_term: float, common_difference: float, n: int) -> ToolResult:
     """Find the nth term of an arithmetic sequence: aₙ = a₁ + (n-1)d
     
     Args:
@@ -485,12 +750,14 @@ def arithmetic_sequence_nth_term(first_term: float, common_difference: float, n:
         common_difference: Common difference (d)
         n: Term number
     """
-    nth_term = first_term + (n - 1) * common_difference
-    return f"Term {n} (aₙ): {nth_term} (a₁ + (n-1)d = {first_term} + ({n}-1) × {common_difference})"
+    a1, d = exact.to_exact(first_term), exact.to_exact(common_difference)
+    nth_term = a1 + (n - 1) * d
+    first_term, common_difference = exact.format_number(a1), exact.format_number(d)
+    return ToolResult({f"a_{n}": nth_term}, formula=f"{first_term} + ({n}-1) × {common_difference}")
 
 
-@tool
-def arithmetic_sequence_sum(first_term: float, last_term: float, n: int) -> str:
+@math_tool
+def arithmetic_sequence_sum(first_term: float, last_term: float, n: int) -> ToolResult:
     """Find the sum of the first n terms of an arithmetic sequence: Sₙ = n(a₁ + aₙ)/2
     
     Args:
@@ -498,12 +765,14 @@ def arithmetic_sequence_sum(first_term: float, last_term: float, n: int) -> str:
         last_term: Last term (aₙ)
         n: Number of terms
     """
-    sum_result = n * (first_term + last_term) / 2
-    return f"Sum of first {n} terms: {sum_result} (n(a₁ + aₙ)/2 = {n}({first_term} + {last_term})/2)"
+    a1, an = exact.to_exact(first_term), exact.to_exact(last_term)
+    sum_result = exact.divide(n * (a1 + an), 2)
+    first_term, last_term = exact.format_number(a1), exact.format_number(an)
+    return ToolResult({f"S_{n}": sum_result}, formula=f"{n}({first_term} + {last_term})/2")
 
 
-@tool
-def geometric_sequence_nth_term(first_term: float, common_ratio: float, n: int) -> str:
+@math_tool
+def geometric_sequence_nth_term(first_term: float, common_ratio: float, n: int) -> ToolResult:
     """Find the nth term of a geometric sequence: aₙ = a₁ × r^(n-1)
     
     Args:
@@ -511,12 +780,17 @@ def geometric_sequence_nth_term(first_term: float, common_ratio: float, n: int)
         common_ratio: Common ratio (r)
         n: Term number
     """
-    nth_term = first_term * (common_ratio ** (n - 1))
-    return f"Term {n} (aₙ): {nth_term} (a₁ × r^(n-1) = {first_term} × {common_ratio}^({n}-1))"
+    a1, r = exact.to_exact(first_term), exact.to_exact(common_ratio)
+    try:
+        nth_term = a1 * exact.power(r, n - 1)
+    except (ZeroDivisionError, OverflowError) as e:
+        return ToolResult.failure(str(e))
+    first_term, common_ratio = exact.format_number(a1), exact.format_number(r)
+    return ToolResult({f"a_{n}": nth_term}, formula=f"{first_term} × {common_ratio}^({n}-1)")
 
 
-@tool
-def geometric_sequence_sum(first_term: float, common_ratio: float, n: int) -> str:
+@math_tool
+def geometric_sequence_sum(first_term: float, common_ratio: float, n: int) -> ToolResult:
     """Find the sum of the first n terms of a geometric sequence: Sₙ = a₁(1-rⁿ)/(1-r)
     
     Args:
@@ -524,17 +798,62 @@ def geometric_sequence_sum(first_term: float, common_ratio: float, n: int) -> st
         common_ratio: Common ratio (r)
         n: Number of terms
     """
-    if common_ratio == 1:
-        sum_result = n * first_term
-        return f"Sum of first {n} terms: {sum_result} (when r=1, Sₙ = n × a₁)"
-    sum_result = first_term * (1 - common_ratio**n) / (1 - common_ratio)
-    return f"Sum of first {n} terms: {sum_result:.4f} (a₁(1-rⁿ)/(1-r) = {first_term}(1-{common_ratio}^{n})/(1-{common_ratio}))"
+    a1, r = exact.to_exact(first_term), exact.to_exact(common_ratio)
+    if r == 1:
+        sum_result = n * a1
+        return ToolResult({f"S_{n}": sum_result}, formula=f"{n} × {exact.format_number(a1)} (when r = 1, Sₙ = n × a₁)")
+    try:
+        sum_result = exact.divide(a1 * (1 - exact.power(r, n)), 1 - r)
+    except (ZeroDivisionError, OverflowError) as e:
+        return ToolResult.failure(str(e))
+    first_term, common_ratio = exact.format_number(a1), exact.format_number(r)
+    return ToolResult({f"S_{n}": sum_result}, formula=f"{first_term}(1-{common_ratio}^{n})/(1-{common_ratio})")
+
+
+@math_tool
+def arithmetic_sequence_terms(first_term: float, common_difference: float, n_terms: int) -> ToolResult:
+    """List the first n terms of an arithmetic sequence in one call: aₙ = a₁ + (n-1)d
+    
+    Args:
+        first_term: First term (a₁)
+        common_difference: Common difference (d)
+        n_terms: Number of terms to list
+    """
+    if n_terms < 1 or n_terms > MAX_TABLE_ROWS:
+        return ToolResult.failure(f"Number of terms must be between 1 and {MAX_TABLE_ROWS}")
+    a1, d = exact.to_exact(first_term), exact.to_exact(common_difference)
+    n = range(1, n_terms + 1)
+    terms = [a1 + (i - 1) * d for i in n]
+    first_term, common_difference = exact.format_number(a1), exact.format_number(d)
+    return ToolResult(formula=f"aₙ = {first_term} + (n-1) × {common_difference}",
+                      table=Table.from_columns(["n", "aₙ"], n, terms))
+
+
+@math_tool
+def geometric_sequence_terms(first_term: float, common_ratio: float, n_terms: int) -> ToolResult:
+    """List the first n terms of a geometric sequence in one call: aₙ = a₁ × r^(n-1)
+    
+    Args:
+        first_term: First term (a₁)
+        common_ratio: Common ratio (r)
+        n_terms: Number of terms to list
+    """
+    if n_terms < 1 or n_terms > MAX_TABLE_ROWS:
+        return ToolResult.failure(f"Number of terms must be between 1 and {MAX_TABLE_ROWS}")
+    a1, r = exact.to_exact(first_term), exact.to_exact(common_ratio)
+    n = range(1, n_terms + 1)
+    try:
+        terms = [a1 * exact.power(r, i - 1) for i in n]
+    except (ZeroDivisionError, OverflowError) as e:
+        return ToolResult.failure(str(e))
+    first_term, common_ratio = exact.format_number(a1), exact.format_number(r)
+    return ToolResult(formula=f"aₙ = {first_term} × {common_ratio}^(n-1)", table=Table.from_columns(["n", "aₙ"], n, terms))
 
 
 # ========== PERCENTAGES AND RATIOS ==========
 
-@tool
-def percentage(part: float, whole: float) -> str:
+@math_tool
+def percentage(part: float, whole: float) -> ToolResult:
     """Calculate what percentage one number is of another.
     
     Args:
@@ -542,25 +861,26 @@ def percentage(part: float, whole: float) -> str:
         whole: The whole
     """
     if whole == 0:
-        return "Error: Whole cannot be zero"
+        return ToolResult.failure("Whole cannot be zero")
     result = (part / whole) * 100
-    return f"{part} is {result:.2f}% of {whole}"
+    return ToolResult({f"{part:g} as a share of {whole:g}": result}, units="%", decimals=2)
 
 
-@tool
-def percentage_of(percentage: float, number: float) -> str:
+@math_tool
+def percentage_of(percentage: float, number: float) -> ToolResult:
     """Calculate a percentage of a number.
     
     Args:
         percentage: The percentage (e.g., 25 for 25%)
         number: The number
     """
-    result = (percentage / 100) * number
-    return f"{percentage}% of {number} = {result}"
+    p, x = exact.to_exact(percentage), exact.to_exact(number)
+    result = exact.divide(p * x, 100)
+    return ToolResult({f"{exact.format_number(p)}% of {exact.format_number(x)}": result})
 
 
-@tool
-def ratio_simplify(a: float, b: float) -> str:
+@math_tool
+def ratio_simplify(a: float, b: float) -> ToolResult:
     """Simplify a ratio to its simplest form.
     
     Args:
@@ -568,70 +888,138 @@ def ratio_simplify(a: float, b: float) -> str:
         b: Second number
     """
     if b == 0:
-        return "Error: Second number cannot be zero"
-    gcd = math.gcd(int(a), int(b)) if a == int(a) and b == int(b) else 1
-    simplified_a = a / gcd if gcd > 1 else a
-    simplified_b = b / gcd if gcd > 1 else b
-    return f"Ratio {a}:{b} simplified = {simplified_a}:{simplified_b}"
+        return ToolResult.failure("Second number cannot be zero")
+    # Decimal ratios scale to whole numbers first: 1.5:2.5 = 15:25 = 3:5
+    simplified_a, simplified_b = exact.ratio(a, b)
+    a, b = exact.format_number(exact.to_exact(a)), exact.format_number(exact.to_exact(b))
+    return ToolResult({f"{a}:{b}": f"{simplified_a}:{simplified_b}"}, note="simplest form")
 
 
-def get_all_tools():
-    """Get all math tools for the agent."""
-    return [
-        # Basic arithmetic
-        calculator, power, square_root,
-        # Algebra
-        solve_linear_equation, solve_quadratic_equation, factor_expression, expand_expression,
-        # Geometry
+# Tools whose work runs in the SymPy process pool (see symbolic_pool.py)
+SYMBOLIC_TOOLS = {"solve_linear_equation", "factor_expression", "expand_expression"}
+
+
+# Tools grouped by topic; the tool router sends each question only the groups it needs
+TOOL_GROUPS = {
+    "basic": [calculator, power, square_root, evaluate_expression],
+    "algebra": [solve_linear_equation, solve_quadratic_equation, factor_expression, expand_expression],
+    "geometry": [
         area_rectangle, area_triangle, area_circle, circumference_circle,
         volume_cylinder, volume_sphere, volume_cone, pythagorean_theorem,
-        # Trigonometry
-        sin, cos, tan, arcsin, arccos, arctan,
-        # Logarithms
-        logarithm, natural_log, log10, exponential,
-        # Statistics
-        mean, median, mode, standard_deviation, variance,
-        # Sequences
+        area_circle_table, volume_cylinder_table,
+    ],
+    "trigonometry": [sin, cos, tan, arcsin, arccos, arctan, sin_table, cos_table, tan_table],
+    "logarithms": [logarithm, natural_log, log10, exponential],
+    "statistics": [mean, median, mode, standard_deviation, variance, describe_statistics],
+    "sequences": [
         arithmetic_sequence_nth_term, arithmetic_sequence_sum,
         geometric_sequence_nth_term, geometric_sequence_sum,
-        # Percentages and ratios
-        percentage, percentage_of, ratio_simplify,
-    ]
+        arithmetic_sequence_terms, geometric_sequence_terms,
+    ],
+    "percentages": [percentage, percentage_of, ratio_simplify],
+}
 
 
-def initialize_agent():
-    """Initialize the math agent with all tools. Returns (agent_executor, system_message, api_status)."""
+def get_tool_groups():
+    """Get the math tools for the agent, by topic group."""
+    return {name: [get_tool(func) for func in functions] for name, functions in TOOL_GROUPS.items()}
+
+
+def get_all_tools():
+    """Get all math tools for the agent."""
+    return [t for group in get_tool_groups().values() for t in group]
+
+
+def get_tool_specs():
+    """Get lightweight specs of all math tools (name, description, invoke) that don't need LangChain."""
+    return [get_spec(func) for functions in TOOL_GROUPS.values() for func in functions]
+
+
+# With both API keys set, requests go to the faster healthy provider with failover (0 uses OpenAI only)
+MODEL_ROUTING = os.getenv("MATH_AGENT_MODEL_ROUTING", "1").lower() not in ("0", "false", "no", "")
+
+
+def model_settings():
+    """Settings of the chat model for each configured provider. Returns ([(provider, ChatOpenAI kwargs)], api_status).
+
+    Only reads the environment, so a missing key is reported before the LLM client is imported.
+    """
     # Try OpenAI API key first, fallback to OpenRouter
     openai_api_key = os.getenv("OPENAI_API_KEY")
     openrouter_api_key = os.getenv("OPENROUTER_API_KEY")
-    
+
+    providers = []
     if openai_api_key:
         # Use direct OpenAI API
-        model = ChatOpenAI(
+        providers.append(("openai", dict(
             api_key=openai_api_key,
             model="gpt-4o-mini",  # You can change to "gpt-4o" or "gpt-3.5-turbo"
             temperature=0,
-        )
-        api_status = "Using direct OpenAI API"
-    elif openrouter_api_key:
+        )))
+    if openrouter_api_key and (not providers or MODEL_ROUTING):
         # Fallback to OpenRouter
-        model = ChatOpenAI(
+        providers.append(("openrouter", dict(
             api_key=openrouter_api_key,
-            base_url="https://openrouter.ai/api/v1",
+            base_url=os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1"),
             model="openai/gpt-4o-mini",  # You can change to "openai/gpt-4" or "openai/gpt-3.5-turbo"
             temperature=0,
-        )
-        api_status = "Using OpenRouter API (fallback)"
-    else:
+        )))
+    if not providers:
         raise ValueError(
             "Neither OPENAI_API_KEY nor OPENROUTER_API_KEY found. "
             "Please add one of them to your .env file."
         )
 
-    # Comprehensive math tools for secondary school
-    tools = get_all_tools()
+    if len(providers) > 1:
+        api_status = "Routing between OpenAI and OpenRouter APIs (fastest healthy first, with failover)"
+    elif openai_api_key:
+        api_status = "Using direct OpenAI API"
+    else:
+        api_status = "Using OpenRouter API (fallback)"
+    return providers, api_status
+
+
+def create_model():
+    """Create the chat model for the configured providers. Returns (model, api_status).
+
+    Every model shares the connection pool in http_pool, so building another agent
+    (scripts, batch jobs, tests) reuses open connections instead of new TLS handshakes.
+    With both providers configured the model is a RoutedChatModel over the two.
+    """
+    from langchain_openai import ChatOpenAI
+
+    providers, api_status = model_settings()
+    models = []
+    for name, settings in providers:
+        settings = {**http_pool.client_settings(), **settings}
+        # ChatOpenAI only reports token usage of streams against api.openai.com by itself
+        # when it owns the HTTP client; OpenRouter accepts the same stream option
+        if name == "openrouter" or ("base_url" not in settings and "OPENAI_BASE_URL" not in os.environ):
+            settings["stream_usage"] = True
+        if len(providers) > 1:
+            # The router retries on the other provider instead
+            settings["max_retries"] = 0
+        models.append((name, ChatOpenAI(**settings)))
+
+    if len(models) == 1:
+        return models[0][1], api_status
+    from model_router import RoutedChatModel
+
+    return RoutedChatModel.from_models(models), api_status
+
+
+def initialize_agent():
+    """Initialize the math agent with all tools. Returns (agent_executor, system_message, api_status)."""
+    from langchain_core.messages import SystemMessage
+    from tool_router import build_agent
+
+    model, api_status = create_model()
+
+    # Start the SymPy worker processes in the background so the first algebra question is fast
+    threading.Thread(target=get_symbolic_pool().warm, daemon=True).start()
     
-    agent_executor = create_react_agent(model, tools)
+    # Comprehensive math tools for secondary school, offered per question by topic group
+    agent_executor = build_agent(model, get_tool_groups())
     
     # Load system prompt once at startup
     system_prompt = load_system_prompt()
@@ -640,8 +1028,101 @@ def initialize_agent():
     return agent_executor, system_message, api_status
 
 
-def main():
-    agent_executor, system_message, api_status = initialize_agent()
+class AgentLoader:
+    """Runs initialize_agent() in a background thread so the prompt appears right away.
+
+    Questions answered locally (fast path, response cache) never wait for it;
+    the first question that needs the model blocks in get() until it is ready.
+    """
+
+    def __init__(self):
+        self._thread = None
+        self._result = None
+        self._error = None
+
+    def _load(self):
+        try:
+            self._result = initialize_agent()
+        except Exception as e:
+            self._error = e
+
+    def start(self) -> "AgentLoader":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._load, name="agent-loader", daemon=True)
+            self._thread.start()
+        return self
+
+    def get(self):
+        """(agent_executor, system_message, api_status), once initialization has finished."""
+        self.start()
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+
+def build_messages(system_message, question: str, history=()) -> list:
+    """Messages for one agent request, static prefix first.
+
+    The system prompt (after the bound tool schemas) is identical for every
+    request offered the same tools, so providers can serve it from their prompt
+    cache; everything that varies (conversation history, the question) comes
+    after it.
+    """
+    from langchain_core.messages import HumanMessage
+
+    return [system_message, *history, HumanMessage(content=question)]
+
+
+def profile_startup(limit: int = 15):
+    """Print the import time of main in a fresh interpreter, broken down by top-level package."""
+    import subprocess
+    import sys
+
+    output = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                            cwd=Path(__file__).parent, capture_output=True, text=True, check=True).stderr
+    packages = {}
+    cumulative = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = (field.strip() for field in line[len("import time:"):].split("|"))
+        package = module.strip().split(".")[0]
+        packages[package] = packages.get(package, 0) + int(self_us)
+        cumulative.append((int(cumulative_us), module.rstrip()))
+
+    total = sum(packages.values())
+    print(f"total import time (interpreter startup included): {total / 1e6:.3f} s\n")
+    print(f"{'package':<32} {'self (s)':>9} {'share':>6}")
+    for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:limit]:
+        print(f"{package:<32} {self_us / 1e6:>9.3f} {self_us / total:>6.0%}")
+    print(f"\n{'module (incl. its imports)':<48} {'cumulative (s)':>14}")
+    for cumulative_us, module in sorted(cumulative, reverse=True)[:limit]:
+        print(f"{module:<48} {cumulative_us / 1e6:>14.3f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Math AI assistant for secondary school exam preparation.")
+    subparsers = parser.add_subparsers(dest="command")
+    batch_parser = subparsers.add_parser("batch", help="answer every question in a JSONL or CSV worksheet")
+    batch.add_arguments(batch_parser)
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="show the import time of the program broken down by module and exit")
+    args = parser.parse_args(argv)
+
+    if args.profile_startup:
+        profile_startup()
+        return
+
+    if args.command == "batch":
+        batch.run_from_args(args)
+        return
+
+    _, api_status = model_settings()
+    # The model client and agent graph load in the background while the welcome text is read
+    loader = AgentLoader().start()
+    tools = get_tool_specs()
+    response_cache = get_response_cache(load_system_prompt(), tools)
     print(api_status)
 
     print("Welcome! I'm your comprehensive Math AI assistant for secondary school exam preparation.")
@@ -666,21 +1147,44 @@ def main():
             continue
 
         print("\nAssistant: ", end="")
-        try:
-            # Create messages with system instruction
-            messages = [
-                system_message,
-                HumanMessage(content=user_input)
-            ]
-            
-            for chunk in agent_executor.stream({"messages": messages}):
-                if "agent" in chunk and "messages" in chunk["agent"]:
-                    for message in chunk["agent"]["messages"]:
-                        print(message.content, end="")
-            print()
-        except Exception as e:
-            print(f"\nError: {e}")
-            print("Please try again with a different question.")
+
+        # Every question is timed; with MATH_AGENT_TRACE_PATH set the traces are written as JSON lines
+        with trace_request(user_input) as tracer:
+            # Simple one-line questions are answered locally without calling the model
+            fast_answer = try_fast_path(user_input, tools)
+            if fast_answer is not None:
+                tracer.trace.source = "fast_path"
+                print(fast_answer)
+                continue
+
+            # Repeated questions are replayed from the response cache
+            cached = response_cache.get(user_input) if response_cache else None
+            if cached is not None:
+                tracer.trace.source = "cache"
+                for content in cached.chunks:
+                    print(content, end="")
+                print()
+                continue
+
+            try:
+                agent_executor, system_message, _ = loader.get()
+                messages = build_messages(system_message, user_input)
+
+                chunks = []
+                for chunk in agent_executor.stream({"messages": messages}, config={"callbacks": [tracer]}):
+                    if "agent" in chunk and "messages" in chunk["agent"]:
+                        for message in chunk["agent"]["messages"]:
+                            print(message.content, end="")
+                            if message.content:
+                                chunks.append(message.content)
+                print()
+                # Answers rendered from the tool results without the model are not cached
+                if response_cache and not tracer.trace.llm_calls_avoided:
+                    response_cache.put(user_input, "".join(chunks), chunks)
+            except Exception as e:
+                tracer.trace.error = str(e)
+                print(f"\nError: {e}")
+                print("Please try again with a different question.")
 
 
 if __name__ == "__main__":
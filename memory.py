@@ -0,0 +1,114 @@
+import hashlib
+import os
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import List
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+# Token budget for the conversation history sent with each request
+MEMORY_TOKEN_BUDGET = int(os.getenv("MATH_AGENT_MEMORY_TOKENS", 1500))
+# Most recent turns kept verbatim (as long as they fit the budget)
+MEMORY_RECENT_TURNS = int(os.getenv("MATH_AGENT_MEMORY_TURNS", 3))
+MAX_TOOL_RESULT_CHARS = 160
+MAX_SUMMARY_LINE_CHARS = 200
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+
+@lru_cache(maxsize=4096)
+def count_tokens(text: str) -> int:
+    """Token count of `text` (tiktoken when available, otherwise about four characters per token)."""
+    encoding = _encoding()
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text))
+
+
+def _shorten(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def compact_tool_call(name: str, args: dict, result: str) -> str:
+    """One-line record of a tool call, e.g. `area_circle(radius=5) → area = 25π (≈ 78.5398) square units; ...`."""
+    arguments = ", ".join(f"{key}={value}" for key, value in args.items())
+    return _shorten(f"{name}({arguments}) → {result}", MAX_TOOL_RESULT_CHARS)
+
+
+@dataclass
+class Turn:
+    question: str
+    answer: str
+    tool_calls: List[str] = field(default_factory=list)
+
+    def render_answer(self) -> str:
+        if not self.tool_calls:
+            return self.answer
+        return self.answer + "\n\n[Tools used: " + "; ".join(self.tool_calls) + "]"
+
+    def tokens(self) -> int:
+        return count_tokens(self.question) + count_tokens(self.render_answer())
+
+    def summary_line(self) -> str:
+        answer = self.answer.strip().splitlines()[-1] if self.answer.strip() else ""
+        return _shorten(f"Q: {self.question} → A: {answer}", MAX_SUMMARY_LINE_CHARS)
+
+
+class ConversationMemory:
+    """Conversation history that stays under a token budget.
+
+    Recent turns are kept verbatim; older turns are folded into one-line
+    summaries, and the oldest summaries are dropped once even those no longer fit.
+    """
+
+    def __init__(self, token_budget: int = MEMORY_TOKEN_BUDGET, recent_turns: int = MEMORY_RECENT_TURNS):
+        self.token_budget = token_budget
+        self.recent_turns = recent_turns
+        self.turns: List[Turn] = []
+        self.summary: List[str] = []
+
+    def add_turn(self, question: str, answer: str, tool_calls: List[str] = ()):
+        """Record a finished question/answer pair (with compact tool call records)."""
+        self.turns.append(Turn(question, answer, list(tool_calls)))
+        self._compact()
+
+    def clear(self):
+        self.turns = []
+        self.summary = []
+
+    def tokens(self) -> int:
+        return sum(turn.tokens() for turn in self.turns) + sum(count_tokens(line) for line in self.summary)
+
+    def _compact(self):
+        # Fold turns beyond the verbatim window (or over the budget) into summary lines, oldest first
+        while self.turns and (len(self.turns) > self.recent_turns or self.tokens() > self.token_budget):
+            self.summary.append(self.turns.pop(0).summary_line())
+        while self.summary and self.tokens() > self.token_budget:
+            self.summary.pop(0)
+
+    def messages(self) -> List[BaseMessage]:
+        """History to send between the system prompt and the new question."""
+        messages: List[BaseMessage] = []
+        if self.summary:
+            messages.append(SystemMessage(content="Earlier in this conversation:\n" + "\n".join(self.summary)))
+        for turn in self.turns:
+            messages.append(HumanMessage(content=turn.question))
+            messages.append(AIMessage(content=turn.render_answer()))
+        return messages
+
+    def context_key(self) -> str:
+        """Short digest of the history, so cached answers are only reused in the same context."""
+        if not self.turns and not self.summary:
+            return ""
+        digest = hashlib.sha256()
+        for message in self.messages():
+            digest.update(message.content.encode("utf-8") + b"\0")
+        return digest.hexdigest()[:12]
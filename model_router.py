@@ -0,0 +1,316 @@
+"""Chat model that spreads requests over several providers (OpenAI, OpenRouter) with failover.
+
+Each backend keeps rolling statistics of its recent requests: latency of the
+successful ones and the share that failed. Every request goes first to the
+healthy backend with the lowest expected time to an answer (median latency,
+stretched by its error rate), and
+- a request still running after MATH_AGENT_HEDGE_DELAY seconds is hedged:
+  the same request goes to the next backend and the first answer wins,
+- a request failing with a retryable error (408/409/429, 5xx, timeouts,
+  dropped connections) is retried on the next backend, up to
+  MATH_AGENT_ROUTER_ATTEMPTS attempts in total,
+- a backend that fails cools down (1 s, 2 s, 4 s, ... up to 60 s for
+  consecutive failures) and is only tried when no healthy backend is left;
+  afterwards it competes again, so a recovered provider gets traffic back.
+
+Other errors (a malformed request, a bad key) are raised immediately, since
+another provider would fail the same way. Streaming requests are hedged and
+fail over the same way until the first chunk arrives: the backend that
+yields first is kept (its latency is recorded as the time to that chunk),
+and the other streams are closed. Once tokens have been passed on, errors
+are raised instead of restarting elsewhere.
+
+    python -m benchmarks.failover    # two local mock providers with injected latency and failures
+"""
+import asyncio
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, AsyncIterator, Callable, Iterator, List, Optional, Tuple
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import ConfigDict
+
+# Seconds before a slow request is also sent to the next backend (0 disables hedging)
+HEDGE_DELAY = float(os.getenv("MATH_AGENT_HEDGE_DELAY", 4))
+MAX_ATTEMPTS = int(os.getenv("MATH_AGENT_ROUTER_ATTEMPTS", 3))
+# Requests per backend that the latency and error statistics cover
+WINDOW = int(os.getenv("MATH_AGENT_ROUTER_WINDOW", 20))
+COOLDOWN_BASE = 1.0
+COOLDOWN_MAX = 60.0
+RETRY_BACKOFF = 0.25
+
+RETRYABLE_STATUS = {408, 409, 429}
+
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="model-router")
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether another attempt (on any backend) could succeed where this one failed."""
+    import httpx
+    import openai
+
+    if isinstance(error, (openai.APIConnectionError, httpx.TransportError, TimeoutError)):
+        return True
+    status = getattr(error, "status_code", None)
+    return status is not None and (status in RETRYABLE_STATUS or status >= 500)
+
+
+class Backend:
+    """One provider behind the router, with rolling latency and error statistics."""
+
+    def __init__(self, name: str, model: BaseChatModel, window: int = WINDOW):
+        self.name = name
+        self.model = model
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        self._lock = threading.Lock()
+
+    def record_success(self, seconds: float):
+        with self._lock:
+            self.requests += 1
+            self.latencies.append(seconds)
+            self.outcomes.append(True)
+            self.consecutive_failures = 0
+            self.cooldown_until = 0.0
+
+    def record_failure(self):
+        with self._lock:
+            self.requests += 1
+            self.failures += 1
+            self.outcomes.append(False)
+            self.consecutive_failures += 1
+            cooldown = min(COOLDOWN_MAX, COOLDOWN_BASE * 2 ** (self.consecutive_failures - 1))
+            self.cooldown_until = time.monotonic() + cooldown
+
+    @property
+    def latency(self) -> float:
+        """Median latency of recent successful requests (0 before the first one, so new backends get tried)."""
+        return statistics.median(self.latencies) if self.latencies else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+    @property
+    def expected_latency(self) -> float:
+        """Expected seconds to a successful answer when failed requests are retried."""
+        return self.latency / (1 - min(self.error_rate, 0.9))
+
+    @property
+    def healthy(self) -> bool:
+        """False while cooling down after a failure."""
+        return time.monotonic() >= self.cooldown_until
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "requests": self.requests,
+            "failures": self.failures,
+            "latency_s": self.latency,
+            "error_rate": self.error_rate,
+            "healthy": self.healthy,
+        }
+
+
+class RoutedChatModel(BaseChatModel):
+    """Chat model that sends each request to the fastest healthy backend, with hedging and failover.
+
+    Build it with `RoutedChatModel.from_models([("openai", model), ...])`; bind
+    tools and use it like any other chat model. The backends should not retry on
+    their own (max_retries=0), so failover happens right away.
+    """
+
+    backends: List[Any]
+    hedge_delay: float = HEDGE_DELAY
+    max_attempts: int = MAX_ATTEMPTS
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    @classmethod
+    def from_models(cls, models: List[Tuple[str, BaseChatModel]], **kwargs) -> "RoutedChatModel":
+        return cls(backends=[Backend(name, model) for name, model in models], **kwargs)
+
+    @property
+    def _llm_type(self) -> str:
+        return "routed-chat"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"backends": [backend.name for backend in self.backends]}
+
+    def bind_tools(self, tools, **kwargs):
+        """Bind tools in OpenAI format; every backend receives them with the request."""
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    def ranked(self) -> List[Backend]:
+        """Backends in the order they are tried: healthy first, then by expected latency."""
+        return sorted(self.backends, key=lambda backend: (not backend.healthy, backend.expected_latency))
+
+    def stats(self) -> List[dict]:
+        return [backend.stats() for backend in self.backends]
+
+    def _attempt_order(self) -> Iterator[Tuple[Backend, float]]:
+        """(backend, delay before sending) for every attempt; repeat visits to a backend back off."""
+        ranked = self.ranked()
+        for attempt in range(self.max_attempts):
+            rounds, index = divmod(attempt, len(ranked))
+            yield ranked[index], RETRY_BACKOFF * 2 ** (rounds - 1) if rounds else 0.0
+
+    @staticmethod
+    def _timed(backend: Backend, call):
+        start = time.perf_counter()
+        try:
+            result = call(backend.model)
+        except Exception as e:
+            if is_retryable(e):
+                backend.record_failure()
+            raise
+        backend.record_success(time.perf_counter() - start)
+        return result
+
+    @staticmethod
+    async def _atimed(backend: Backend, delay: float, call):
+        if delay:
+            await asyncio.sleep(delay)
+        start = time.perf_counter()
+        try:
+            result = await call(backend.model)
+        except Exception as e:
+            if is_retryable(e):
+                backend.record_failure()
+            raise
+        backend.record_success(time.perf_counter() - start)
+        return result
+
+    def _route(self, call, discard: Optional[Callable] = None):
+        """Result of `call(model)` from the first backend to answer; `discard` releases the losers' results."""
+        attempts = self._attempt_order()
+        pending = {}
+        last_error = None
+        hedged = False
+
+        def launch():
+            attempt = next(attempts, None)
+            if attempt is not None:
+                backend, delay = attempt
+                if delay:
+                    time.sleep(delay)
+                pending[_executor.submit(self._timed, backend, call)] = backend
+
+        launch()
+        while pending:
+            timeout = self.hedge_delay if self.hedge_delay and not hedged else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # Slow request: race it against the next backend (the loser's answer is dropped)
+                hedged = True
+                launch()
+                continue
+            for future in done:
+                del pending[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    if not is_retryable(e):
+                        self._discard(pending, discard)
+                        raise
+                    last_error = e
+                    continue
+                self._discard(pending, discard)
+                return result
+            if not pending:
+                launch()
+        raise last_error
+
+    @staticmethod
+    def _discard(pending, discard: Optional[Callable]):
+        """Release the results of the requests that lost the race, as they complete."""
+        if discard is None:
+            return
+        for future in list(pending):
+            future.add_done_callback(lambda f: f.exception() is None and discard(f.result()))
+
+    async def _aroute(self, call, discard: Optional[Callable] = None):
+        """Async _route; `discard` is a coroutine function."""
+        attempts = self._attempt_order()
+        pending = set()
+        last_error = None
+        hedged = False
+
+        def launch():
+            attempt = next(attempts, None)
+            if attempt is not None:
+                pending.add(asyncio.ensure_future(self._atimed(*attempt, call)))
+
+        launch()
+        try:
+            while pending:
+                timeout = self.hedge_delay if self.hedge_delay and not hedged else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    launch()
+                    continue
+                for task in done:
+                    pending.discard(task)
+                    try:
+                        return task.result()
+                    except Exception as e:
+                        if not is_retryable(e):
+                            raise
+                        last_error = e
+                if not pending:
+                    launch()
+            raise last_error
+        finally:
+            for task in pending:
+                if task.done() and discard is not None and not task.cancelled() and task.exception() is None:
+                    asyncio.ensure_future(discard(task.result()))
+                task.cancel()
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return self._route(lambda model: model._generate(messages, stop=stop, **kwargs))
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return await self._aroute(lambda model: model._agenerate(messages, stop=stop, **kwargs))
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        first, chunks = self._route(lambda model: _first_chunk(model._stream(messages, stop=stop, **kwargs)),
+                                    discard=lambda result: result[1].close())
+        if first is not None:
+            yield first
+        yield from chunks
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        first, chunks = await self._aroute(
+            lambda model: _afirst_chunk(model._astream(messages, stop=stop, **kwargs)),
+            discard=lambda result: result[1].aclose(),
+        )
+        if first is not None:
+            yield first
+        async for chunk in chunks:
+            yield chunk
+
+
+def _first_chunk(chunks: Iterator[ChatGenerationChunk]) -> Tuple[Optional[ChatGenerationChunk], Iterator]:
+    """Start a stream: its first chunk (None when empty) and the rest."""
+    return next(chunks, None), chunks
+
+
+async def _afirst_chunk(chunks: AsyncIterator[ChatGenerationChunk]) -> Tuple[Optional[ChatGenerationChunk], AsyncIterator]:
+    try:
+        return await anext(chunks, None), chunks
+    except asyncio.CancelledError:
+        # Lost the race before its first chunk: close the request instead of leaving it to the GC
+        await chunks.aclose()
+        raise
@@ -0,0 +1,201 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+CACHE_PATH = Path(os.getenv("MATH_AGENT_CACHE_PATH", Path(__file__).parent / ".cache" / "responses.sqlite3"))
+CACHE_TTL_SECONDS = float(os.getenv("MATH_AGENT_CACHE_TTL", 7 * 24 * 3600))
+CACHE_MAX_ENTRIES = int(os.getenv("MATH_AGENT_CACHE_SIZE", 10000))
+CACHE_ENABLED = os.getenv("MATH_AGENT_CACHE", "1") != "0"
+# Version of the tools' output format; bump it when tool results change shape
+# (exact fractions, ToolResult) so answers cached in the old format miss
+CACHE_FORMAT = 3
+
+# Leading phrases that do not change the meaning of a question
+QUESTION_PREFIXES = re.compile(
+    r"^(?:please\s+)?(?:can\s+you\s+)?(?:what\s+is|what's|whats|calculate|compute|find|evaluate|"
+    r"work\s+out|determine|solve\s+for\s+x\s*:?|give\s+me)\s+(?:the\s+)?(?:value\s+of\s+)?"
+)
+
+# Spelled-out operators mapped onto their symbols
+OPERATOR_WORDS = [
+    (r"\bmultiplied\s+by\b", "*"),
+    (r"\bdivided\s+by\b", "/"),
+    (r"\bto\s+the\s+power\s+of\b", "^"),
+    (r"\braised\s+to\b", "^"),
+    (r"\bplus\b", "+"),
+    (r"\bminus\b", "-"),
+    (r"\btimes\b", "*"),
+    (r"\bequals\b", "="),
+    (r"\bpercent\b", "%"),
+    (r"×", "*"),
+    (r"÷", "/"),
+    (r"\*\*", "^"),
+]
+
+
+def normalize_question(question: str) -> str:
+    """Normalize a question so that trivially different phrasings share a cache entry."""
+    text = question.strip().lower()
+    text = re.sub(r"\s+", " ", text).rstrip("?.! ")
+    text = QUESTION_PREFIXES.sub("", text)
+    for pattern, symbol in OPERATOR_WORDS:
+        text = re.sub(pattern, symbol, text)
+    # 5.0 -> 5, 2.50 -> 2.5, 007 -> 7
+    text = re.sub(r"(?<![\w.])0+(?=\d)", "", text)
+    text = re.sub(r"(\d+\.\d*?)0+\b", r"\1", text)
+    text = re.sub(r"(\d+)\.(?!\d)", r"\1", text)
+    # Drop spacing around operators and punctuation
+    text = re.sub(r"\s*([-+*/^=%(),\[\]:])\s*", r"\1", text)
+    return text
+
+
+def fingerprint(system_prompt: str, tools) -> str:
+    """Fingerprint of everything that shapes an answer besides the question.
+
+    Changing the system prompt, the tool set or CACHE_FORMAT produces a new
+    fingerprint, so entries cached under the old one are no longer read (they
+    age out through the TTL and LRU eviction).
+    """
+    digest = hashlib.sha256(f"{CACHE_FORMAT}\0{system_prompt}".encode("utf-8"))
+    for t in tools:
+        digest.update(f"\0{t.name}\0{t.description}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+@dataclass
+class CachedResponse:
+    text: str
+    chunks: List[str]
+
+
+class ResponseCache:
+    """SQLite-backed cache of final answers keyed on the normalized question.
+
+    Entries expire after `ttl_seconds` and the least recently used entries are
+    evicted once the cache grows beyond `max_entries`.
+    """
+
+    def __init__(self, path: Path = CACHE_PATH, namespace: str = "", ttl_seconds: float = CACHE_TTL_SECONDS,
+                 max_entries: int = CACHE_MAX_ENTRIES):
+        self.path = Path(path)
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " namespace TEXT NOT NULL, key TEXT NOT NULL, text TEXT NOT NULL, chunks TEXT NOT NULL,"
+            " created_at REAL NOT NULL, last_access REAL NOT NULL, hit_count INTEGER NOT NULL DEFAULT 0,"
+            " PRIMARY KEY (namespace, key))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+        # Other namespaces may belong to another process sharing the file (a
+        # different tool set): they are left to TTL/LRU eviction, not deleted
+        self._conn.commit()
+
+    def get(self, question: str) -> Optional[CachedResponse]:
+        """Return the cached response for a question, or None on a miss."""
+        key = normalize_question(question)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text, chunks, created_at FROM responses WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+            if row is None or now - row[2] > self.ttl_seconds:
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE namespace = ? AND key = ?", (self.namespace, key))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE responses SET last_access = ?, hit_count = hit_count + 1 WHERE namespace = ? AND key = ?",
+                (now, self.namespace, key),
+            )
+            self._conn.commit()
+            self.hits += 1
+        return CachedResponse(text=row[0], chunks=json.loads(row[1]))
+
+    def put(self, question: str, text: str, chunks: Optional[List[str]] = None):
+        """Store the final answer (and the chunks it was streamed in) for a question."""
+        if not text:
+            return
+        key = normalize_question(question)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (namespace, key, text, chunks, created_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (self.namespace, key, text, json.dumps(chunks or [text]), now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+        self._conn.execute(
+            "DELETE FROM responses WHERE rowid IN ("
+            " SELECT rowid FROM responses ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def invalidate(self):
+        """Drop every cached response."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        """Hit/miss counters for this process plus the current number of entries."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+        }
+
+
+_caches = {}
+
+
+def get_response_cache(system_prompt: str, tools) -> Optional[ResponseCache]:
+    """Get the process-wide cache for this system prompt and tool set (None when disabled)."""
+    if not CACHE_ENABLED:
+        return None
+    namespace = fingerprint(system_prompt, tools)
+    if namespace not in _caches:
+        _caches[namespace] = ResponseCache(namespace=namespace)
+    return _caches[namespace]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or clear the math agent response cache.")
+    parser.add_argument("--clear", action="store_true", help="drop every cached response")
+    args = parser.parse_args()
+
+    if not CACHE_PATH.exists():
+        print(f"{CACHE_PATH}: no cached responses")
+        raise SystemExit(0)
+    conn = sqlite3.connect(CACHE_PATH)
+    if args.clear:
+        conn.execute("DELETE FROM responses")
+        conn.commit()
+        print(f"Cleared {CACHE_PATH}")
+    else:
+        count = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        print(f"{CACHE_PATH}: {count} cached responses")
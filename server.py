@@ -0,0 +1,345 @@
+"""HTTP API for the math agent, for services that cannot embed the web interface.
+
+    pip install ".[server]"
+    python server.py --port 8080
+
+Endpoints:
+    POST /v1/answer          {"question": "..."} -> {"answer", "source", "coalesced"}
+    POST /v1/answer/stream   same body; Server-Sent Events: "delta" events with the
+                             answer text as it is produced, then "done" (or "error")
+    GET  /health             agent state, runs in flight, rate limiting and SymPy workers
+    GET  /metrics            Prometheus metrics of the answered questions
+
+Questions are answered as in the CLI: fast path, response cache, then the
+agent. The agent runs on the async path (async_agent.py) in the server's one
+event loop, which is also the loop that owns the shared async HTTP client.
+
+- Concurrent identical questions (same normalized text) are coalesced: the
+  first starts an agent run and every later request follows that run's
+  output instead of starting another one. A run keeps going if its first
+  client disconnects.
+- Each client (the X-Client-Id header, else its address) may ask
+  MATH_AGENT_RATE_LIMIT questions per minute, in bursts of up to
+  MATH_AGENT_RATE_BURST; further requests get 429 with Retry-After.
+- At most MATH_AGENT_MAX_PENDING agent runs may be in flight (running or
+  waiting for one of the MATH_AGENT_MAX_CONCURRENCY slots); new ones get
+  503 with Retry-After instead of queueing without bound. Requests that join
+  a run in flight or are answered locally are never refused.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import Counter
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from aiohttp import web
+from dotenv import load_dotenv
+
+import instrumentation
+from async_agent import ainitialize_agent, astream_answer
+from fast_path import try_fast_path
+from instrumentation import RequestTrace, trace_request
+from main import get_tool_specs, load_system_prompt, model_settings
+from response_cache import get_response_cache, normalize_question
+from symbolic_pool import get_symbolic_pool
+
+# Questions per minute per client (0 disables rate limiting), and the burst allowed above that rate
+RATE_LIMIT = float(os.getenv("MATH_AGENT_RATE_LIMIT", 60))
+RATE_BURST = int(os.getenv("MATH_AGENT_RATE_BURST", 10))
+# Agent runs in flight (running or queued) before new questions are turned away
+MAX_PENDING = int(os.getenv("MATH_AGENT_MAX_PENDING", 64))
+MAX_QUESTION_LENGTH = 2000
+# Clients whose rate-limit state is kept; idle ones are dropped beyond this
+MAX_CLIENTS = 10000
+
+
+class RateLimiter:
+    """Token bucket per client: `rate` questions per minute, up to `burst` at once."""
+
+    def __init__(self, rate: float = RATE_LIMIT, burst: int = RATE_BURST):
+        self.rate = rate / 60
+        self.burst = max(1, burst)
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    def acquire(self, client: str) -> float:
+        """0 when the client may go ahead, else the seconds until it may try again."""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(client, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens >= 1:
+            self._buckets[client] = (tokens - 1, now)
+            if len(self._buckets) > MAX_CLIENTS:
+                self._prune(now)
+            return 0.0
+        self._buckets[client] = (tokens, now)
+        return (1 - tokens) / self.rate
+
+    def _prune(self, now: float):
+        # A bucket that has refilled completely carries no state
+        self._buckets = {client: (tokens, updated) for client, (tokens, updated) in self._buckets.items()
+                         if tokens + (now - updated) * self.rate < self.burst}
+
+
+class Flight:
+    """One agent run whose output is shared by every request for the same question."""
+
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Condition()
+
+    async def publish(self, chunk: str):
+        async with self._changed:
+            self.chunks.append(chunk)
+            self._changed.notify_all()
+
+    async def finish(self, error: Optional[BaseException] = None):
+        async with self._changed:
+            self.done = True
+            self.error = error
+            self._changed.notify_all()
+
+    async def follow(self) -> AsyncIterator[str]:
+        """Every chunk of the answer, from the start, as the run produces them."""
+        index = 0
+        while True:
+            while index < len(self.chunks):
+                yield self.chunks[index]
+                index += 1
+            if self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            async with self._changed:
+                await self._changed.wait_for(lambda: self.done or len(self.chunks) > index)
+
+
+class Rejected(Exception):
+    """A request turned away with an HTTP status (429, 503) and a Retry-After hint."""
+
+    def __init__(self, status: int, message: str, retry_after: float):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class AnswerService:
+    """Fast path, response cache and coalesced agent runs behind the HTTP handlers."""
+
+    def __init__(self, max_pending: int = MAX_PENDING, rate_limit: float = RATE_LIMIT, burst: int = RATE_BURST):
+        self.max_pending = max_pending
+        self.limiter = RateLimiter(rate_limit, burst)
+        self.flights: Dict[str, Flight] = {}
+        self.counts = Counter()
+        self.tools = get_tool_specs()
+        self.response_cache = get_response_cache(load_system_prompt(), self.tools)
+        self._agent: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Build the agent in the background; the first agent question waits for it."""
+        if self._agent is None:
+            self._agent = asyncio.ensure_future(ainitialize_agent())
+
+    def agent_state(self) -> str:
+        if self._agent is None or not self._agent.done():
+            return "loading"
+        if self._agent.exception() is not None:
+            return f"error: {self._agent.exception()}"
+        return "ready"
+
+    async def answer(self, question: str, client: str) -> Tuple[str, AsyncIterator[str], bool]:
+        """(source, chunks of the answer, whether it joined a run in flight) for a question."""
+        retry_after = self.limiter.acquire(client)
+        if retry_after:
+            self.counts["rate_limited"] += 1
+            raise Rejected(429, "Too many questions; slow down", retry_after)
+        self.counts["requests"] += 1
+
+        local = await self._answer_locally(question)
+        if local is not None:
+            return local[0], _single(*local[1]), False
+
+        key = normalize_question(question)
+        flight = self.flights.get(key)
+        coalesced = flight is not None
+        if coalesced:
+            self.counts["coalesced"] += 1
+        else:
+            if len(self.flights) >= self.max_pending:
+                self.counts["overloaded"] += 1
+                raise Rejected(503, "The server is busy; try again shortly", 1.0)
+            flight = self.flights[key] = Flight()
+            flight.task = asyncio.ensure_future(self._run(key, question, flight))
+            self.counts["runs"] += 1
+        self.counts["agent"] += 1
+        return "agent", self._follow(flight), coalesced
+
+    async def _answer_locally(self, question: str) -> Optional[Tuple[str, List[str]]]:
+        """(source, chunks) from the fast path or the response cache, or None when the agent is needed."""
+        start = time.perf_counter()
+        # The fast path may call a SymPy tool, which waits on the process pool
+        fast_answer = await asyncio.to_thread(try_fast_path, question, self.tools)
+        if fast_answer is not None:
+            source, chunks = "fast_path", [fast_answer]
+        else:
+            # SQLite reads and commits block: keep them off the event loop
+            cached = await asyncio.to_thread(self.response_cache.get, question) if self.response_cache else None
+            if cached is None:
+                # Agent runs are traced in _run: one trace per run, not per follower
+                return None
+            source, chunks = "cache", cached.chunks
+        self.counts[source] += 1
+        instrumentation.record(RequestTrace(question=question, source=source, duration_s=time.perf_counter() - start))
+        return source, chunks
+
+    async def _follow(self, flight: Flight) -> AsyncIterator[str]:
+        flight.followers += 1
+        try:
+            async for chunk in flight.follow():
+                yield chunk
+        finally:
+            flight.followers -= 1
+
+    async def _run(self, key: str, question: str, flight: Flight):
+        error = None
+        try:
+            agent_executor, system_message, _ = await self._agent
+            with trace_request(question) as tracer:
+                async for chunk in astream_answer(agent_executor, system_message, question, tracer):
+                    await flight.publish(chunk)
+            # Answers rendered from the tool results without the model are not cached
+            if self.response_cache and not tracer.trace.llm_calls_avoided:
+                await asyncio.to_thread(self.response_cache.put, question, "".join(flight.chunks))
+        except Exception as e:
+            error = e
+        finally:
+            del self.flights[key]
+            await flight.finish(error)
+
+    def health(self) -> dict:
+        return {
+            "agent": self.agent_state(),
+            "in_flight": len(self.flights),
+            "followers": sum(flight.followers for flight in self.flights.values()),
+            "max_pending": self.max_pending,
+            "counts": dict(self.counts),
+            "symbolic": get_symbolic_pool().health(),
+        }
+
+
+async def _single(*chunks: str) -> AsyncIterator[str]:
+    for chunk in chunks:
+        yield chunk
+
+
+SERVICE = web.AppKey("service", AnswerService)
+
+
+async def _question(request: web.Request) -> str:
+    try:
+        body = await request.json()
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        raise web.HTTPBadRequest(text="Request body must be JSON") from None
+    question = body.get("question") if isinstance(body, dict) else None
+    if not isinstance(question, str) or not question.strip():
+        raise web.HTTPBadRequest(text='Request body must be {"question": "..."}')
+    if len(question) > MAX_QUESTION_LENGTH:
+        raise web.HTTPRequestEntityTooLarge(max_size=MAX_QUESTION_LENGTH, actual_size=len(question))
+    return question.strip()
+
+
+def _client(request: web.Request) -> str:
+    return request.headers.get("X-Client-Id") or request.remote or "unknown"
+
+
+def _rejection(e: Rejected) -> web.Response:
+    return web.json_response({"error": str(e)}, status=e.status,
+                             headers={"Retry-After": str(max(1, round(e.retry_after)))})
+
+
+async def answer(request: web.Request) -> web.Response:
+    question = await _question(request)
+    try:
+        source, chunks, coalesced = await request.app[SERVICE].answer(question, _client(request))
+        text = "".join([chunk async for chunk in chunks])
+    except Rejected as e:
+        return _rejection(e)
+    except Exception as e:
+        return web.json_response({"error": str(e)}, status=500)
+    return web.json_response({"answer": text, "source": source, "coalesced": coalesced})
+
+
+def _event(name: str, data: dict) -> bytes:
+    return f"event: {name}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8")
+
+
+async def answer_stream(request: web.Request) -> web.StreamResponse:
+    question = await _question(request)
+    try:
+        source, chunks, coalesced = await request.app[SERVICE].answer(question, _client(request))
+    except Rejected as e:
+        return _rejection(e)
+
+    response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+    await response.prepare(request)
+    try:
+        # write() waits while the client's socket is full, so a slow reader only holds back itself
+        async for chunk in chunks:
+            await response.write(_event("delta", {"text": chunk}))
+        await response.write(_event("done", {"source": source, "coalesced": coalesced}))
+    except ConnectionResetError:
+        return response  # the client left; a shared run carries on for the others
+    except Exception as e:
+        await response.write(_event("error", {"error": str(e)}))
+    await response.write_eof()
+    return response
+
+
+async def health(request: web.Request) -> web.Response:
+    return web.json_response(request.app[SERVICE].health())
+
+
+async def metrics(request: web.Request) -> web.Response:
+    return web.Response(text=instrumentation.metrics.render_prometheus(), content_type="text/plain")
+
+
+def create_app(**service_options) -> web.Application:
+    """The aiohttp application; options go to AnswerService (max_pending, rate_limit, burst)."""
+    app = web.Application()
+
+    async def on_startup(app):
+        app[SERVICE] = AnswerService(**service_options)
+        app[SERVICE].start()
+
+    app.on_startup.append(on_startup)
+    app.router.add_post("/v1/answer", answer)
+    app.router.add_post("/v1/answer/stream", answer_stream)
+    app.router.add_get("/health", health)
+    app.router.add_get("/metrics", metrics)
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP API for the math agent.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080, help="port to listen on (default: 8080)")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    try:
+        _, api_status = model_settings()
+    except ValueError as e:
+        raise SystemExit(f"Error: {e}")
+    print(api_status)
+    web.run_app(create_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
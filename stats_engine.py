@@ -0,0 +1,168 @@
+import csv
+import hashlib
+import io
+import os
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+# Values are folded into the running statistics this many at a time
+CHUNK_SIZE = 65536
+MAX_DATASETS = int(os.getenv("MATH_AGENT_MAX_DATASETS", 32))
+MAX_DATASET_VALUES = int(os.getenv("MATH_AGENT_MAX_DATASET_VALUES", 10_000_000))
+# Datasets given as a file path are only read from this directory
+DATA_DIR = Path(os.getenv("MATH_AGENT_DATA_DIR", Path(__file__).parent / "data")).expanduser().resolve()
+
+
+class RunningStats:
+    """Count, mean, variance, min, max and value frequencies accumulated in one pass.
+
+    Chunks are merged with the parallel form of Welford's algorithm (Chan et al.),
+    so the result is numerically stable without a second pass over the data.
+    """
+
+    def __init__(self, track_frequencies: bool = True):
+        self.track_frequencies = track_frequencies
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+        self.frequencies: Counter = Counter()
+
+    def update(self, values: np.ndarray):
+        n = values.size
+        if n == 0:
+            return
+        chunk_mean = float(values.mean())
+        chunk_m2 = float(((values - chunk_mean) ** 2).sum())
+        total = self.count + n
+        delta = chunk_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += chunk_m2 + delta * delta * self.count * n / total
+        self.count = total
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+        if self.track_frequencies:
+            unique, counts = np.unique(values, return_counts=True)
+            self.frequencies.update(dict(zip(unique.tolist(), counts.tolist())))
+
+    @property
+    def variance(self) -> Optional[float]:
+        """Sample variance (n - 1 denominator), like statistics.variance."""
+        return self.m2 / (self.count - 1) if self.count > 1 else None
+
+    def modes(self) -> List[float]:
+        """Most frequent values; empty when every value appears equally often."""
+        if not self.frequencies:
+            return []
+        top = max(self.frequencies.values())
+        if len(self.frequencies) > 1 and min(self.frequencies.values()) == top:
+            return []
+        return sorted(value for value, count in self.frequencies.items() if count == top)
+
+
+def median(values: np.ndarray) -> float:
+    """Median by selection (np.partition, O(n)) rather than a full sort."""
+    n = values.size
+    middle = n // 2
+    if n % 2:
+        return float(np.partition(values, middle)[middle])
+    lower, upper = np.partition(values, [middle - 1, middle])[middle - 1:middle + 1]
+    return (float(lower) + float(upper)) / 2
+
+
+def summarize(values: np.ndarray, track_frequencies: bool = True) -> RunningStats:
+    """Fold a dataset into RunningStats chunk by chunk."""
+    stats = RunningStats(track_frequencies)
+    for start in range(0, values.size, CHUNK_SIZE):
+        stats.update(values[start:start + CHUNK_SIZE])
+    return stats
+
+
+def describe(values: Union[np.ndarray, Iterable[float]]) -> Dict:
+    """Every summary statistic of a dataset, computed in a single pass plus one selection."""
+    values = np.asarray(values, dtype=float)
+    stats = summarize(values)
+    variance = stats.variance
+    return {
+        "count": stats.count,
+        "mean": stats.mean if stats.count else None,
+        "median": median(values) if stats.count else None,
+        "modes": stats.modes(),
+        "variance": variance,
+        "standard_deviation": float(np.sqrt(variance)) if variance is not None else None,
+        "min": stats.minimum if stats.count else None,
+        "max": stats.maximum if stats.count else None,
+    }
+
+
+# ========== DATASETS ==========
+# Uploaded data is kept here and referred to by id, so the numbers never have
+# to travel through the prompt or the tool-call JSON.
+
+_datasets: "OrderedDict[str, np.ndarray]" = OrderedDict()
+_dataset_names: Dict[str, str] = {}
+
+
+def parse_numbers(text: str, column: Optional[str] = None) -> np.ndarray:
+    """Extract the numbers from CSV or plain text. Non-numeric cells (headers, labels) are skipped.
+
+    With `column`, only that CSV column (by header name) is used.
+    """
+    rows = csv.reader(io.StringIO(text), delimiter=";" if text.count(";") > text.count(",") else ",")
+    column_index = None
+    values = []
+    for row_number, row in enumerate(rows):
+        if column is not None and row_number == 0:
+            headers = [cell.strip().lower() for cell in row]
+            if column.strip().lower() not in headers:
+                raise ValueError(f"column '{column}' not found (columns: {', '.join(headers)})")
+            column_index = headers.index(column.strip().lower())
+            continue
+        cells = [row[column_index]] if column_index is not None and column_index < len(row) else row
+        for cell in cells:
+            for token in cell.split():
+                try:
+                    values.append(float(token))
+                except ValueError:
+                    pass
+        if len(values) > MAX_DATASET_VALUES:
+            raise ValueError(f"datasets are limited to {MAX_DATASET_VALUES} values")
+    return np.asarray(values, dtype=float)
+
+
+def register_dataset(values, name: str = "") -> str:
+    """Store a dataset and return its id. The same data always gets the same id."""
+    values = np.asarray(values, dtype=float)
+    dataset_id = "ds-" + hashlib.sha1(values.tobytes()).hexdigest()[:8]
+    _datasets[dataset_id] = values
+    _datasets.move_to_end(dataset_id)
+    _dataset_names[dataset_id] = name or dataset_id
+    while len(_datasets) > MAX_DATASETS:
+        evicted, _ = _datasets.popitem(last=False)
+        _dataset_names.pop(evicted, None)
+    return dataset_id
+
+
+def load_dataset(source: str, column: Optional[str] = None) -> np.ndarray:
+    """Get a dataset by id, or read it from a CSV/text file in DATA_DIR.
+
+    The source comes from the model (and, through the server, from remote
+    callers), so paths outside DATA_DIR are refused like unknown ids.
+    """
+    if source in _datasets:
+        _datasets.move_to_end(source)
+        return _datasets[source]
+    path = (DATA_DIR / source).resolve()
+    if not path.is_relative_to(DATA_DIR) or not path.is_file():
+        raise ValueError(f"unknown dataset '{source}' (give a dataset id or a file in {DATA_DIR.name}/)")
+    values = parse_numbers(path.read_text(encoding="utf-8"), column)
+    register_dataset(values, path.name)
+    return values
+
+
+def dataset_name(dataset_id: str) -> str:
+    return _dataset_names.get(dataset_id, dataset_id)
@@ -0,0 +1,147 @@
+import os
+import re
+from functools import lru_cache
+from typing import List
+
+import sympy as sp
+from sympy.parsing.sympy_parser import (
+    convert_xor,
+    implicit_multiplication_application,
+    parse_expr,
+    standard_transformations,
+)
+
+PARSE_CACHE_SIZE = int(os.getenv("MATH_AGENT_PARSE_CACHE_SIZE", 1024))
+RESULT_CACHE_SIZE = int(os.getenv("MATH_AGENT_RESULT_CACHE_SIZE", 1024))
+
+# Size limits applied before handing an expression to SymPy
+MAX_EXPRESSION_LENGTH = int(os.getenv("MATH_AGENT_MAX_EXPRESSION_LENGTH", 500))
+MAX_EXPONENT = int(os.getenv("MATH_AGENT_MAX_EXPONENT", 100))
+MAX_NESTING = 20
+MAX_OPERATIONS = 200
+
+# Shared symbol for every algebra tool; SymPy symbols are immutable so one instance is enough
+X = sp.Symbol("x")
+
+# `^` is power (not XOR) and `2x` means `2*x`, as students write them
+TRANSFORMATIONS = standard_transformations + (convert_xor, implicit_multiplication_application)
+
+UNICODE_OPERATORS = {
+    "−": "-", "×": "*", "·": "*", "÷": "/", "²": "**2", "³": "**3",
+}
+
+# parse_expr evaluates its input as Python, so only these reach it: numbers, operators,
+# brackets, single-letter symbols and the functions below
+ALLOWED_CHARACTERS = re.compile(r"[0-9A-Za-z.+\-*/(),]")
+FUNCTION_NAMES = frozenset({
+    "sqrt", "cbrt", "root", "abs", "exp", "log", "ln", "pi",
+    "sin", "cos", "tan", "sec", "csc", "cot", "asin", "acos", "atan", "sinh", "cosh", "tanh",
+})
+
+
+class ExpressionTooLarge(ValueError):
+    """Raised for expressions that are too big to be worth handing to SymPy."""
+
+
+class UnsupportedExpression(ValueError):
+    """Raised for expressions with characters or names that are not plain math."""
+
+
+def canonicalize(text: str) -> str:
+    """Canonical spelling of an expression, used as the cache key."""
+    for symbol, replacement in UNICODE_OPERATORS.items():
+        text = text.replace(symbol, replacement)
+    text = re.sub(r"\s+", "", text)
+    return text.replace("^", "**")
+
+
+def check_size(canonical: str):
+    """Reject expressions whose size alone could keep SymPy busy for a long time."""
+    if len(canonical) > MAX_EXPRESSION_LENGTH:
+        raise ExpressionTooLarge(f"expression is longer than {MAX_EXPRESSION_LENGTH} characters")
+    for exponent in re.findall(r"\*\*\(?([-+]?\d+)", canonical):
+        if abs(int(exponent)) > MAX_EXPONENT:
+            raise ExpressionTooLarge(f"exponents larger than {MAX_EXPONENT} are not supported")
+    depth = 0
+    for char in canonical:
+        depth += {"(": 1, ")": -1}.get(char, 0)
+        if depth > MAX_NESTING:
+            raise ExpressionTooLarge(f"expression is nested more than {MAX_NESTING} levels deep")
+
+
+def check_tokens(canonical: str):
+    """Reject anything but plain math before parse_expr evaluates it: no dunders, attributes or other names."""
+    unsupported = ALLOWED_CHARACTERS.sub("", canonical)
+    if unsupported:
+        raise UnsupportedExpression(f"unsupported characters: {' '.join(sorted(set(unsupported)))}")
+    if re.search(r"\.[A-Za-z]", canonical):
+        raise UnsupportedExpression("attribute access is not allowed")
+    for name in re.findall(r"[A-Za-z]+", canonical):
+        if len(name) > 1 and name not in FUNCTION_NAMES:
+            raise UnsupportedExpression(f"unknown name '{name}'; use single-letter variables")
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse(canonical: str) -> sp.Expr:
+    check_tokens(canonical)
+    check_size(canonical)
+    expr = parse_expr(canonical, local_dict={"x": X}, transformations=TRANSFORMATIONS)
+    if sp.count_ops(expr) > MAX_OPERATIONS:
+        raise ExpressionTooLarge(f"expression has more than {MAX_OPERATIONS} operations")
+    # Catches exponents built from arithmetic, e.g. (x + 1)**(10**6)
+    for power in expr.atoms(sp.Pow):
+        if power.exp.is_Number and abs(power.exp) > MAX_EXPONENT:
+            raise ExpressionTooLarge(f"exponents larger than {MAX_EXPONENT} are not supported")
+    return expr
+
+
+def parse(text: str) -> sp.Expr:
+    """Parse an expression into SymPy, reusing earlier parses of the same canonical form."""
+    return _parse(canonicalize(text))
+
+
+@lru_cache(maxsize=RESULT_CACHE_SIZE)
+def _solve(canonical: str) -> tuple:
+    if "=" in canonical:
+        left, right = canonical.split("=", 1)
+        expr = _parse(left) - _parse(right)
+    else:
+        expr = _parse(canonical)
+
+    if expr.is_polynomial(X):
+        poly = sp.Poly(expr, X)
+        degree = poly.degree()
+        if degree == 1:
+            # a*x + b = 0 needs no general solver
+            a, b = poly.all_coeffs()
+            return (sp.simplify(-b / a),)
+        if degree == 2:
+            return tuple(sp.roots(poly, multiple=True))
+        if degree <= 0:
+            return ()
+    return tuple(sp.solve(expr, X))
+
+
+def solve_equation(equation: str) -> List[sp.Expr]:
+    """Solve an equation (or expression = 0) for x."""
+    return list(_solve(canonicalize(equation)))
+
+
+@lru_cache(maxsize=RESULT_CACHE_SIZE)
+def _factor(canonical: str) -> sp.Expr:
+    return sp.factor(_parse(canonical))
+
+
+def factor(expression: str) -> sp.Expr:
+    """Factor an expression."""
+    return _factor(canonicalize(expression))
+
+
+@lru_cache(maxsize=RESULT_CACHE_SIZE)
+def _expand(canonical: str) -> sp.Expr:
+    return sp.expand(_parse(canonical))
+
+
+def expand(expression: str) -> sp.Expr:
+    """Expand an expression."""
+    return _expand(canonicalize(expression))
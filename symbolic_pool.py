@@ -0,0 +1,126 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional
+
+SYMBOLIC_TIMEOUT = float(os.getenv("MATH_AGENT_SYMBOLIC_TIMEOUT", 5))
+# 0 runs SymPy in-process (no isolation), which is handy when debugging
+SYMBOLIC_WORKERS = int(os.getenv("MATH_AGENT_SYMBOLIC_WORKERS", 2))
+
+
+class SymbolicTimeout(Exception):
+    """Raised when a symbolic computation exceeds its wall-clock budget."""
+
+    def __init__(self, timeout: float):
+        super().__init__(f"computation exceeded the {timeout:g}s time budget")
+        self.timeout = timeout
+
+
+def _warm_worker():
+    # Import SymPy and exercise the parser so the first real call is fast
+    import symbolic
+    symbolic.factor("x**2 - 1")
+
+
+def _ping() -> bool:
+    return True
+
+
+def _call_symbolic(name: str, *args):
+    # Runs in the worker, where symbolic (and SymPy) is already imported
+    import symbolic
+    return getattr(symbolic, name)(*args)
+
+
+class SymbolicPool:
+    """Process pool that runs SymPy work with a per-call time budget.
+
+    Workers import SymPy up front. A call that runs past its budget gets the
+    whole pool killed and replaced, since a worker stuck inside SymPy cannot
+    be interrupted any other way.
+    """
+
+    def __init__(self, workers: int = SYMBOLIC_WORKERS, timeout: float = SYMBOLIC_TIMEOUT):
+        self.workers = workers
+        self.timeout = timeout
+        self.restarts = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._warming = []
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # forkserver children start from a clean process with SymPy preloaded,
+                # instead of forking a parent that may be running threads
+                if "forkserver" in multiprocessing.get_all_start_methods():
+                    context = multiprocessing.get_context("forkserver")
+                    context.set_forkserver_preload(["symbolic"])
+                else:
+                    context = multiprocessing.get_context("spawn")
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=context, initializer=_warm_worker
+                )
+                self._warming = [self._executor.submit(_ping) for _ in range(self.workers)]
+            executor, warming = self._executor, self._warming
+        # Worker start-up does not count against the time budget of a call
+        for future in warming:
+            future.result()
+        return executor
+
+    def warm(self):
+        """Start every worker now instead of on the first tool call."""
+        if self.workers <= 0:
+            _warm_worker()
+        else:
+            self._get_executor()
+
+    def restart(self, executor: ProcessPoolExecutor):
+        """Kill the workers of `executor` and replace it with a fresh pool."""
+        with self._lock:
+            if self._executor is not executor:
+                return  # another thread already replaced it
+            self._executor = None
+            self.restarts += 1
+        # ProcessPoolExecutor has no public way to kill busy workers before Python 3.14
+        for process in list((executor._processes or {}).values()):
+            process.kill()
+        executor.shutdown(wait=False, cancel_futures=True)
+        threading.Thread(target=self.warm, daemon=True).start()
+
+    def run(self, fn: Callable, *args, timeout: Optional[float] = None):
+        """Run `fn(*args)` in a worker, raising SymbolicTimeout past the time budget."""
+        if self.workers <= 0:
+            return fn(*args)
+        timeout = self.timeout if timeout is None else timeout
+        for attempt in range(2):
+            executor = self._get_executor()
+            try:
+                return executor.submit(fn, *args).result(timeout=timeout)
+            except TimeoutError:
+                self.restart(executor)
+                raise SymbolicTimeout(timeout)
+            except BrokenProcessPool:
+                # Killed while another call's wedged worker was replaced; retry once on the new pool
+                self.restart(executor)
+                if attempt:
+                    raise
+
+    def call(self, name: str, *args, timeout: Optional[float] = None):
+        """Run `symbolic.<name>(*args)` in a worker without importing SymPy in this process."""
+        return self.run(_call_symbolic, name, *args, timeout=timeout)
+
+    def health(self) -> dict:
+        """Worker count, time budget and number of restarts so far."""
+        return {"workers": self.workers, "timeout": self.timeout, "restarts": self.restarts}
+
+
+# Workers only start on first use (or warm()), so creating the pool here is cheap
+_pool = SymbolicPool()
+
+
+def get_symbolic_pool() -> SymbolicPool:
+    """Get the process-wide symbolic pool."""
+    return _pool
@@ -0,0 +1,13 @@
+import pytest
+
+from evaluator import ExpressionError, evaluate
+
+
+@pytest.mark.parametrize("expression, value", [("round(2.5)", 3), ("round(0.5)", 1), ("round(-2.5)", -3)])
+def test_round_is_half_up(expression, value):
+    assert evaluate(expression)[0] == value
+
+
+def test_log_base_one_is_rejected():
+    with pytest.raises(ExpressionError, match="Log base must be positive and not 1"):
+        evaluate("log(5, 1)")
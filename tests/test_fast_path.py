@@ -0,0 +1,14 @@
+import pytest
+
+from fast_path import match_question, try_fast_path
+from main import get_tool_specs
+
+
+@pytest.mark.parametrize("question, answer", [("-2^2", "-4"), ("What is -3^2?", "-9")])
+def test_negative_base_without_brackets_is_negated_power(question, answer):
+    assert match_question(question)[0] == "evaluate_expression"
+    assert try_fast_path(question, get_tool_specs()).endswith(f"= {answer}")
+
+
+def test_bracketed_negative_base_uses_power():
+    assert match_question("(-3)^2") == ("power", {"base": -3.0, "exponent": 2.0})
@@ -0,0 +1,13 @@
+import pytest
+
+import symbolic
+
+
+@pytest.mark.parametrize("expression", ['__import__("os").getcwd()', "x.__class__", "(1).real", "eval(x)"])
+def test_non_math_input_never_reaches_parse_expr(expression):
+    with pytest.raises(symbolic.UnsupportedExpression):
+        symbolic.factor(expression)
+
+
+def test_functions_and_single_letter_symbols_parse():
+    assert symbolic.solve_equation("2x + sqrt(9) = 13") == [5]
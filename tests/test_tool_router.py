@@ -0,0 +1,21 @@
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from main import get_tool_groups, load_system_prompt
+from tool_router import RoutedAgent
+
+LADDER = "A ladder 5 m long leans against a wall with its base 3 m from the wall. How high up the wall does it reach?"
+
+
+def test_word_problem_with_one_incidental_topic_word_gets_every_tool():
+    agent = RoutedAgent(None, get_tool_groups())
+    assert agent.router.route(LADDER) == tuple(agent.groups)
+
+
+def test_system_prompt_lists_only_the_bound_tools():
+    agent = RoutedAgent(None, get_tool_groups())
+    group_names = agent.router.route("What is the area of a circle with radius 7?")
+    messages = [SystemMessage(content=load_system_prompt()), HumanMessage(content="area")]
+    prompt = agent.restrict_prompt({"messages": messages}, group_names)["messages"][0].content
+    assert group_names == ("basic", "geometry")
+    assert "area_circle" in prompt and "calculator" in prompt
+    assert "solve_linear_equation" not in prompt and "- **Statistics**" not in prompt
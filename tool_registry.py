@@ -0,0 +1,163 @@
+"""Lightweight registry of the math tool functions.
+
+`@math_tool` only records a function; the LangChain tool objects are built on
+first use from JSON schemas stored in prompts/tool_schemas.json, instead of
+being inferred (pydantic models, docstring parsing) by `@tool` at import time.
+Answers that never reach the model (fast path, response cache) use ToolSpec,
+which does not import LangChain at all.
+A stored schema is only used while the function's signature and docstring
+still match it; otherwise the schema is inferred as before.
+
+Regenerate the stored schemas after changing a tool:
+
+    python tool_registry.py
+"""
+import hashlib
+import inspect
+import json
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict
+
+from tool_results import ToolResult
+
+SCHEMA_PATH = Path(__file__).parent / "prompts" / "tool_schemas.json"
+
+_functions: Dict[str, Callable] = {}
+
+
+def math_tool(func: Callable) -> Callable:
+    """Register a tool function. The function itself is returned unchanged."""
+    _functions[func.__name__] = func
+    return func
+
+
+def registered_functions() -> Dict[str, Callable]:
+    """Every registered tool function by name, in registration order."""
+    return dict(_functions)
+
+
+def fingerprint(func: Callable) -> str:
+    """Digest of everything the schema is derived from: name, signature and docstring."""
+    source = f"{func.__name__}{inspect.signature(func)}{func.__doc__}"
+    return hashlib.sha1(source.encode("utf-8")).hexdigest()[:12]
+
+
+@lru_cache(maxsize=1)
+def _stored_schemas() -> Dict[str, dict]:
+    try:
+        with open(SCHEMA_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _infer_schema(func: Callable) -> dict:
+    from langchain_core.tools import StructuredTool
+    from langchain_core.utils.function_calling import convert_to_openai_tool
+
+    return convert_to_openai_tool(StructuredTool.from_function(func))
+
+
+def openai_schema(func: Callable) -> dict:
+    """OpenAI tool schema of a registered function (stored copy when up to date)."""
+    stored = _stored_schemas().get(func.__name__)
+    if stored and stored.get("fingerprint") == fingerprint(func):
+        return stored["schema"]
+    return _infer_schema(func)
+
+
+def _coerce(value, schema: dict):
+    # The model sends JSON numbers; tools expect floats where they declare float (7 -> 7.0)
+    if value is None:
+        return None
+    for option in schema.get("anyOf", ()):
+        if option.get("type") != "null":
+            return _coerce(value, option)
+    kind = schema.get("type")
+    if kind == "number" and isinstance(value, (int, str)) and not isinstance(value, bool):
+        return float(value)
+    if kind == "integer" and isinstance(value, (float, str)):
+        return int(float(value))
+    if kind == "array" and isinstance(value, list):
+        return [_coerce(item, schema.get("items", {})) for item in value]
+    return value
+
+
+@dataclass
+class ToolSpec:
+    """Name, description and parameter schema of a tool, callable without LangChain.
+
+    Enough for the fast path and the response cache, which only look tools up
+    by name and call them. invoke() returns the tool's ToolResult.
+    """
+
+    name: str
+    description: str
+    parameters: dict
+    func: Callable
+
+    def invoke(self, args: dict):
+        properties = self.parameters.get("properties", {})
+        return self.func(**{name: _coerce(value, properties.get(name, {})) for name, value in args.items()})
+
+
+@lru_cache(maxsize=None)
+def get_spec(func: Callable) -> ToolSpec:
+    """The ToolSpec of a registered function."""
+    schema = openai_schema(func)["function"]
+    return ToolSpec(schema["name"], schema["description"], schema["parameters"], func)
+
+
+@lru_cache(maxsize=None)
+def get_tool(func: Callable):
+    """The LangChain tool for a registered function (built once, on first use)."""
+    from langchain_core.tools import StructuredTool
+
+    spec = get_spec(func)
+
+    def call(**kwargs):
+        # The model reads the compact text; the ToolResult travels along as the ToolMessage artifact
+        result = spec.invoke(kwargs)
+        return (result.to_llm() if isinstance(result, ToolResult) else str(result)), result
+
+    return StructuredTool(name=spec.name, description=spec.description, func=call, args_schema=spec.parameters,
+                          response_format="content_and_artifact")
+
+
+def tool_list(groups: Dict[str, list]) -> str:
+    """The tool list of the system prompt, one line per group: `- **Basic**: calculator, power, ...`."""
+    return "\n".join(f"- **{name.capitalize()}**: {', '.join(t.name for t in tools)}" for name, tools in groups.items())
+
+
+def write_schemas(path: Path = SCHEMA_PATH) -> int:
+    """Store the inferred schemas of every registered tool. Returns the number of tools."""
+    schemas = {name: {"fingerprint": fingerprint(func), "schema": _infer_schema(func)}
+               for name, func in _functions.items()}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(schemas, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    _stored_schemas.cache_clear()
+    return len(schemas)
+
+
+def stale_tools() -> list:
+    """Registered tools whose stored schema is missing or out of date."""
+    stored = _stored_schemas()
+    return [name for name, func in _functions.items()
+            if stored.get(name, {}).get("fingerprint") != fingerprint(func)]
+
+
+if __name__ == "__main__":
+    # Importing main registers the tools, in the importable copy of this module
+    import main  # noqa: F401
+    import tool_registry
+
+    if "--check" in sys.argv[1:]:
+        stale = tool_registry.stale_tools()
+        for name in stale:
+            print(f"stale: {name}")
+        sys.exit(1 if stale else 0)
+    print(f"Wrote {tool_registry.write_schemas()} tool schemas to {SCHEMA_PATH}")
@@ -0,0 +1,153 @@
+"""Typed results of the math tools.
+
+Tools used to return English sentences ("Two real solutions: x₁ = 3.0,
+x₂ = 2.0") that the model had to read back, caches could not reuse, and
+batch jobs could only take apart with regexes. Each tool now returns a
+ToolResult: named values (ints and Fractions stay exact), the exact form
+where there is one, units, the formula with the inputs substituted, the
+working steps and, for the table tools, a table.
+
+to_llm() is the one serializer for the model, kept short:
+
+    area = 49π (≈ 153.938) square units; formula: π × 7²
+    x₁ = 3, x₂ = 2 (two real solutions)
+    sin(60°) = √3/2 (≈ 0.866025)
+    Error: Value must be between -1 and 1
+
+to_dict() is the JSON form for batch output and comparisons; the web
+interface renders the object itself (app.py), and the fast path's
+templates use its parts (fast_path.render_answer).
+"""
+import math
+from dataclasses import dataclass, field
+from fractions import Fraction
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import exact
+
+# Units written without a space after the value
+_ATTACHED_UNITS = ("%", "°")
+
+
+def format_value(value: Any, decimals: int = 6) -> str:
+    """Display text of one value: exact for ints and Fractions, floats to `decimals` places without trailing zeros."""
+    if isinstance(value, (list, tuple)):
+        return ", ".join(format_value(item, decimals) for item in value)
+    if isinstance(value, complex):
+        real, imag = format_value(value.real, decimals), format_value(abs(value.imag), decimals)
+        return f"{real} {'-' if value.imag < 0 else '+'} {imag}i"
+    if isinstance(value, float):
+        if not math.isfinite(value) or value.is_integer() or abs(value) >= 1e15:
+            return exact.format_number(value) if math.isfinite(value) else str(value)
+        if abs(value) < 10 ** -decimals:
+            return f"{value:.4g}"
+        return f"{value:.{decimals}f}".rstrip("0").rstrip(".")
+    if isinstance(value, (int, Fraction)) and not isinstance(value, bool):
+        return exact.format_number(value)
+    return str(value)
+
+
+def _jsonable(value: Any):
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+    if isinstance(value, (Fraction, complex)):
+        return format_value(value)
+    if hasattr(value, "item"):
+        return value.item()  # numpy scalar
+    return value
+
+
+class Table(NamedTuple):
+    """Column headers and rows of a table result."""
+
+    headers: List[str]
+    rows: List[tuple]
+
+    @classmethod
+    def from_columns(cls, headers: List[str], *columns) -> "Table":
+        columns = [column.tolist() if hasattr(column, "tolist") else list(column) for column in columns]
+        return cls(list(headers), list(zip(*columns)))
+
+    def to_text(self, decimals: int = 6) -> str:
+        """Compact pipe-separated table, one row per line."""
+        lines = [" | ".join(self.headers)]
+        lines += [" | ".join(format_value(cell, decimals) for cell in row) for row in self.rows]
+        return "\n".join(lines)
+
+    def to_markdown(self, decimals: int = 6) -> str:
+        """Markdown table, for answers shown in the chat."""
+        rows = [self.headers, ["---"] * len(self.headers)]
+        rows += [[format_value(cell, decimals) for cell in row] for row in self.rows]
+        return "\n".join("| " + " | ".join(row) + " |" for row in rows)
+
+
+@dataclass
+class ToolResult:
+    """Result of a math tool: named values with their exact form, units, formula, steps or table.
+
+    `exact` is the exact form of a single value (e.g. "√3/2"); `formula` the
+    formula with the inputs substituted. A failed call has only `error`.
+    """
+
+    values: Dict[str, Any] = field(default_factory=dict)
+    exact: Optional[str] = None
+    units: Optional[str] = None
+    formula: Optional[str] = None
+    steps: List[str] = field(default_factory=list)
+    table: Optional[Table] = None
+    note: Optional[str] = None
+    error: Optional[str] = None
+    decimals: int = 6
+
+    @classmethod
+    def failure(cls, message: str) -> "ToolResult":
+        return cls(error=message)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def display(self, value: Any) -> str:
+        """One value with its exact form and units, e.g. "√3/2 (≈ 0.866025)" or "25%"."""
+        text = format_value(value, self.decimals)
+        if self.exact and len(self.values) == 1 and self.exact != text:
+            text = f"{self.exact} ({'=' if isinstance(value, (int, Fraction)) else '≈'} {text})"
+        if self.units:
+            text += self.units if self.units in _ATTACHED_UNITS else f" {self.units}"
+        return text
+
+    def answer(self) -> str:
+        """The values and the note: `x₁ = 3, x₂ = 2 (two real solutions)`."""
+        text = ", ".join(f"{label} = {self.display(value)}" for label, value in self.values.items())
+        if self.note:
+            text = f"{text} ({self.note})" if text else self.note
+        return text
+
+    def to_llm(self) -> str:
+        """Compact text of the result for the model (the ToolMessage content)."""
+        if self.error is not None:
+            return f"Error: {self.error}"
+        parts = [self.answer(), self.formula and f"formula: {self.formula}",
+                 not self.values and self.units and f"units: {self.units}"]
+        head = "; ".join(part for part in parts if part)
+        lines = [head] if head else []
+        if self.steps:
+            lines += ["steps:"] + [f"{i}. {step}" for i, step in enumerate(self.steps, 1)]
+        if self.table is not None:
+            lines.append(self.table.to_text(self.decimals))
+        return "\n".join(lines)
+
+    def __str__(self) -> str:
+        return self.to_llm()
+
+    def to_dict(self) -> dict:
+        """JSON-ready form: Fractions and complex numbers as text, everything else as is."""
+        record = {"values": {label: _jsonable(value) for label, value in self.values.items()}}
+        for name in ("exact", "units", "formula", "note", "error"):
+            if getattr(self, name) is not None:
+                record[name] = getattr(self, name)
+        if self.steps:
+            record["steps"] = list(self.steps)
+        if self.table is not None:
+            record["table"] = {"headers": self.table.headers, "rows": [_jsonable(list(row)) for row in self.table.rows]}
+        return record
@@ -0,0 +1,223 @@
+import math
+import os
+import re
+import threading
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from agent_loop import build_react_graph
+from tool_registry import tool_list
+from tool_schemas import split_docstring, bind_tools
+
+# Answer each question with only the tool groups it needs (0 binds every tool to every request)
+TOOL_ROUTING = os.getenv("MATH_AGENT_TOOL_ROUTING", "1").lower() not in ("0", "false", "no", "")
+
+# Independent tool calls from one model turn run at the same time, up to this many; results keep call order
+TOOL_CONCURRENCY = int(os.getenv("MATH_AGENT_TOOL_CONCURRENCY", 8))
+
+# Always offered: most multi-step problems need plain arithmetic somewhere
+ALWAYS_INCLUDED = ("basic",)
+
+# Vocabulary students use for each topic, on top of the tool names and docstrings
+GROUP_KEYWORDS = {
+    "basic": "add sum total plus minus subtract times multiply multiplied divide divided product quotient difference "
+             "square root sqrt power squared cubed exponent arithmetic",
+    "algebra": "solve equation factor factorise factorize expand simplify quadratic linear expression "
+               "unknown variable bracket polynomial root x",
+    "geometry": "area perimeter volume circle radius diameter rectangle triangle cylinder sphere cone "
+                "hypotenuse pythagoras pythagorean side length width height circumference shape",
+    "trigonometry": "sin sine cos cosine tan tangent angle degree arcsin arccos arctan inverse trig "
+                    "trigonometry trigonometric opposite adjacent",
+    "logarithms": "log logarithm ln natural exponential e base",
+    "statistics": "mean average median mode standard deviation variance data dataset spread frequent "
+                  "statistic statistics",
+    "sequences": "sequence series term terms nth arithmetic geometric common difference ratio progression",
+    "percentages": "percent percentage ratio simplify proportion discount increase decrease share",
+}
+
+# Notation that points at a topic regardless of the words around it
+GROUP_SIGNALS = {
+    "basic": re.compile(r"\d\s*[-+*/×÷]\s*\d|\d\s+(?:plus|minus|times|multiplied by|divided by)\s+\d"),
+    "algebra": re.compile(r"\b[xyz]\s*\^|\d\s*[xyz]\b|="),
+    "trigonometry": re.compile(r"°"),
+    "percentages": re.compile(r"%"),
+}
+
+# Groups scoring below this share of the best group's score are left out
+RELATIVE_THRESHOLD = 0.35
+MIN_SCORE = 0.05
+# Below this best score per question word, a question is routed on its notation alone: the ladder
+# problem ("... with its base 3 m from the wall") matches only "base", which says nothing about it
+MIN_CONFIDENCE = 0.12
+
+_WORD = re.compile(r"[a-z]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by calculate can do doe find for from given how i in is it its me my now "
+    "of on one or please than that the then this to use useful using what when which with you".split()
+)
+
+
+def _stem(word: str) -> str:
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def terms(text: str) -> List[str]:
+    """Lowercased, stemmed words of `text` without stopwords."""
+    stems = (_stem(w) for w in _WORD.findall(text.lower()))
+    return [w for w in stems if w not in _STOPWORDS]
+
+
+class ToolRouter:
+    """Local TF-IDF classifier from a question to the tool groups it needs.
+
+    Each group is a document made of its keywords, tool names and docstring
+    summaries; a question is scored against every group by the TF-IDF weights
+    of its words. No network calls, and routing a question takes microseconds.
+    """
+
+    def __init__(self, groups: Dict[str, list]):
+        self.group_names = list(groups)
+        documents = {}
+        for name, tools in groups.items():
+            text = [GROUP_KEYWORDS.get(name, "")]
+            for t in tools:
+                summary, _ = split_docstring(t.description)
+                text += [t.name.replace("_", " "), summary]
+            documents[name] = Counter(terms(" ".join(text)))
+
+        document_frequency = Counter(term for counts in documents.values() for term in counts)
+        n = len(documents)
+        self.weights: Dict[str, Dict[str, float]] = {}
+        for name, counts in documents.items():
+            vector = {term: (1 + math.log(count)) * math.log(1 + n / document_frequency[term])
+                      for term, count in counts.items()}
+            norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+            self.weights[name] = {term: w / norm for term, w in vector.items()}
+        self.route = lru_cache(maxsize=1024)(self._route)
+
+    def scores(self, question: str) -> Dict[str, float]:
+        question_terms = set(terms(question))
+        return {name: sum(weights.get(term, 0.0) for term in question_terms)
+                for name, weights in self.weights.items()}
+
+    def confidence(self, question: str) -> float:
+        """Best group score over the square root of the question's word count (its TF-IDF cosine)."""
+        best = max(self.scores(question).values(), default=0.0)
+        return best / math.sqrt(len(set(terms(question))) or 1)
+
+    def _route(self, question: str) -> Tuple[str, ...]:
+        """Names of the groups to offer for `question`, in group order. Every group when unsure."""
+        scores = self.scores(question)
+        best = max(scores.values(), default=0.0)
+        selected = set()
+        if self.confidence(question) >= MIN_CONFIDENCE:
+            selected = {name for name, score in scores.items()
+                        if score >= MIN_SCORE and score >= RELATIVE_THRESHOLD * best}
+        selected |= {name for name, pattern in GROUP_SIGNALS.items() if pattern.search(question)}
+        if not selected:
+            return tuple(self.group_names)
+        selected |= set(ALWAYS_INCLUDED)
+        return tuple(name for name in self.group_names if name in selected)
+
+
+def _question(agent_input: dict) -> str:
+    for message in reversed(agent_input.get("messages", [])):
+        if isinstance(message, HumanMessage):
+            return message.content if isinstance(message.content, str) else str(message.content)
+    return ""
+
+
+class RoutedAgent:
+    """Stands in for a compiled agent, running each question on an agent bound to just the tools it needs.
+
+    The system prompt's tool list is cut down to the same tools, so the model
+    is never told about tools it cannot call.
+
+    One agent is compiled per distinct set of tool groups and reused, so after
+    the first few questions routing costs nothing but the classifier call.
+    Supports invoke/stream/ainvoke/astream with the same arguments as the graph.
+    """
+
+    def __init__(self, model, groups: Dict[str, list], router: ToolRouter = None):
+        self.model = model
+        self.groups = groups
+        self.router = router or ToolRouter(groups)
+        self.tool_list = tool_list(groups)
+        self.routes: Counter = Counter()
+        self._agents = {}
+        self._lock = threading.Lock()
+
+    def agent_for(self, group_names: Tuple[str, ...]):
+        """The compiled agent for a set of tool groups (built on first use)."""
+        agent = self._agents.get(group_names)
+        if agent is None:
+            with self._lock:
+                agent = self._agents.get(group_names)
+                if agent is None:
+                    tools = [t for name in group_names for t in self.groups[name]]
+                    agent = compile_agent(self.model, tools)
+                    self._agents[group_names] = agent
+        return agent
+
+    def warm(self, questions=()):
+        """Compile ahead of time the agents `questions` are routed to, and the one with every tool."""
+        for question in questions:
+            self.agent_for(self.router.route(question))
+        self.agent_for(tuple(self.groups))
+
+    def restrict_prompt(self, agent_input: dict, group_names: Tuple[str, ...]) -> dict:
+        """`agent_input` with the system prompt listing only the tools of `group_names`."""
+        messages = agent_input.get("messages", [])
+        if not messages or not isinstance(messages[0], SystemMessage) or self.tool_list not in messages[0].content:
+            return agent_input
+        bound = tool_list({name: self.groups[name] for name in group_names})
+        system_message = SystemMessage(content=messages[0].content.replace(self.tool_list, bound))
+        return {**agent_input, "messages": [system_message, *messages[1:]]}
+
+    def _select(self, agent_input: dict):
+        group_names = self.router.route(_question(agent_input))
+        self.routes[group_names] += 1
+        return self.agent_for(group_names), self.restrict_prompt(agent_input, group_names)
+
+    def invoke(self, agent_input: dict, *args, **kwargs):
+        agent, agent_input = self._select(agent_input)
+        return agent.invoke(agent_input, *args, **kwargs)
+
+    def stream(self, agent_input: dict, *args, **kwargs):
+        agent, agent_input = self._select(agent_input)
+        return agent.stream(agent_input, *args, **kwargs)
+
+    async def ainvoke(self, agent_input: dict, *args, **kwargs):
+        agent, agent_input = self._select(agent_input)
+        return await agent.ainvoke(agent_input, *args, **kwargs)
+
+    async def astream(self, agent_input: dict, *args, **kwargs):
+        agent, agent_input = self._select(agent_input)
+        async for chunk in agent.astream(agent_input, *args, **kwargs):
+            yield chunk
+
+
+def compile_agent(model, tools: list):
+    """ReAct agent over `tools`, running the tool calls of one model turn concurrently.
+
+    The tools node hands each call of a turn to a thread pool (SymPy tools then
+    wait on the process pool from their thread), so a turn takes as long as its
+    slowest call rather than the sum. max_concurrency bounds the pool. The loop
+    stops at the step and token budgets (agent_loop.py).
+    """
+    agent = build_react_graph(bind_tools(model, tools), tools)
+    return agent.with_config(max_concurrency=TOOL_CONCURRENCY)
+
+
+def build_agent(model, groups: Dict[str, list]):
+    """Agent over the given tool groups: routed per question, or one agent with every tool."""
+    if TOOL_ROUTING:
+        return RoutedAgent(model, groups)
+    return compile_agent(model, [t for group in groups.values() for t in group])
@@ -0,0 +1,85 @@
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+# Send shortened tool descriptions and schemas to the model (fewer input tokens per request)
+COMPACT_TOOL_DESCRIPTIONS = os.getenv("MATH_AGENT_COMPACT_TOOLS", "0").lower() not in ("0", "false", "no", "")
+
+_ARGS_SECTION = re.compile(r"^\s*Args:\s*$", re.MULTILINE)
+_ARG_LINE = re.compile(r"^\s*(\w+)\s*:\s*(.+)$")
+# Argument notes worth keeping in compact mode: choices, examples, ranges, alternatives
+_INFORMATIVE_NOTE = re.compile(r"\(|e\.g\.|\bor\b|\bbetween\b|\binstead\b|\bany\b", re.IGNORECASE)
+
+
+def split_docstring(description: str) -> Tuple[str, Dict[str, str]]:
+    """Split a tool docstring into its summary and its `Args:` descriptions."""
+    parts = _ARGS_SECTION.split(description, maxsplit=1)
+    summary = " ".join(parts[0].split())
+    arguments = {}
+    if len(parts) == 2:
+        for line in parts[1].splitlines():
+            match = _ARG_LINE.match(line)
+            if match:
+                arguments[match.group(1)] = match.group(2).strip()
+    return summary, arguments
+
+
+def _compact_property(schema: dict) -> dict:
+    # Optional[X] = None is sent as plain X: leaving a parameter out already means "not given"
+    any_of = schema.get("anyOf")
+    if any_of and len(any_of) == 2 and {"type": "null"} in any_of:
+        inner = next(s for s in any_of if s != {"type": "null"})
+        schema = {**inner, **{k: v for k, v in schema.items() if k != "anyOf"}}
+    if "default" in schema and schema["default"] is None:
+        schema = {k: v for k, v in schema.items() if k != "default"}
+    return schema
+
+
+def compact_schema(schema: dict) -> dict:
+    """Shorter form of an OpenAI tool schema with the same parameters.
+
+    The description keeps the docstring summary on one line (without the
+    "Useful for" boilerplate). `Args:` notes that only restate the parameter
+    name ("radius: Radius of the circle") are dropped; the others move into the
+    parameter's schema. Nullable parameters are flattened.
+    """
+    function = schema["function"]
+    summary, arguments = split_docstring(function.get("description", ""))
+    if summary.startswith("Useful for "):
+        summary = summary[len("Useful for "):]
+        summary = summary[:1].upper() + summary[1:]
+    parameters = dict(function.get("parameters", {}))
+    properties = {}
+    for name, prop in parameters.get("properties", {}).items():
+        prop = _compact_property(prop)
+        if name in arguments and "description" not in prop and _INFORMATIVE_NOTE.search(arguments[name]):
+            prop = {"description": arguments[name], **prop}
+        properties[name] = prop
+    parameters["properties"] = properties
+    return {"type": "function", "function": {**function, "description": summary, "parameters": parameters}}
+
+
+_schema_cache: Dict[tuple, List[dict]] = {}
+
+
+def tool_schemas(tools, compact: Optional[bool] = None) -> List[dict]:
+    """OpenAI tool schemas for `tools`, built once and reused.
+
+    Returning the very same schemas for every request keeps the request prefix
+    (tools, then the system prompt) byte-identical, which is what provider-side
+    prompt caching keys on.
+    """
+    if compact is None:
+        compact = COMPACT_TOOL_DESCRIPTIONS
+    key = (compact, *((t.name, t.description) for t in tools))
+    if key not in _schema_cache:
+        schemas = [convert_to_openai_tool(t) for t in tools]
+        _schema_cache[key] = [compact_schema(s) for s in schemas] if compact else schemas
+    return list(_schema_cache[key])
+
+
+def bind_tools(model, tools, compact: Optional[bool] = None):
+    """Bind the cached tool schemas to a chat model (pass the result to agent_loop.build_react_graph)."""
+    return model.bind_tools(tool_schemas(tools, compact))
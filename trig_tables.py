@@ -0,0 +1,124 @@
+"""Exact trigonometric values at the standard exam angles.
+
+sin, cos and tan of every multiple of 15° over a full turn (which covers the
+multiples of 30° and 45°) are worked out once at import from the first
+quadrant by symmetry, as surds and fractions:
+
+    sin(30°) = 1/2    cos(45°) = √2/2    tan(15°) = 2 - √3    tan(90°) is undefined
+
+Tools look an angle up in O(1) before falling back to floating point, so
+exam angles give the exact answer (not 0.500000 or 16331239353195370). The
+inverse tables map the float value of each entry back to its angle in the
+principal range, so arcsin(0.5) is exactly 30°.
+"""
+import math
+from fractions import Fraction
+from typing import Dict, NamedTuple, Optional
+
+from exact import Number
+
+_R2, _R3, _R6 = math.sqrt(2), math.sqrt(3), math.sqrt(6)
+
+
+class ExactValue(NamedTuple):
+    """Exact text of a trig value and the value itself (int/Fraction when rational, None when undefined)."""
+
+    text: str
+    value: Optional[Number]
+
+    @property
+    def defined(self) -> bool:
+        return self.value is not None
+
+
+UNDEFINED = ExactValue("undefined", None)
+
+_SIN_FIRST_QUADRANT = {
+    0: ExactValue("0", 0),
+    15: ExactValue("(√6 - √2)/4", (_R6 - _R2) / 4),
+    30: ExactValue("1/2", Fraction(1, 2)),
+    45: ExactValue("√2/2", _R2 / 2),
+    60: ExactValue("√3/2", _R3 / 2),
+    75: ExactValue("(√6 + √2)/4", (_R6 + _R2) / 4),
+    90: ExactValue("1", 1),
+}
+_TAN_FIRST_QUADRANT = {
+    0: ExactValue("0", 0),
+    15: ExactValue("2 - √3", 2 - _R3),
+    30: ExactValue("√3/3", _R3 / 3),
+    45: ExactValue("1", 1),
+    60: ExactValue("√3", _R3),
+    75: ExactValue("2 + √3", 2 + _R3),
+    90: UNDEFINED,
+}
+
+
+def _negate(entry: ExactValue) -> ExactValue:
+    if not entry.defined or entry.value == 0:
+        return entry
+    text = entry.text
+    if text.startswith("-"):
+        text = text[1:]
+    elif " " in text and not text.startswith("("):
+        text = f"-({text})"
+    else:
+        text = "-" + text
+    return ExactValue(text, -entry.value)
+
+
+def _sin(angle: int) -> ExactValue:
+    if angle <= 90:
+        return _SIN_FIRST_QUADRANT[angle]
+    if angle <= 180:
+        return _SIN_FIRST_QUADRANT[180 - angle]
+    if angle <= 270:
+        return _negate(_SIN_FIRST_QUADRANT[angle - 180])
+    return _negate(_SIN_FIRST_QUADRANT[360 - angle])
+
+
+def _tan(angle: int) -> ExactValue:
+    angle %= 180
+    return _TAN_FIRST_QUADRANT[angle] if angle <= 90 else _negate(_TAN_FIRST_QUADRANT[180 - angle])
+
+
+STEP = 15
+ANGLES = range(0, 360, STEP)
+
+# function -> angle in [0, 360) -> exact value
+TABLES: Dict[str, Dict[int, ExactValue]] = {
+    "sin": {angle: _sin(angle) for angle in ANGLES},
+    "cos": {angle: _sin((90 - angle) % 360) for angle in ANGLES},
+    "tan": {angle: _tan(angle) for angle in ANGLES},
+}
+
+# Principal ranges of the inverse functions, in degrees
+_PRINCIPAL = {"sin": range(-90, 91, STEP), "cos": range(0, 181, STEP), "tan": range(-75, 76, STEP)}
+
+
+def _key(value: float) -> float:
+    # Floats computed from the same surd differ at most in the last bits
+    return round(float(value), 12)
+
+
+# function -> float value -> angle in the principal range
+INVERSE_TABLES: Dict[str, Dict[float, int]] = {
+    name: {_key(TABLES[name][angle % 360].value): angle for angle in angles}
+    for name, angles in _PRINCIPAL.items()
+}
+
+
+def lookup(function: str, angle_degrees: float) -> Optional[ExactValue]:
+    """Exact sin/cos/tan of `angle_degrees`, or None when it is not a multiple of 15°."""
+    try:
+        if angle_degrees % STEP != 0:
+            return None
+    except TypeError:
+        return None
+    return TABLES[function][int(angle_degrees % 360)]
+
+
+def inverse(function: str, value: float) -> Optional[int]:
+    """Angle in degrees (principal range) whose sin/cos/tan is exactly `value`, or None."""
+    if not math.isfinite(value):
+        return None
+    return INVERSE_TABLES[function].get(_key(value))